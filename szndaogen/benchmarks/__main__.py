@@ -0,0 +1,66 @@
+import sys
+from optparse import OptionParser
+
+from .fake_driver import TYPE_MIX
+from .runner import DEFAULT_SIZES, BenchmarkSuite, compare_results, load_results, save_results
+from ..tools.cli_colors import CMD, FG
+
+
+def get_cmd_options() -> tuple:
+    parser = OptionParser()
+    parser.usage = (
+        "python -m szndaogen.benchmarks [options]\n"
+        "    example: python -m szndaogen.benchmarks --output baseline.json\n"
+        "    example: python -m szndaogen.benchmarks --baseline baseline.json --tolerance 0.2\n"
+    )
+    parser.add_option("-s", "--sizes", dest="sizes", type="string", default=",".join(map(str, DEFAULT_SIZES)),
+                      help="Comma separated numbers of rows.")
+    parser.add_option("-w", "--width", dest="width", type="int", default=20, help="Number of columns of rows.")
+    parser.add_option("--type-mix", dest="type_mix", type="string", default=",".join(TYPE_MIX),
+                      help="Comma separated column types of rows (int, str, decimal, float, datetime, date, null).")
+    parser.add_option("-l", "--latency-ms", dest="latency_ms", type="float", default=0.0,
+                      help="Simulated round trip time of every query.")
+    parser.add_option("-n", "--repeat", dest="repeat", type="int", default=5, help="Number of runs of every benchmark.")
+    parser.add_option("-b", "--benchmark", dest="benchmarks", action="append",
+                      help="Run only given benchmark, can be used more times. ({})".format(
+                          ", ".join(BenchmarkSuite.BENCHMARKS)))
+    parser.add_option("-o", "--output", dest="output", type="string", help="Save JSON results into given file.")
+    parser.add_option("--baseline", dest="baseline", type="string",
+                      help="Compare results with saved JSON results, exit with status 1 on regression.")
+    parser.add_option("--tolerance", dest="tolerance", type="float", default=0.25,
+                      help="Allowed relative slowdown against baseline.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    options, _arguments = get_cmd_options()
+    suite = BenchmarkSuite(
+        sizes=[int(size) for size in options.sizes.split(",")],
+        width=options.width,
+        type_mix=options.type_mix.split(","),
+        latency_ms=options.latency_ms,
+        repeat=options.repeat,
+        benchmarks=options.benchmarks,
+    )
+    results = suite.run()
+    for result in results:
+        print(f"{result.name:<40} min {result.min_s * 1000:10.3f} ms  {result.per_row_us:10.3f} us/row")
+
+    results_dict = suite.to_json_dict(results)
+    if options.output:
+        save_results(results_dict, options.output)
+
+    if options.baseline:
+        regressions = compare_results(results_dict, load_results(options.baseline), options.tolerance)
+        for regression in regressions:
+            print(
+                f"{FG.red}REGRESSION{CMD.reset} {regression.name}: {regression.baseline_s * 1000:.3f} ms => "
+                f"{regression.current_s * 1000:.3f} ms ({regression.ratio:.2f}x)"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+import datetime
+import decimal
+import json
+import os
+import re
+import threading
+import time
+import typing
+from contextlib import contextmanager
+
+from ..data_access.db import DBI, ConnectionProfile
+from ..data_access.model_base import ModelBase
+
+TYPE_MIX = ("int", "str", "decimal", "datetime", "null")
+""" Default cycle of column types of synthetic rows after `id` column """
+
+_VALUE_FACTORIES: typing.Dict[str, typing.Callable[[int, int], typing.Any]] = {
+    "int": lambda row, column: row * 31 + column,
+    "str": lambda row, column: f"value {row}-{column}",
+    "decimal": lambda row, column: decimal.Decimal(row * 100 + column) / 100,
+    "float": lambda row, column: row + column / 10,
+    "datetime": lambda row, column: datetime.datetime(2022, 1, 1) + datetime.timedelta(minutes=row + column),
+    "date": lambda row, column: datetime.date(2022, 1, 1) + datetime.timedelta(days=(row + column) % 3650),
+    "null": lambda row, column: None,
+}
+_PYTHON_TYPES = {
+    "int": int,
+    "str": str,
+    "decimal": float,
+    "float": float,
+    "datetime": datetime.datetime,
+    "date": datetime.date,
+    "null": str,
+}
+
+
+class RowFactory:
+    """
+    Synthetic rows of fake driver. First column is integer `id`, other columns `column_N` cycle through type mix.
+    Rows are built once per size and shallow copied for every fetch, as real driver returns new dicts.
+    """
+
+    def __init__(self, width: int = 20, type_mix: typing.Sequence[str] = TYPE_MIX):
+        """
+        :param width: Number of columns including `id`
+        :param type_mix: Column types, see `TYPE_MIX`
+        """
+        unknown_types = [type_name for type_name in type_mix if type_name not in _VALUE_FACTORIES]
+        if unknown_types:
+            raise ValueError("Unknown column type(s) {}.".format(", ".join(unknown_types)))
+        self.width = width
+        self.type_mix = tuple(type_mix)
+        self.column_types = [("id", "int")] + [
+            (f"column_{index}", self.type_mix[index % len(self.type_mix)]) for index in range(width - 1)
+        ]
+        self._rows: typing.Dict[int, typing.List[typing.Dict]] = {}
+
+    @property
+    def column_names(self) -> typing.List[str]:
+        return [column_name for column_name, _ in self.column_types]
+
+    def get_rows(self, count: int) -> typing.List[typing.Dict]:
+        rows = self._rows.get(count)
+        if rows is None:
+            rows = [
+                {
+                    column_name: _VALUE_FACTORIES[type_name](row_index, column_index)
+                    for column_index, (column_name, type_name) in enumerate(self.column_types)
+                }
+                for row_index in range(count)
+            ]
+            for row_index, row in enumerate(rows):
+                row["id"] = row_index + 1
+            self._rows[count] = rows
+        return [dict(row) for row in rows]
+
+    def create_model_class(self, table_name: str = "benchmark") -> typing.Type[ModelBase]:
+        """
+        Model class of synthetic table in the shape "szndaogen" generates
+        """
+        attribute_list = self.column_names
+        attribute_types = {column_name: _PYTHON_TYPES[type_name] for column_name, type_name in self.column_types}
+
+        class Meta:
+            TABLE_NAME: str = table_name
+            TABLE_TYPE: str = "BASE TABLE"
+            SQL_STATEMENT: str = (
+                "SELECT {HINTS} {PROJECTION} FROM `" + table_name + "` {PARTITION} {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+            )
+            SQL_STATEMENT_WHERE_BASE: str = "1"
+            SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+            PRIMARY_KEYS: typing.List = ["id"]
+            ATTRIBUTE_LIST: typing.List = attribute_list
+            ATTRIBUTE_TYPES: typing.Dict = attribute_types
+            MODEL_DATA_CONVERTOR: typing.Dict = {}
+            RELATIONS: typing.Dict = {}
+
+        def __init__(self, init_data: typing.Dict = {}):
+            for attribute_name in attribute_list:
+                object.__setattr__(self, attribute_name, None)
+            ModelBase.__init__(self, init_data)
+
+        return type("BenchmarkModel", (ModelBase,), {"Meta": Meta, "__init__": __init__})
+
+
+class FakeCursor:
+    LIMIT_REGEX = re.compile(r"\bLIMIT\s+(\d+)", re.I)
+
+    def __init__(self, connection: "FakeConnection", dictionary: bool = False):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows: typing.List = []
+        self._position = 0
+
+    def execute(self, sql: str, params: typing.Sequence = ()):
+        self.connection.driver.on_query(sql, params)
+        self._position = 0
+        if sql.lstrip()[:7].upper() == "EXPLAIN":
+            row = {"EXPLAIN": json.dumps(self.connection.driver.get_plan(sql))}
+            self._rows = [row if self.dictionary else tuple(row.values())]
+            self.rowcount = 1
+        elif sql.lstrip()[:6].upper() == "SELECT":
+            found = self.LIMIT_REGEX.search(sql)
+            count = self.connection.driver.result_size
+            if found:
+                count = min(count, int(found.group(1)))
+            rows = self.connection.driver.row_factory.get_rows(count)
+            self._rows = rows if self.dictionary else [tuple(row.values()) for row in rows]
+            self.rowcount = len(self._rows)
+        else:
+            self._rows = []
+            self.rowcount = 1
+            self.lastrowid = self.connection.driver.next_insert_id()
+
+    def executemany(self, sql: str, seq_params: typing.Sequence[typing.Sequence]):
+        seq_params = list(seq_params)
+        self.connection.driver.on_query(sql, seq_params)
+        self._rows = []
+        self.rowcount = len(seq_params)
+        self.lastrowid = self.connection.driver.next_insert_id()
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int = 1) -> typing.List:
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> typing.List:
+        return self.fetchmany(len(self._rows) - self._position)
+
+    def close(self):
+        self._rows = []
+
+
+class FakeConnection:
+    def __init__(self, driver: "FakeDriver", connection_id: int):
+        self.driver = driver
+        self.connection_id = connection_id
+        self.unread_result = False
+        self.is_open = True
+
+    def is_connected(self) -> bool:
+        return self.is_open
+
+    def disconnect(self):
+        self.is_open = False
+
+    def cursor(self, dictionary: bool = False) -> FakeCursor:
+        return FakeCursor(self, dictionary=dictionary)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self.driver.release(self)
+
+
+class FakePool:
+    """
+    Stand-in for `MySQLConnectionPool` handing out fake connections
+    """
+
+    def __init__(self, driver: "FakeDriver"):
+        self.driver = driver
+
+    def get_connection(self) -> FakeConnection:
+        return self.driver.connect()
+
+
+class FakeDriver:
+    """
+    In-memory MySQL driver for benchmarks and tests. Every query sleeps for `latency_ms` and selects return
+    `result_size` synthetic rows (or less if statement has LIMIT). `EXPLAIN FORMAT=JSON` returns canned plan of table
+    the select reads from. No server is needed.
+    """
+
+    TABLE_REGEX = re.compile(r"\bFROM\s+`?(\w+)`?", re.I)
+
+    def __init__(
+        self,
+        row_factory: RowFactory = None,
+        result_size: int = 1,
+        latency_ms: float = 0.0,
+        plans: typing.Dict[str, typing.Dict] = None,
+    ):
+        """
+        :param row_factory: Factory of synthetic rows
+        :param result_size: Number of rows returned by select
+        :param latency_ms: Simulated round trip time of every query
+        :param plans: Table name => `EXPLAIN FORMAT=JSON` plan (see `create_plan`), full scan of `result_size` rows
+            is default plan of other tables
+        """
+        self.row_factory = row_factory or RowFactory()
+        self.result_size = result_size
+        self.latency_ms = latency_ms
+        self.plans = plans or {}
+        self.query_count = 0
+        self.connection_count = 0
+        self._insert_id = 0
+        self._lock = threading.Lock()
+
+    def connect(self) -> FakeConnection:
+        with self._lock:
+            self.connection_count += 1
+            connection_id = self.connection_count
+        return FakeConnection(self, connection_id)
+
+    def release(self, connection: FakeConnection):
+        pass
+
+    def on_query(self, sql: str, params: typing.Sequence):
+        with self._lock:
+            self.query_count += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    @staticmethod
+    def create_plan(table: str, access_type: str = "ALL", key: str = None, rows: int = 1) -> typing.Dict:
+        """
+        :return: Plan of single table select in `EXPLAIN FORMAT=JSON` shape
+        """
+        table_plan = {"table_name": table, "access_type": access_type, "rows_examined_per_scan": rows}
+        if key is not None:
+            table_plan.update(possible_keys=[key], key=key)
+        return {"query_block": {"select_id": 1, "table": table_plan}}
+
+    def get_plan(self, sql: str) -> typing.Dict:
+        found = self.TABLE_REGEX.search(sql)
+        table = found.group(1) if found else None
+        if table in self.plans:
+            return self.plans[table]
+        return self.create_plan(table, rows=self.result_size)
+
+    def next_insert_id(self) -> int:
+        with self._lock:
+            self._insert_id += 1
+            return self._insert_id
+
+    @contextmanager
+    def install(self, profile: str = None, session: typing.Dict[str, typing.Any] = None):
+        """
+        Plug fake driver into `DBI` as connection pool. Previous `DBI` configuration is restored on exit.
+        :param profile: Name of connection profile served by fake driver, default profile if not set
+        :param session: Session variables of installed profile
+        """
+        profile = profile or DBI.DEFAULT_PROFILE
+        is_default = profile == DBI.DEFAULT_PROFILE
+        previous = (DBI.is_initialized, DBI.connection_pool, DBI._pid, dict(DBI.connection_pools), dict(DBI.profiles))
+        DBI.profiles[profile] = ConnectionProfile(name=profile, pool_size=1, session=session)
+        if is_default:
+            DBI.is_initialized = True
+            DBI.connection_pool = FakePool(self)
+            DBI._pid = os.getpid()
+        else:
+            DBI.connection_pools[profile] = FakePool(self)
+        try:
+            yield self
+        finally:
+            DBI.is_initialized, DBI.connection_pool, DBI._pid, connection_pools, profiles = previous
+            DBI.connection_pools.clear()
+            DBI.connection_pools.update(connection_pools)
+            DBI.profiles.clear()
+            DBI.profiles.update(profiles)
@@ -0,0 +1,358 @@
+import importlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import typing
+
+from .fake_driver import TYPE_MIX, FakeDriver, RowFactory
+from ..data_access.db import DBI
+from ..data_access.manager_base import TableManagerBase
+from ..generator.analyser import Analyser
+from ..generator.schema import ColumnSchema, DatabaseSchema, TableSchema
+from ..tools.auto_group import auto_group_list, auto_group_list_by_pkeys
+from ..tools.setuptools import get_file_content
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (10, 100, 1000)
+
+_COLUMN_TYPES = {
+    "int": "int(11)",
+    "str": "varchar(50)",
+    "decimal": "decimal(10,2)",
+    "float": "double",
+    "datetime": "datetime",
+    "date": "date",
+    "null": "varchar(50)",
+}
+""" MySQL column types of generated benchmark table per `fake_driver.TYPE_MIX` type """
+_generated_package_ids = itertools.count()
+
+
+class BenchmarkResult(typing.NamedTuple):
+    benchmark: str
+    size: int
+    """ Number of rows (or calls of single row methods) processed by one run """
+    min_s: float
+    median_s: float
+
+    @property
+    def name(self) -> str:
+        return f"{self.benchmark}/{self.size}"
+
+    @property
+    def per_row_us(self) -> float:
+        return self.min_s / self.size * 1000000 if self.size else 0.0
+
+
+class Regression(typing.NamedTuple):
+    name: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s if self.baseline_s else float("inf")
+
+
+class BenchmarkSuite:
+    """
+    Benchmarks of data access layer running against in-memory `FakeDriver`, so they measure only the overhead
+    added by "szndaogen" per query and per row. Every `bench_*` method prepares data for given size and returns
+    callable measured by `run`.
+    """
+
+    BENCHMARKS = (
+        "select_one",
+        "select_all",
+        "insert_one_bulk",
+        "update_one",
+        "insert_one_generated",
+        "insert_one_fast_path",
+        "update_one_generated",
+        "update_one_fast_path",
+        "delete_one_generated",
+        "delete_one_fast_path",
+        "model_construction",
+        "to_dict",
+        "auto_group_list",
+        "auto_group_list_by_pkeys",
+        "auto_group_list_by_pkeys_group_keys",
+    )
+
+    def __init__(
+        self,
+        sizes: typing.Sequence[int] = DEFAULT_SIZES,
+        width: int = 20,
+        type_mix: typing.Sequence[str] = TYPE_MIX,
+        latency_ms: float = 0.0,
+        repeat: int = 5,
+        benchmarks: typing.Sequence[str] = None,
+    ):
+        """
+        :param sizes: Numbers of rows
+        :param width: Number of columns of synthetic rows
+        :param type_mix: Column types of synthetic rows, see `fake_driver.TYPE_MIX`
+        :param latency_ms: Simulated round trip time of every query
+        :param repeat: Number of runs of every benchmark, minimum and median are reported
+        :param benchmarks: Names of benchmarks to run, default all `BENCHMARKS`
+        """
+        unknown_benchmarks = [name for name in benchmarks or () if name not in self.BENCHMARKS]
+        if unknown_benchmarks:
+            raise ValueError("Unknown benchmark(s) {}.".format(", ".join(unknown_benchmarks)))
+        self.sizes = tuple(sizes)
+        self.width = width
+        self.type_mix = tuple(type_mix)
+        self.latency_ms = latency_ms
+        self.repeat = repeat
+        self.benchmarks = tuple(benchmarks or self.BENCHMARKS)
+        self.row_factory = RowFactory(width, type_mix)
+        self.driver = FakeDriver(self.row_factory, latency_ms=latency_ms)
+        self.model_class = self.row_factory.create_model_class()
+
+        class BenchmarkManager(TableManagerBase):
+            MODEL_CLASS = self.model_class
+
+        self.manager_class = BenchmarkManager
+        self._generated_manager_classes: typing.Dict[bool, typing.Type[TableManagerBase]] = {}
+
+    def run(self) -> typing.List[BenchmarkResult]:
+        results = []
+        with self.driver.install():
+            for benchmark in self.benchmarks:
+                for size in self.sizes:
+                    fnc = getattr(self, f"bench_{benchmark}")(size)
+                    timings = []
+                    for _ in range(self.repeat):
+                        start = time.perf_counter()
+                        fnc()
+                        timings.append(time.perf_counter() - start)
+                    results.append(BenchmarkResult(benchmark, size, min(timings), statistics.median(timings)))
+        return results
+
+    def bench_select_one(self, size: int) -> typing.Callable:
+        manager = self.manager_class(DBI())
+
+        def run():
+            self.driver.result_size = 1
+            for primary_key in range(size):
+                manager.select_one(primary_key)
+
+        return run
+
+    def bench_select_all(self, size: int) -> typing.Callable:
+        manager = self.manager_class(DBI())
+
+        def run():
+            self.driver.result_size = size
+            manager.select_all()
+
+        return run
+
+    def bench_insert_one_bulk(self, size: int) -> typing.Callable:
+        manager = self.manager_class(DBI())
+        models = [self.model_class(row).map_model_attributes() for row in self.row_factory.get_rows(size)]
+
+        def run():
+            for model_instance in models:
+                manager.insert_one_bulk(model_instance)
+            manager.insert_bulk_flush()
+
+        return run
+
+    def bench_update_one(self, size: int) -> typing.Callable:
+        manager = self.manager_class(DBI())
+        models = [self.model_class(row).map_model_attributes() for row in self.row_factory.get_rows(size)]
+
+        def run():
+            for model_instance in models:
+                manager.update_one(model_instance)
+
+        return run
+
+    def bench_insert_one_generated(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("insert_one", size, fast_path=False)
+
+    def bench_insert_one_fast_path(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("insert_one", size, fast_path=True)
+
+    def bench_update_one_generated(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("update_one", size, fast_path=False)
+
+    def bench_update_one_fast_path(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("update_one", size, fast_path=True)
+
+    def bench_delete_one_generated(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("delete_one", size, fast_path=False)
+
+    def bench_delete_one_fast_path(self, size: int) -> typing.Callable:
+        return self._bench_generated_manager("delete_one", size, fast_path=True)
+
+    def bench_model_construction(self, size: int) -> typing.Callable:
+        rows = self.row_factory.get_rows(size)
+
+        def run():
+            for row in rows:
+                self.model_class(dict(row)).map_model_attributes()
+
+        return run
+
+    def bench_to_dict(self, size: int) -> typing.Callable:
+        models = [self.model_class(row).map_model_attributes() for row in self.row_factory.get_rows(size)]
+
+        def run():
+            for model_instance in models:
+                model_instance.to_dict()
+
+        return run
+
+    def bench_auto_group_list(self, size: int) -> typing.Callable:
+        rows = self._get_grouped_rows(size)
+        return lambda: auto_group_list(rows)
+
+    def bench_auto_group_list_by_pkeys(self, size: int) -> typing.Callable:
+        rows = self._get_grouped_rows(size)
+        return lambda: auto_group_list_by_pkeys(("id",), rows)
+
+    def bench_auto_group_list_by_pkeys_group_keys(self, size: int) -> typing.Callable:
+        # two one-to-many joins, 10 jobs x 10 tags rows per `id`, duplicate group items removed by group keys
+        rows = [
+            {
+                "id": index // 100,
+                "jobs__id": index % 10,
+                "jobs__name": f"job {index % 10}",
+                "tags__name": f"tag {index // 10 % 10}",
+            }
+            for index in range(size)
+        ]
+        group_key_names = {"jobs": ("id",), "tags": ("name",)}
+        return lambda: auto_group_list_by_pkeys(("id",), rows, group_key_names=group_key_names)
+
+    def _bench_generated_manager(self, method_name: str, size: int, fast_path: bool) -> typing.Callable:
+        """
+        Single row write of base manager generated with or without "--fast-path"
+        """
+        manager_class = self._get_generated_manager_class(fast_path)
+        manager = manager_class(DBI())
+        models = [
+            manager_class.create_model_instance(row).map_model_attributes() for row in self.row_factory.get_rows(size)
+        ]
+        method = getattr(manager, method_name)
+
+        def run():
+            for model_instance in models:
+                method(model_instance)
+
+        return run
+
+    def _get_generated_manager_class(self, fast_path: bool) -> typing.Type[TableManagerBase]:
+        """
+        Base manager of synthetic table generated by `Analyser` into temporary package
+        """
+        manager_class = self._generated_manager_classes.get(fast_path)
+        if manager_class is not None:
+            return manager_class
+
+        columns = tuple(
+            ColumnSchema(
+                column_name,
+                _COLUMN_TYPES[type_name],
+                "NO" if column_name == "id" else "YES",
+                "PRI" if column_name == "id" else "",
+                None,
+                "",
+                "",
+            )
+            for column_name, type_name in self.row_factory.column_types
+        )
+        table = TableSchema(name="benchmark", table_type="BASE TABLE", columns=columns)
+        # unique package name, modules of other suites with different width stay in `sys.modules`
+        package_name = f"szndaogen_benchmark_{next(_generated_package_ids)}"
+        output_path = tempfile.mkdtemp(prefix="szndaogen_benchmarks_")
+        sys.path.insert(0, output_path)
+        try:
+            analyser = Analyser(os.path.join(output_path, package_name), fast_path=fast_path)
+            record = analyser.analyse_table(DatabaseSchema(tables=(table,)), table)
+            analyser.write_table(analyser.render_table(record))
+            module = importlib.import_module(f"{package_name}.managers.base.benchmark_manager_base")
+        finally:
+            sys.path.remove(output_path)
+            shutil.rmtree(output_path, ignore_errors=True)
+        manager_class = self._generated_manager_classes[fast_path] = module.BenchmarkManagerBase
+        return manager_class
+
+    def _get_grouped_rows(self, size: int) -> typing.List[typing.Dict]:
+        """
+        Rows of one-to-many join, ten rows per `id` and every second column in `items__` group
+        """
+        rows = []
+        for index, row in enumerate(self.row_factory.get_rows(size)):
+            row["id"] = index // 10
+            rows.append(
+                {
+                    f"items__{key}" if column_index % 2 else key: value
+                    for column_index, (key, value) in enumerate(row.items())
+                }
+            )
+        return rows
+
+    def to_json_dict(self, results: typing.List[BenchmarkResult]) -> typing.Dict:
+        return {
+            "version": RESULTS_VERSION,
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "szndaogen": get_file_content(os.path.join(os.path.dirname(os.path.dirname(__file__)), "VERSION")),
+            },
+            "config": {
+                "sizes": list(self.sizes),
+                "width": self.width,
+                "type_mix": list(self.type_mix),
+                "latency_ms": self.latency_ms,
+                "repeat": self.repeat,
+            },
+            "results": {
+                result.name: {
+                    "benchmark": result.benchmark,
+                    "size": result.size,
+                    "min_s": result.min_s,
+                    "median_s": result.median_s,
+                    "per_row_us": result.per_row_us,
+                }
+                for result in results
+            },
+        }
+
+
+def save_results(results: typing.Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> typing.Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Unsupported benchmark results version {results.get('version')} in '{path}'.")
+    return results
+
+
+def compare_results(results: typing.Dict, baseline: typing.Dict, tolerance: float = 0.25) -> typing.List[Regression]:
+    """
+    Benchmarks slower than baseline. Minimum of runs is compared, benchmarks missing in baseline are skipped.
+    :param results: Current results from `BenchmarkSuite.to_json_dict`
+    :param baseline: Saved results
+    :param tolerance: Allowed relative slowdown, 0.25 => 25 %
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        baseline_result = baseline["results"].get(name)
+        if baseline_result is not None and result["min_s"] > baseline_result["min_s"] * (1 + tolerance):
+            regressions.append(Regression(name, baseline_result["min_s"], result["min_s"]))
+    return regressions
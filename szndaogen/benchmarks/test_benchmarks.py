@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+
+from .fake_driver import FakeDriver, RowFactory
+from .runner import BenchmarkSuite, compare_results, load_results, save_results
+from ..data_access.db import DBI
+from ..data_access.manager_base import TableManagerBase
+
+
+def test_fake_driver_serves_managers():
+    row_factory = RowFactory(width=6, type_mix=("str", "datetime", "null"))
+    driver = FakeDriver(row_factory, result_size=25)
+
+    class Manager(TableManagerBase):
+        MODEL_CLASS = row_factory.create_model_class("items")
+
+    is_initialized, connection_pool = DBI.is_initialized, DBI.connection_pool
+    with driver.install():
+        manager = Manager()
+        models = manager.select_all(limit=10)
+        assert len(models) == 10
+        assert models[3].to_dict() == {
+            "id": 4,
+            "column_0": "value 3-1",
+            "column_1": datetime.datetime(2022, 1, 1, 0, 5),
+            "column_2": None,
+            "column_3": "value 3-4",
+            "column_4": datetime.datetime(2022, 1, 1, 0, 8),
+        }
+        assert len(list(manager.select_iter(batch_size=7))) == 25
+        assert manager.select_one(1).to_dict()["id"] == 1
+        assert manager.update_one(models[0]) == 1
+        assert driver.query_count == 4
+    assert (DBI.is_initialized, DBI.connection_pool) == (is_initialized, connection_pool)
+
+
+def test_row_factory_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        RowFactory(type_mix=("int", "blob"))
+
+
+def test_benchmark_results_and_baseline_comparison(tmp_path):
+    suite = BenchmarkSuite(sizes=(5, 20), width=8, repeat=1)
+    results = suite.to_json_dict(suite.run())
+    assert sorted(results["results"]) == sorted(
+        f"{benchmark}/{size}" for benchmark in BenchmarkSuite.BENCHMARKS for size in (5, 20)
+    )
+    assert all(result["min_s"] > 0 for result in results["results"].values())
+
+    baseline_path = str(tmp_path / "baseline.json")
+    save_results(results, baseline_path)
+    baseline = load_results(baseline_path)
+    assert compare_results(results, baseline) == []
+
+    baseline["results"]["select_all/20"]["min_s"] = results["results"]["select_all/20"]["min_s"] / 2
+    del baseline["results"]["to_dict/5"]
+    regressions = compare_results(results, baseline, tolerance=0.5)
+    assert [regression.name for regression in regressions] == ["select_all/20"]
+    assert regressions[0].ratio == pytest.approx(2)
+
+
+def test_benchmark_suite_rejects_unknown_benchmark():
+    with pytest.raises(ValueError):
+        BenchmarkSuite(benchmarks=("select_everything",))
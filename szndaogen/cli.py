@@ -5,6 +5,8 @@ from optparse import OptionParser
 from szndaogen.cli_wizard import wizard
 from szndaogen.config import Config
 from szndaogen.generator.analyser import Analyser
+from szndaogen.generator.ddl import DDLSchemaLoader
+from szndaogen.generator.snapshot import SnapshotSchemaLoader
 from szndaogen.tools.log import Logger, BaseLogger
 from szndaogen.tools.setuptools import get_file_content
 
@@ -17,6 +19,7 @@ def get_cmd_options() -> tuple:
         "%prog [options] output_path\n"
         "    example: %prog -a localhost -d my_database -u root -p pass /path/to/data_access\n"
         "    example: %prog -a localhost -d my_database -u root -p pass ./data_access\n"
+        "    example: %prog --from-ddl ./schema.sql ./data_access\n"
     )
 
     parser.add_option("-a", "--host-address", dest="db_host", type="string", help="MySQL database host. (required)")
@@ -28,10 +31,27 @@ def get_cmd_options() -> tuple:
     parser.add_option("-p", "--password", dest="db_pass", type="string", help="Password for MySQL DB authentication.")
     parser.add_option("-t", "--templates-path", dest="templates_path", type="string", help="Path to custom templates of Models (model.jinja), "
                                                                                            "DataManagers (manager.jinja) and DataManagerBases (manager_base.jinja).")
+    parser.add_option("-f", "--fast-path", dest="fast_path", action="store_true", default=False,
+                      help="Generate table specific insert, update and delete methods with prepared SQL statements into DataManagerBases.")
+    parser.add_option("--force", dest="force", action="store_true", default=False,
+                      help="Render all tables even if their schema and templates did not change since last run.")
+    parser.add_option("--from-ddl", dest="from_ddl", type="string",
+                      help="Generate from `mysqldump --no-data` DDL file instead of database.")
+    parser.add_option("--from-snapshot", dest="from_snapshot", type="string",
+                      help="Generate from JSON schema snapshot instead of database.")
+    parser.add_option("--export-snapshot", dest="export_snapshot", type="string",
+                      help="Save JSON snapshot of loaded schema into given file.")
+    parser.add_option("-j", "--jobs", dest="jobs", type="int", default=1,
+                      help="Number of worker processes rendering templates and threads writing files.")
+    parser.add_option("--profile", dest="db_profile", type="string",
+                      help="Tag generated models with named DB connection profile (see Config.MYSQL_PROFILES).")
+    parser.add_option("--query-timeout", dest="query_timeout_ms", type="int",
+                      help="Default execution time limit of selects of generated models in milliseconds (Meta.QUERY_TIMEOUT_MS).")
 
     options, arguments = parser.parse_args()
 
-    if not options.db_host or not options.db_name or not options.db_user:
+    is_offline = options.from_ddl or options.from_snapshot
+    if not is_offline and (not options.db_host or not options.db_name or not options.db_user):
         parser.print_help()
         options, arguments = wizard(options)
 
@@ -52,7 +72,23 @@ def main():
     Config.MYSQL_PASSWORD = _options.db_pass
     Logger.set_external_logger(logger_instance=BaseLogger())
 
-    app = Analyser(output_path, custom_templates_path=_options.templates_path)
+    schema_loader = None
+    if _options.from_ddl:
+        schema_loader = DDLSchemaLoader(_options.from_ddl)
+    elif _options.from_snapshot:
+        schema_loader = SnapshotSchemaLoader(_options.from_snapshot)
+
+    app = Analyser(
+        output_path,
+        custom_templates_path=_options.templates_path,
+        fast_path=_options.fast_path,
+        force=_options.force,
+        jobs=_options.jobs,
+        schema_loader=schema_loader,
+        export_snapshot_path=_options.export_snapshot,
+        db_profile=_options.db_profile,
+        query_timeout_ms=_options.query_timeout_ms,
+    )
     app.run()
 
 
@@ -1,3 +1,6 @@
+import typing
+
+
 class Config:
     MYSQL_HOST: str = "localhost"
     MYSQL_PORT: int = 3306
@@ -6,6 +9,19 @@ class Config:
     MYSQL_PASSWORD: str = ""
     MYSQL_POOL_SIZE: int = None
     MYSQL_POOL_CONNECTION_TIMEOUT: int = 1000
+    MYSQL_SESSION: typing.Dict[str, typing.Any] = {}
+    """ Session variables set on every new connection of default profile e.g. `{"time_zone": "+00:00"}` """
+    MYSQL_PROFILES: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    """
+    Named connection profiles, name => options of `ConnectionProfile` (host, port, database, user, password, pool_size,
+    pool_connection_timeout, session, connection_options). Profile "default" is made of `MYSQL_*` options above.
+    """
 
     MANAGER_AUTO_MAP_MODEL_ATTRIBUTES = False
     """ If `True` => Model attributes will be mapped on class attributes automatically in results of `select_one` or `select_all` methods. """
+
+    MANAGER_CHECK_INDEXES = False
+    """ Development mode. If `True` => Managers log warning if SQL condition or order by will not use any index of table (see `Model.Meta.INDEXES`). """
+
+    MANAGER_SINGLE_FLIGHT_READS = False
+    """ If `True` => Identical `select_one` and `select_all` queries running concurrently in more threads are executed once and their result is shared (see `ViewManagerBase.SINGLE_FLIGHT_READS`). """
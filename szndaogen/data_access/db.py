@@ -1,4 +1,8 @@
+import os
+import re
+import threading
 import typing
+from contextlib import contextmanager
 from functools import wraps
 from time import sleep
 
@@ -6,72 +10,276 @@ from mysql.connector import Error
 from mysql.connector import MySQLConnection
 from mysql.connector.pooling import MySQLConnectionPool
 from mysql.connector.pooling import errors
+from .explain import ExplainCapture
+from .identity_map import IdentityMap
+from .retry import RetryPolicy
 from ..tools.log import Logger
 from ..config import Config
 
 
+class ConnectionProfile(typing.NamedTuple):
+    """
+    Named DB connection settings with own connection pool, see `Config.MYSQL_PROFILES`
+    """
+
+    name: str
+    host: str = "localhost"
+    port: int = 3306
+    database: str = ""
+    user: str = "mysql"
+    password: str = ""
+    pool_size: int = None
+    """ Connections are not pooled if it is not set """
+    pool_connection_timeout: int = 1000
+    """ Number of 1ms attempts to get connection from exhausted pool """
+    session: typing.Dict[str, typing.Any] = None
+    """ Session variables set on every new connection e.g. `{"time_zone": "+00:00"}` """
+    connection_options: typing.Dict[str, typing.Any] = None
+    """ Other options of `MySQLConnection` e.g. `{"connect_timeout": 5}` """
+
+    @property
+    def connection_config(self) -> dict:
+        return dict(
+            self.connection_options or {},
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+        )
+
+
+ER_STATEMENT_TIMEOUT = 1969
+""" MariaDB max_statement_time exceeded """
+ER_QUERY_TIMEOUT = 3024
+""" MySQL max_execution_time exceeded """
+CR_SERVER_LOST = 2013
+CR_SERVER_LOST_EXTENDED = 2055
+
+
+class QueryTimeoutException(Error):
+    """
+    Query was interrupted by server after its execution time limit or client stopped waiting for its result
+    """
+
+    def __init__(self, timeout_ms: typing.Optional[int], is_client_side: bool, cause: Error):
+        """
+        :param timeout_ms: Time limit of query, None => limit set on server (`max_execution_time` variable)
+        :param is_client_side: Client read timeout expired, connection was discarded
+        :param cause: Original error of connector
+        """
+        super().__init__(msg=cause.msg, errno=cause.errno, sqlstate=cause.sqlstate)
+        self.timeout_ms = timeout_ms
+        self.is_client_side = is_client_side
+
+
+class _DBIState(threading.local):
+    """
+    State of DBI instance in one thread
+    """
+
+    connection = None
+    connection_pid: int = None
+    is_in_transaction = False
+    is_in_pass_dbi = False
+    is_in_self_dbi = False
+    identity_map: IdentityMap = None
+
+
+def _thread_local_property(name: str, doc: str = None) -> property:
+    return property(
+        lambda self: getattr(self._state, name), lambda self, value: setattr(self._state, name, value), doc=doc
+    )
+
+
 class DBI:
+    """
+    DB connector. One instance can be shared by threads, connection and transaction state is kept per thread,
+    so every thread works with its own connection (see `README.md`, Concurrency).
+    """
+
+    DEFAULT_PROFILE = "default"
     is_initialized = False
     connection_config: dict = None
+    """ Connection config of default profile """
     connection_pool: MySQLConnectionPool = None
-
-    def __init__(self):
-        self._is_in_transaction = False
-        self._is_in_pass_dbi = False
-        self._is_in_self_dbi = False
-        self._connection = None
+    """ Connection pool of default profile """
+    profiles: typing.Dict[str, ConnectionProfile] = {}
+    connection_pools: typing.Dict[str, MySQLConnectionPool] = {}
+    """ Connection pools of other than default profile """
+    _pid: int = None
+    """ ID of process pools were created in, forked child process drops pools inherited from parent """
+    _init_lock = threading.Lock()
+    QUERY_TIMEOUT_GRACE_MS = 1000
+    """
+    Client read timeout of query with time limit is the limit plus grace, so server interrupts query first and
+    connection stays usable
+    """
+
+    _connection = _thread_local_property("connection")
+    _connection_pid = _thread_local_property("connection_pid")
+    _is_in_transaction = _thread_local_property("is_in_transaction")
+    _is_in_pass_dbi = _thread_local_property("is_in_pass_dbi")
+    _is_in_self_dbi = _thread_local_property("is_in_self_dbi")
+    identity_map = _thread_local_property(
+        "identity_map",
+        "Identity map of loaded models. It is active only inside unit of work (see `DBI.unit_of_work`).",
+    )
+
+    def __init__(self, profile: str = None):
+        """
+        :param profile: Name of connection profile from `Config.MYSQL_PROFILES`, default profile is made of
+            `Config.MYSQL_*` options
+        """
+        self.profile = profile or DBI.DEFAULT_PROFILE
+        self._state = _DBIState()
         DBI._init()
+        if self.profile != DBI.DEFAULT_PROFILE:
+            DBI._init_profile(self.profile)
 
     @classmethod
     def _init(cls):
-        if cls.is_initialized:
+        pid = os.getpid()
+        if cls.is_initialized and cls._pid == pid:
+            return
+        if cls._pid is not None and cls._pid != pid:
+            # fallback for forks which don't run `os.register_at_fork` hooks (e.g. Python 3.6)
+            Logger.log.info("DBI._init.forked", parent_pid=cls._pid, pid=pid)
+            cls._after_fork_in_child()
+        with cls._init_lock:
+            if cls.is_initialized and cls._pid == pid:
+                return
+            profile = cls.get_profile(cls.DEFAULT_PROFILE)
+            cls.connection_config = profile.connection_config
+            cls.connection_pool = cls._create_pool(profile, "app_pool")
+            cls._pid = pid
+            cls.is_initialized = True
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        """
+        Drop pools and connections inherited from parent process. Their sockets are shared with parent, so they are
+        not closed (closing would end sessions of parent), just released. New pools are created lazily.
+        """
+        cls.is_initialized = False
+        cls.connection_pool = None
+        cls.connection_pools = {}
+        cls._pid = None
+        # lock could be held by thread of parent which doesn't exist in child
+        cls._init_lock = threading.Lock()
+
+    @classmethod
+    def _init_profile(cls, name: str):
+        if name in cls.connection_pools:
             return
-        cls.connection_config = {
-            "host": Config.MYSQL_HOST,
-            "port": Config.MYSQL_PORT,
-            "database": Config.MYSQL_DATABASE,
-            "user": Config.MYSQL_USER,
-            "password": Config.MYSQL_PASSWORD,
-        }
-        cls.connection_pool = (
-            MySQLConnectionPool(
-                pool_name="app_pool",
+        with cls._init_lock:
+            if name not in cls.connection_pools:
+                cls.connection_pools[name] = cls._create_pool(cls.get_profile(name), f"app_pool_{name}")
+
+    @staticmethod
+    def _create_pool(profile: ConnectionProfile, pool_name: str) -> typing.Optional[MySQLConnectionPool]:
+        if not profile.pool_size:
+            return None
+        return MySQLConnectionPool(
+            pool_name=pool_name, pool_size=profile.pool_size, pool_reset_session=False, **profile.connection_config
+        )
+
+    @classmethod
+    def get_profile(cls, name: str) -> ConnectionProfile:
+        """
+        Connection profile by name. Named profiles are loaded from `Config.MYSQL_PROFILES` once, default profile
+        follows current `Config.MYSQL_*` options.
+        :param name: Profile name
+        """
+        profile = cls.profiles.get(name)
+        if profile is not None:
+            return profile
+        if name == cls.DEFAULT_PROFILE:
+            return ConnectionProfile(
+                name=name,
+                host=Config.MYSQL_HOST,
+                port=Config.MYSQL_PORT,
+                database=Config.MYSQL_DATABASE,
+                user=Config.MYSQL_USER,
+                password=Config.MYSQL_PASSWORD,
                 pool_size=Config.MYSQL_POOL_SIZE,
-                pool_reset_session=False,
-                **cls.connection_config
+                pool_connection_timeout=Config.MYSQL_POOL_CONNECTION_TIMEOUT,
+                session=Config.MYSQL_SESSION,
             )
-            if Config.MYSQL_POOL_SIZE
-            else None
-        )
+        if name not in Config.MYSQL_PROFILES:
+            raise LookupError(f"Unknown DB profile '{name}'. Add it into Config.MYSQL_PROFILES.")
+        return cls.profiles.setdefault(name, ConnectionProfile(name=name, **Config.MYSQL_PROFILES[name]))
+
+    def _get_pool(self) -> typing.Optional[MySQLConnectionPool]:
+        if self.profile == DBI.DEFAULT_PROFILE:
+            return DBI.connection_pool
+        return DBI.connection_pools.get(self.profile)
 
     def _get_connection(self):
+        if self._connection and self._connection_pid != os.getpid():
+            # connection of parent process, it must not be used nor closed in forked child
+            self._connection = None
         if not self._connection:
-            if DBI.connection_pool:
-                try_get_pool_conn_counter = Config.MYSQL_POOL_CONNECTION_TIMEOUT
+            # pools are dropped in forked child, DBI instances created before fork rebuild them lazily
+            DBI._init()
+            if self.profile != DBI.DEFAULT_PROFILE:
+                DBI._init_profile(self.profile)
+            profile = DBI.get_profile(self.profile)
+            connection_pool = self._get_pool()
+            if connection_pool:
+                try_get_pool_conn_counter = profile.pool_connection_timeout
                 while not self._connection:
                     try:
                         if not try_get_pool_conn_counter:
                             raise Exception(
                                 "Pool connection timeout error. No connection avaliable in pool during {}ms".format(
-                                    Config.MYSQL_POOL_CONNECTION_TIMEOUT
+                                    profile.pool_connection_timeout
                                 )
                             )
-                        self._connection = DBI.connection_pool.get_connection()
+                        self._connection = connection_pool.get_connection()
                     except errors.PoolError:
                         Logger.log.debug(
                             "DBI._get_connection.wait_for_pool_connection: {}".format(try_get_pool_conn_counter)
                         )
                         try_get_pool_conn_counter -= 1
                         sleep(0.001)
-            else:
+            elif self.profile == DBI.DEFAULT_PROFILE:
                 self._connection = MySQLConnection(**DBI.connection_config)
+            else:
+                self._connection = MySQLConnection(**profile.connection_config)
             Logger.log.debug(
                 "DBI._get_connection.new",
                 connection_id=self._connection.connection_id,
-                pooled=DBI.connection_pool is not None,
+                pooled=connection_pool is not None,
+                profile=self.profile,
             )
+            self._connection_pid = os.getpid()
+            if profile.session:
+                self._init_session(profile)
         return self._connection
 
+    def _init_session(self, profile: ConnectionProfile):
+        """
+        Set session variables of profile once per physical connection
+        """
+        # pooled connection wraps physical one, mark is kept on physical connection and compared with its thread id,
+        # so reconnected or not pooled connection is always initialised
+        physical_connection = getattr(self._connection, "_cnx", None) or self._connection
+        session_id = physical_connection.connection_id
+        if session_id is not None and getattr(physical_connection, "_szndaogen_session_id", None) == session_id:
+            return
+        for name in profile.session:
+            if not re.match(r"^\w+$", name):
+                raise ValueError(f"Invalid session variable name '{name}' in DB profile '{profile.name}'.")
+        sql = "SET {}".format(", ".join(f"SESSION {name} = %s" for name in profile.session))
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(sql, tuple(profile.session.values()))
+        finally:
+            cursor.close()
+        physical_connection._szndaogen_session_id = session_id
+        Logger.log.debug("DBI._init_session", profile=profile.name, session=profile.session)
+
     def execute(self, sql: str, sql_args: typing.Tuple = ()) -> int:
         """
         For executing CRUD SQL commands.
@@ -137,47 +345,147 @@ class DBI:
                 self._close_connection()
         return ret
 
-    def fetch_one(self, sql, sql_args: tuple = (), dictionary_output=True) -> typing.Dict:
+    def fetch_one(self, sql, sql_args: tuple = (), dictionary_output=True, timeout_ms: int = None) -> typing.Dict:
+        """
+        :param timeout_ms: Client read timeout of query, see `QUERY_TIMEOUT_GRACE_MS`
+        :raise QueryTimeoutException: Execution time limit of query was exceeded
+        """
         record = None
         cursor = None
         try:
             if self._get_connection().is_connected():
+                if ExplainCapture.is_enabled:
+                    ExplainCapture.capture(self._get_connection(), sql, sql_args, self.profile)
                 cursor = self._get_connection().cursor(dictionary=dictionary_output)
                 Logger.log.debug("DBI.fetch_one", sql=sql)
-                cursor.execute(sql, sql_args)
-                record = cursor.fetchone()
+                with self._read_timeout(timeout_ms):
+                    cursor.execute(sql, sql_args)
+                    record = cursor.fetchone()
         except Error as ex:
             Logger.log.exception("DBI.fetch_one", message=ex)
+            timeout_ex = self._get_timeout_error(ex, timeout_ms)
+            if timeout_ex is not None:
+                raise timeout_ex from ex
             raise ex
         finally:
             if self._get_connection().is_connected():
                 if cursor:
                     cursor.close()
 
-                self._close_connection()
+            self._close_connection()
         return record
 
-    def fetch_all(self, sql, sql_args: tuple = (), dictionary_output=True) -> typing.List[typing.Dict]:
+    def fetch_all(
+        self, sql, sql_args: tuple = (), dictionary_output=True, timeout_ms: int = None
+    ) -> typing.List[typing.Dict]:
+        """
+        :param timeout_ms: Client read timeout of query, see `QUERY_TIMEOUT_GRACE_MS`
+        :raise QueryTimeoutException: Execution time limit of query was exceeded
+        """
         records = None
         cursor = None
         try:
             if self._get_connection().is_connected():
+                if ExplainCapture.is_enabled:
+                    ExplainCapture.capture(self._get_connection(), sql, sql_args, self.profile)
                 cursor = self._get_connection().cursor(dictionary=dictionary_output)
                 Logger.log.debug("DBI.fetch_all", sql=sql)
-                cursor.execute(sql, sql_args)
-                records = cursor.fetchall()
+                with self._read_timeout(timeout_ms):
+                    cursor.execute(sql, sql_args)
+                    records = cursor.fetchall()
 
         except Error as ex:
             Logger.log.exception("DBI.fetch_all", message=ex)
+            timeout_ex = self._get_timeout_error(ex, timeout_ms)
+            if timeout_ex is not None:
+                raise timeout_ex from ex
             raise ex
         finally:
             if self._get_connection().is_connected():
                 if cursor:
                     cursor.close()
 
-                self._close_connection()
+            self._close_connection()
         return records
 
+    def fetch_iter(
+        self, sql, sql_args: tuple = (), dictionary_output=True, batch_size: int = 1000, timeout_ms: int = None
+    ) -> typing.Iterator[typing.Dict]:
+        """
+        Stream select results from unbuffered cursor in batches. Only one batch of rows is kept in memory.
+        Connection can't be used for another query until iterator is exhausted or closed.
+        :param sql: SQL select
+        :param sql_args: Tuple of positioned SQL arguments. It will safely replace "%s" sequences.
+        :param dictionary_output: Rows as dicts
+        :param batch_size: Number of rows fetched from cursor at once
+        :param timeout_ms: Client read timeout of every read from server, see `QUERY_TIMEOUT_GRACE_MS`
+        :raise QueryTimeoutException: Execution time limit of query was exceeded
+        """
+        cursor = None
+        try:
+            if self._get_connection().is_connected():
+                if ExplainCapture.is_enabled:
+                    ExplainCapture.capture(self._get_connection(), sql, sql_args, self.profile)
+                cursor = self._get_connection().cursor(dictionary=dictionary_output)
+                Logger.log.debug("DBI.fetch_iter", sql=sql)
+                with self._read_timeout(timeout_ms):
+                    cursor.execute(sql, sql_args)
+                    records = cursor.fetchmany(batch_size)
+                while records:
+                    yield from records
+                    with self._read_timeout(timeout_ms):
+                        records = cursor.fetchmany(batch_size)
+        except Error as ex:
+            Logger.log.exception("DBI.fetch_iter", message=ex)
+            timeout_ex = self._get_timeout_error(ex, timeout_ms)
+            if timeout_ex is not None:
+                raise timeout_ex from ex
+            raise ex
+        finally:
+            if self._get_connection().is_connected():
+                if cursor:
+                    # iterator closed before all rows were read
+                    if self._get_connection().unread_result:
+                        self._get_connection().consume_results()
+                    cursor.close()
+
+            self._close_connection()
+
+    @contextmanager
+    def _read_timeout(self, timeout_ms: typing.Optional[int]):
+        """
+        Limit time of waiting for server response on current connection. Only pure Python connector exposes socket
+        timeout, C extension keeps `connection_timeout` option of connection.
+        """
+        connection_socket = getattr(self._connection, "_socket", None) if timeout_ms else None
+        set_timeout = getattr(connection_socket, "set_connection_timeout", None)
+        if set_timeout is None:
+            yield
+            return
+        previous_timeout = getattr(connection_socket, "_connection_timeout", None)
+        set_timeout((timeout_ms + DBI.QUERY_TIMEOUT_GRACE_MS) / 1000)
+        try:
+            yield
+        finally:
+            set_timeout(previous_timeout)
+
+    def _get_timeout_error(self, ex: Error, timeout_ms: typing.Optional[int]) -> typing.Optional[QueryTimeoutException]:
+        """
+        Connection whose client read timeout expired is disconnected, so pool reconnects it before next use
+        :return: Typed error if query exceeded its time limit
+        """
+        if ex.errno in (ER_QUERY_TIMEOUT, ER_STATEMENT_TIMEOUT):
+            return QueryTimeoutException(timeout_ms, False, ex)
+        if timeout_ms and ex.errno in (CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED):
+            # response was read only partially, connection must not be reused as it is
+            Logger.log.warning("DBI.query_timeout.disconnect", timeout_ms=timeout_ms, errno=ex.errno)
+            try:
+                self._connection.disconnect()
+            except Error as disconnect_ex:
+                Logger.log.exception("DBI.query_timeout.disconnect", message=disconnect_ex)
+            return QueryTimeoutException(timeout_ms, True, ex)
+        return None
+
     @classmethod
     def use_self_dbi(cls, dbi_attr_name: str = "dbi"):
         """
@@ -207,17 +515,21 @@ class DBI:
         return decorator
 
     @classmethod
-    def pass_dbi(cls, pass_dbi_as: str = "dbi"):
+    def pass_dbi(cls, pass_dbi_as: str = "dbi", use_identity_map: bool = False, profile: str = None):
         """
         Pass DBI instasnce into wrapped method
         :param pass_dbi_as: Name of argument for passing DBI instance. "dbi" is default.
+        :param use_identity_map: Managers working with passed DBI instance share one identity map of loaded models.
+        :param profile: Name of connection profile, default profile is used if not set
         """
 
         def decorator(fnc):
             @wraps(fnc)
             def wrapper(*args, **kwargs):
-                dbi = cls()
+                dbi = cls(profile=profile)
                 dbi._is_in_pass_dbi = True
+                if use_identity_map:
+                    dbi.identity_map = IdentityMap()
                 Logger.log.debug("DBI.pass_dbi.start")
                 try:
                     kwargs[pass_dbi_as] = dbi
@@ -226,6 +538,7 @@ class DBI:
                     raise ex
                 finally:
                     dbi._is_in_pass_dbi = False
+                    dbi.identity_map = None
                     Logger.log.debug("DBI.pass_dbi.done")
                     dbi._close_connection()
                 return ret
@@ -235,7 +548,13 @@ class DBI:
         return decorator
 
     @classmethod
-    def transaction(cls, pass_dbi_as: str = "dbi"):
+    def transaction(
+        cls,
+        pass_dbi_as: str = "dbi",
+        use_identity_map: bool = False,
+        profile: str = None,
+        retry_policy: RetryPolicy = None,
+    ):
         """
         Transaction wrapper
 
@@ -258,35 +577,121 @@ class DBI:
                 manager.insert_one(mod)\n
 
         :param pass_dbi_as: Name of argument for passing DBI instance. "dbi" is default.
+        :param use_identity_map: Managers working with passed DBI instance share one identity map of loaded models.
+        :param profile: Name of connection profile, default profile is used if not set
+        :param retry_policy: Run wrapped function again in new transaction if it fails with retryable error
+            (e.g. deadlock), see `RetryPolicy`. Wrapped function has to be safe to run more times.
         """
 
         def decorator(fnc):
+            run_transaction = cls._transaction_wrapper(fnc, pass_dbi_as, use_identity_map, profile)
+            if retry_policy is None:
+                return run_transaction
+
             @wraps(fnc)
             def wrapper(*args, **kwargs):
-                dbi = cls()
-                dbi._is_in_transaction = True
-                Logger.log.debug("DBI.transaction.start")
-                dbi._get_connection().start_transaction()
-                try:
-                    kwargs[pass_dbi_as] = dbi
-                    ret = fnc(*args, **kwargs)
-                except Exception as ex:
-                    Logger.log.exception("DBI.transaction.rollback", message=ex)
-                    dbi._get_connection().rollback()
-                    raise
-                else:
-                    dbi._is_in_transaction = False
-                    dbi._commit()
-                finally:
-                    dbi._is_in_transaction = False
-                    Logger.log.debug("DBI.transaction.done")
-                    dbi._close_connection()
-                return ret
+                attempt = 1
+                while True:
+                    retry_policy.on_attempt(attempt)
+                    try:
+                        ret = run_transaction(*args, **kwargs)
+                    except Exception as ex:
+                        delay = retry_policy.on_error(ex, attempt)
+                        if delay is None:
+                            raise
+                        Logger.log.warning(
+                            "DBI.transaction.retry", attempt=attempt, errno=getattr(ex, "errno", None), delay=delay
+                        )
+                        retry_policy.sleep(delay)
+                        attempt += 1
+                    else:
+                        retry_policy.on_success(attempt)
+                        return ret
 
             return wrapper
 
         return decorator
 
+    @classmethod
+    def _transaction_wrapper(
+        cls, fnc: typing.Callable, pass_dbi_as: str, use_identity_map: bool, profile: typing.Optional[str]
+    ) -> typing.Callable:
+        """
+        Run function in one transaction on new DBI instance
+        """
+
+        @wraps(fnc)
+        def wrapper(*args, **kwargs):
+            dbi = cls(profile=profile)
+            dbi._is_in_transaction = True
+            if use_identity_map:
+                dbi.identity_map = IdentityMap()
+            Logger.log.debug("DBI.transaction.start")
+            dbi._get_connection().start_transaction()
+            try:
+                kwargs[pass_dbi_as] = dbi
+                ret = fnc(*args, **kwargs)
+            except Exception as ex:
+                Logger.log.exception("DBI.transaction.rollback", message=ex)
+                # connection discarded after query timeout has no transaction to roll back
+                if dbi._get_connection().is_connected():
+                    dbi._get_connection().rollback()
+                raise
+            else:
+                dbi._is_in_transaction = False
+                dbi._commit()
+            finally:
+                dbi._is_in_transaction = False
+                dbi.identity_map = None
+                Logger.log.debug("DBI.transaction.done")
+                dbi._close_connection()
+            return ret
+
+        return wrapper
+
+    @classmethod
+    @contextmanager
+    def unit_of_work(cls, transaction: bool = False, profile: str = None):
+        """
+        Context manager keeping one DB connection and identity map of loaded models for all managers created with
+        yielded DBI instance. `select_one` by primary keys is served from identity map, writes update it.
+
+        How to use it:
+            with DBI.unit_of_work() as dbi:\n
+                manager = CustomersManager(dbi=dbi)\n
+                customer = manager.select_one(103)\n
+                customer is manager.select_one(103)  # True, no other query executed\n
+
+        :param transaction: Run unit of work in transaction. Commit on exit, rollback on exception.
+        :param profile: Name of connection profile, default profile is used if not set
+        """
+        dbi = cls(profile=profile)
+        dbi.identity_map = IdentityMap()
+        if transaction:
+            dbi._is_in_transaction = True
+            dbi._get_connection().start_transaction()
+        else:
+            dbi._is_in_pass_dbi = True
+        Logger.log.debug("DBI.unit_of_work.start", transaction=transaction)
+        try:
+            yield dbi
+        except Exception as ex:
+            if transaction:
+                Logger.log.exception("DBI.unit_of_work.rollback", message=ex)
+                if dbi._get_connection().is_connected():
+                    dbi._get_connection().rollback()
+            raise
+        else:
+            if transaction:
+                dbi._is_in_transaction = False
+                dbi._commit()
+        finally:
+            dbi._is_in_transaction = False
+            dbi._is_in_pass_dbi = False
+            dbi.identity_map = None
+            Logger.log.debug("DBI.unit_of_work.done")
+            dbi._close_connection()
+
     def _commit(self):
         if not self._is_in_transaction:
             Logger.log.debug("DBI._commit")
@@ -308,3 +713,7 @@ class DBI:
         self._connection = None
 
         return False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DBI._after_fork_in_child)
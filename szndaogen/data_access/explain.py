@@ -0,0 +1,267 @@
+import json
+import re
+import threading
+import typing
+from contextlib import contextmanager
+
+from mysql.connector import Error
+
+from ..tools.log import Logger
+
+SCAN_ACCESS_TYPES = ("ALL", "index")
+""" Access types reading whole table or whole index """
+
+
+class TablePlan(typing.NamedTuple):
+    table: str
+    access_type: str
+    key: typing.Optional[str]
+    """ Index used, None => no index """
+    rows_examined: typing.Optional[int]
+    """ Estimated rows read per scan of table """
+    possible_keys: typing.Tuple[str, ...] = ()
+
+    def is_scan(self, rows_threshold: int = 0) -> bool:
+        """
+        :param rows_threshold: Minimal number of examined rows
+        """
+        return self.access_type in SCAN_ACCESS_TYPES and (self.rows_examined or 0) >= rows_threshold
+
+
+class QueryPlan(typing.NamedTuple):
+    fingerprint: str
+    """ SQL with literals and hints removed, see `ExplainCapture.get_fingerprint` """
+    sql: str
+    """ First executed SQL of fingerprint, the one which was explained """
+    profile: str
+    executions: int
+    tables: typing.Tuple[TablePlan, ...]
+    error: typing.Optional[str] = None
+    """ Error of EXPLAIN, plan is unknown """
+
+    def get_scans(self, rows_threshold: int = 0) -> typing.List[TablePlan]:
+        return [table_plan for table_plan in self.tables if table_plan.is_scan(rows_threshold)]
+
+
+def parse_plan(plan: typing.Dict) -> typing.Tuple[TablePlan, ...]:
+    """
+    :param plan: Output of `EXPLAIN FORMAT=JSON`
+    :return: Access of every table of plan including joined tables and subqueries
+    """
+    return tuple(_iter_table_plans(plan))
+
+
+def _iter_table_plans(node) -> typing.Iterator[TablePlan]:
+    if isinstance(node, dict):
+        table = node.get("table")
+        if isinstance(table, dict) and "access_type" in table:
+            # MySQL 5.6 reports "rows", newer versions "rows_examined_per_scan"
+            rows_examined = table.get("rows_examined_per_scan", table.get("rows"))
+            yield TablePlan(
+                table=table.get("table_name"),
+                access_type=table["access_type"],
+                key=table.get("key"),
+                rows_examined=int(rows_examined) if rows_examined is not None else None,
+                possible_keys=tuple(table.get("possible_keys") or ()),
+            )
+        for value in node.values():
+            yield from _iter_table_plans(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_table_plans(item)
+
+
+class ExplainCapture:
+    """
+    Test and development mode capturing plans of selects. First execution of every distinct SQL fingerprint through
+    `DBI.fetch_one`, `fetch_all` or `fetch_iter` is explained by `EXPLAIN FORMAT=JSON` on the same connection,
+    following executions are only counted. Table scans examining at least `scan_rows_threshold` rows are logged
+    and flagged in report. Disabled capture costs one attribute check per fetch.
+
+    How to use it (e.g. in session fixture of pytest):
+        with ExplainCapture.capturing(scan_rows_threshold=1000):\n
+            ...\n
+        ExplainCapture.write_report("explain-report.txt")\n
+        ExplainCapture.get_flagged_plans()  # plans with scans over threshold\n
+    """
+
+    is_enabled: bool = False
+    scan_rows_threshold: int = 1000
+
+    LITERAL_REGEX = re.compile(
+        r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|(?<![\w`.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.I
+    )
+    HINTS_REGEX = re.compile(r"/\*\+.*?\*/", re.S)
+    _IN_LIST_ITEM = r"(?:\?|\(\s*\?(?:\s*,\s*\?)*\s*\))"
+    IN_LIST_REGEX = re.compile(rf"\bIN\s*\(\s*{_IN_LIST_ITEM}(?:\s*,\s*{_IN_LIST_ITEM})*\s*\)", re.I)
+
+    _lock = threading.Lock()
+    _plans: typing.Dict[typing.Tuple[str, str], typing.List] = {}
+
+    @classmethod
+    def enable(cls, scan_rows_threshold: int = None):
+        """
+        :param scan_rows_threshold: Minimal number of examined rows of flagged table scan
+        """
+        if scan_rows_threshold is not None:
+            cls.scan_rows_threshold = scan_rows_threshold
+        cls.is_enabled = True
+
+    @classmethod
+    def disable(cls):
+        cls.is_enabled = False
+
+    @classmethod
+    def reset(cls):
+        """
+        Drop captured plans
+        """
+        with cls._lock:
+            cls._plans = {}
+
+    @classmethod
+    @contextmanager
+    def capturing(cls, scan_rows_threshold: int = None):
+        """
+        Enable capture in `with` block, previous state is restored on exit
+        """
+        previous = (cls.is_enabled, cls.scan_rows_threshold)
+        cls.enable(scan_rows_threshold)
+        try:
+            yield cls
+        finally:
+            cls.is_enabled, cls.scan_rows_threshold = previous
+
+    @classmethod
+    def get_fingerprint(cls, sql: str) -> str:
+        """
+        :return: SQL with optimizer hints removed, literals replaced by "?" and IN lists collapsed
+        """
+        fingerprint = cls.HINTS_REGEX.sub("", sql)
+        fingerprint = cls.LITERAL_REGEX.sub("?", fingerprint.replace("%s", "?"))
+        fingerprint = cls.IN_LIST_REGEX.sub("IN (...)", fingerprint)
+        return " ".join(fingerprint.split())
+
+    @classmethod
+    def capture(cls, connection, sql: str, sql_args: typing.Sequence = (), profile: str = None):
+        """
+        Explain select if its fingerprint was not explained yet, called by DBI fetch methods
+        :param connection: Connection the select is run on
+        :param sql: SQL select
+        :param sql_args: Positional params of select
+        :param profile: Name of connection profile
+        """
+        key = (profile, cls.get_fingerprint(sql))
+        with cls._lock:
+            captured = cls._plans.get(key)
+            if captured is not None:
+                captured[2] += 1
+                return
+            # [sql, profile, executions, tables, error], tables are filled after EXPLAIN
+            captured = cls._plans[key] = [sql, profile, 1, (), None]
+
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"EXPLAIN FORMAT=JSON {sql}", tuple(sql_args))
+            rows = cursor.fetchall()
+            plan = rows[0][0] if rows else "{}"
+            tables = parse_plan(json.loads(plan) if isinstance(plan, (str, bytes, bytearray)) else plan)
+        except (Error, ValueError) as ex:
+            Logger.log.warning("ExplainCapture.capture.error", message=ex, sql=sql)
+            with cls._lock:
+                captured[4] = str(ex)
+            return
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+        with cls._lock:
+            captured[3] = tables
+        for table_plan in tables:
+            if table_plan.is_scan(cls.scan_rows_threshold):
+                Logger.log.warning(
+                    "ExplainCapture.capture.scan",
+                    table=table_plan.table,
+                    access_type=table_plan.access_type,
+                    rows_examined=table_plan.rows_examined,
+                    sql=sql,
+                )
+
+    @classmethod
+    def get_plans(cls) -> typing.List[QueryPlan]:
+        """
+        :return: Captured plans ordered by number of executions
+        """
+        with cls._lock:
+            plans = [
+                QueryPlan(fingerprint, sql, profile, executions, tables, error)
+                for (_, fingerprint), (sql, profile, executions, tables, error) in cls._plans.items()
+            ]
+        return sorted(plans, key=lambda plan: (-plan.executions, plan.fingerprint))
+
+    @classmethod
+    def get_flagged_plans(cls, scan_rows_threshold: int = None) -> typing.List[QueryPlan]:
+        """
+        :param scan_rows_threshold: Minimal number of examined rows of table scan, default `scan_rows_threshold`
+        :return: Plans with at least one table scan over threshold
+        """
+        threshold = cls.scan_rows_threshold if scan_rows_threshold is None else scan_rows_threshold
+        return [plan for plan in cls.get_plans() if plan.get_scans(threshold)]
+
+    @classmethod
+    def get_report(cls, scan_rows_threshold: int = None) -> str:
+        """
+        :param scan_rows_threshold: Minimal number of examined rows of flagged table scan, default `scan_rows_threshold`
+        :return: Human readable report of flagged scans and all captured plans
+        """
+        threshold = cls.scan_rows_threshold if scan_rows_threshold is None else scan_rows_threshold
+        plans = cls.get_plans()
+        flagged_plans = [plan for plan in plans if plan.get_scans(threshold)]
+        lines = [
+            f"EXPLAIN capture: {len(plans)} distinct queries, {len(flagged_plans)} with table scan "
+            f"over {threshold} rows",
+        ]
+        if flagged_plans:
+            lines += ["", "FLAGGED SCANS"]
+            for plan in flagged_plans:
+                for table_plan in plan.get_scans(threshold):
+                    lines.append(
+                        f"{table_plan.table} access_type={table_plan.access_type} key={table_plan.key or '-'} "
+                        f"rows={table_plan.rows_examined} executions={plan.executions} profile={plan.profile}"
+                    )
+                lines.append(f"    {plan.fingerprint}")
+        lines += ["", "ALL QUERIES"]
+        for plan in plans:
+            if plan.error is not None:
+                access = f"error: {plan.error}"
+            else:
+                access = ", ".join(
+                    f"{table_plan.table}:{table_plan.access_type}:{table_plan.key or '-'}:{table_plan.rows_examined}"
+                    for table_plan in plan.tables
+                ) or "no table"
+            lines.append(f"{plan.executions:>6}x  {access}")
+            lines.append(f"    {plan.fingerprint}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def write_report(cls, path: str, scan_rows_threshold: int = None):
+        """
+        Save report of `get_report`
+        :param path: Output file path
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(cls.get_report(scan_rows_threshold))
+
+    @classmethod
+    def dump_json(cls, path: str):
+        """
+        Save captured plans as JSON list for other tools
+        :param path: Output file path
+        """
+        plans = [
+            dict(plan._asdict(), tables=[table_plan._asdict() for table_plan in plan.tables])
+            for plan in cls.get_plans()
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plans, f, indent=2)
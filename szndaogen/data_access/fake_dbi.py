@@ -0,0 +1,75 @@
+import re
+import typing
+
+from .db import DBI
+
+
+class FakeDBI(DBI):
+    """
+    In-memory DBI of manager tests, no connection is opened.
+    Every statement is recorded in `queries` (whitespace collapsed), writes also in `executed` with their params.
+    Selects return copies of `rows` (or of `tables[<table name>]`) filtered by `column = %s` and `column IN (...)`
+    conditions, writes return 1 or number of rows of bulk.
+    """
+
+    CONDITION_REGEX = re.compile(r"`?(\w+)`? = %s")
+    IN_CONDITION_REGEX = re.compile(r"WHERE `?(\w+)`? IN \(")
+
+    def __init__(
+        self,
+        rows: typing.List[typing.Dict] = None,
+        tables: typing.Dict[str, typing.List[typing.Dict]] = None,
+        profile: str = None,
+    ):
+        """
+        :param rows: Rows of every table
+        :param tables: Rows per table name, used instead of `rows`
+        :param profile: See `DBI.__init__`
+        """
+        super().__init__(profile=profile)
+        self.rows = rows or []
+        self.tables = tables
+        self.queries: typing.List[str] = []
+        self.executed: typing.List[typing.Tuple[str, list]] = []
+        self.on_write: typing.Callable[[str, typing.Sequence], None] = None
+        """ Called before write is recorded, e.g. to raise error or block writing thread """
+
+    def fetch_one(self, sql, sql_args: tuple = (), dictionary_output=True, timeout_ms: int = None) -> typing.Dict:
+        rows = self._select(sql, sql_args)
+        return rows[0] if rows else None
+
+    def fetch_all(
+        self, sql, sql_args: tuple = (), dictionary_output=True, timeout_ms: int = None
+    ) -> typing.List[typing.Dict]:
+        return self._select(sql, sql_args)
+
+    def fetch_iter(
+        self, sql, sql_args: tuple = (), dictionary_output=True, batch_size: int = 1000, timeout_ms: int = None
+    ) -> typing.Iterator[typing.Dict]:
+        # query is sent on first iteration like by DBI
+        yield from self._select(sql, sql_args)
+
+    def execute(self, sql: str, sql_args: typing.Tuple = ()) -> int:
+        self._write(sql, list(sql_args))
+        return 1
+
+    def execute_many(self, sql: str, sql_args: typing.List[typing.Tuple]) -> int:
+        self._write(sql, [list(args) for args in sql_args])
+        return len(sql_args)
+
+    def _select(self, sql: str, sql_args: typing.Sequence) -> typing.List[typing.Dict]:
+        self.queries.append(" ".join(sql.split()))
+        rows = self.rows if self.tables is None else self.tables[sql.split("`")[1]]
+        in_condition = self.IN_CONDITION_REGEX.search(sql)
+        if in_condition:
+            rows = [row for row in rows if row[in_condition.group(1)] in sql_args]
+        else:
+            for column, value in zip(self.CONDITION_REGEX.findall(sql), sql_args):
+                rows = [row for row in rows if row[column] == value]
+        return [dict(row) for row in rows]
+
+    def _write(self, sql: str, sql_args: list):
+        self.queries.append(" ".join(sql.split()))
+        if self.on_write is not None:
+            self.on_write(sql, sql_args)
+        self.executed.append((sql, sql_args))
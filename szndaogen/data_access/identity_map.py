@@ -0,0 +1,79 @@
+import typing
+
+from .model_base import ModelBase
+from ..tools.log import Logger
+
+
+class IdentityMap:
+    """
+    First level cache of model instances loaded within one unit of work.
+    Instances are stored under (`TABLE_NAME`, primary key values tuple) key, so one database row is always
+    represented by one model instance inside the unit of work.
+    """
+
+    def __init__(self):
+        self._models: typing.Dict[typing.Tuple, ModelBase] = {}
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key: typing.Tuple) -> bool:
+        return key in self._models
+
+    @staticmethod
+    def make_key(table_name: str, primary_key_values: typing.Iterable) -> typing.Tuple:
+        return table_name, tuple(primary_key_values)
+
+    @classmethod
+    def model_key(cls, model_instance: ModelBase) -> typing.Optional[typing.Tuple]:
+        """
+        Build identity key of model instance
+        :param model_instance: Model instance
+        :return: Identity key or None if model has no primary keys or any primary key value is empty
+        """
+        primary_keys = model_instance.Meta.PRIMARY_KEYS
+        if not primary_keys:
+            return None
+        values = [model_instance.model_data.get(attribute_name) for attribute_name in primary_keys]
+        if any(value is None for value in values):
+            return None
+        return cls.make_key(model_instance.Meta.TABLE_NAME, values)
+
+    def get(self, key: typing.Tuple) -> typing.Optional[ModelBase]:
+        model_instance = self._models.get(key)
+        Logger.log.debug("IdentityMap.get", key=key, hit=model_instance is not None)
+        return model_instance
+
+    def add(self, model_instance: ModelBase) -> ModelBase:
+        """
+        Register model instance. If instance with the same identity exists already it is kept and returned instead.
+        :param model_instance: Model instance
+        :return: Registered model instance
+        """
+        key = self.model_key(model_instance)
+        if key is None:
+            return model_instance
+        return self._models.setdefault(key, model_instance)
+
+    def put(self, model_instance: ModelBase) -> ModelBase:
+        """
+        Register model instance and replace the previous one with the same identity.
+        :param model_instance: Model instance
+        :return: Registered model instance
+        """
+        key = self.model_key(model_instance)
+        if key is not None:
+            self._models[key] = model_instance
+        return model_instance
+
+    def evict(self, model_instance: ModelBase):
+        key = self.model_key(model_instance)
+        if key is not None:
+            self._models.pop(key, None)
+
+    def evict_table(self, table_name: str):
+        for key in [key for key in self._models if key[0] == table_name]:
+            del self._models[key]
+
+    def clear(self):
+        self._models.clear()
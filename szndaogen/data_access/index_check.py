@@ -0,0 +1,159 @@
+import collections
+import re
+import threading
+import typing
+
+from .model_base import ModelBase
+from ..tools.log import Logger
+
+
+class IndexUsageChecker:
+    """
+    Development mode checker of SQL conditions and order by columns against `Model.Meta.INDEXES`.
+    It is called by managers if `Config.MANAGER_CHECK_INDEXES` is enabled and logs warning once for every query shape
+    which will not use any index. Check is heuristic, only plain column references of table are recognized.
+    At most `MAX_REPORTED` recently checked query shapes are remembered, older ones can be reported again.
+    """
+
+    STRING_LITERAL_REGEX = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+    COMPARISON_REGEX = re.compile(
+        r"(?<![\w`.])(?:`?(\w+)`?\s*\.\s*)?`?(\w+)`?\s*"
+        r"(<=>|<>|!=|<=|>=|=|<|>|\bNOT\s+IN\b|\bIN\b|\bNOT\s+LIKE\b|\bLIKE\b|\bNOT\s+BETWEEN\b|\bBETWEEN\b|\bIS\b)",
+        re.I,
+    )
+    ORDER_BY_COLUMN_REGEX = re.compile(r"^(?:`?(\w+)`?\s*\.\s*)?`?(\w+)`?(?:\s+(?:ASC|DESC))?$", re.I)
+    EQUALITY_OPERATORS = ("=", "<=>", "IN", "IS")
+    INDEX_TYPES_FOR_LOOKUP = ("BTREE", "HASH")
+
+    MAX_REPORTED = 10000
+
+    _lock = threading.Lock()
+    _reported: "collections.OrderedDict[typing.Tuple, None]" = collections.OrderedDict()
+
+    @classmethod
+    def reset(cls):
+        """
+        Forget reported query shapes
+        """
+        with cls._lock:
+            cls._reported = collections.OrderedDict()
+
+    @classmethod
+    def check(
+        cls, model_class: typing.Type[ModelBase], condition: str, order_by: typing.Tuple = (), manager_name: str = None
+    ) -> typing.List[str]:
+        """
+        Log warning if condition or order by will not use any index of model table
+        :param model_class: Model class with `Meta.INDEXES`
+        :param condition: SQL condition
+        :param order_by: Params for SQL order by statement
+        :param manager_name: Name of manager for log record
+        :return: Warning messages, empty if query is fine or it was already reported
+        """
+        report_key = (model_class, condition, tuple(order_by))
+        with cls._lock:
+            if report_key in cls._reported:
+                cls._reported.move_to_end(report_key)
+                return []
+            cls._reported[report_key] = None
+            if len(cls._reported) > cls.MAX_REPORTED:
+                cls._reported.popitem(last=False)
+
+        messages = cls.get_warnings(model_class, condition, order_by)
+        for message in messages:
+            Logger.log.warning(
+                "IndexUsageChecker.check",
+                message=message,
+                manager=manager_name,
+                condition=condition,
+                order_by=order_by,
+            )
+        return messages
+
+    @classmethod
+    def get_warnings(
+        cls, model_class: typing.Type[ModelBase], condition: str, order_by: typing.Tuple = ()
+    ) -> typing.List[str]:
+        meta = model_class.Meta
+        indexes = getattr(meta, "INDEXES", None)
+        if indexes is None or meta.TABLE_TYPE != "BASE TABLE":
+            return []
+
+        table_name = meta.TABLE_NAME
+        index_columns = [
+            tuple(index.columns) for index in indexes.values() if index.index_type in cls.INDEX_TYPES_FOR_LOOKUP
+        ]
+        messages = []
+
+        condition_columns, has_or = cls.parse_condition(model_class, condition or "")
+        if condition_columns:
+            leading_columns = {columns[0] for columns in index_columns}
+            used_columns = [column for column in condition_columns if column in leading_columns]
+            if not used_columns or (has_or and len(used_columns) < len(condition_columns)):
+                unused_columns = [column for column in condition_columns if column not in leading_columns]
+                messages.append(
+                    "Condition on column(s) {} of table `{}` will not use any index.".format(
+                        ", ".join(unused_columns), table_name
+                    )
+                )
+
+        if order_by:
+            order_by_columns = cls.parse_order_by(model_class, order_by)
+            equality_columns = {column for column, is_equality in condition_columns.items() if is_equality}
+            if order_by_columns is None or not any(
+                cls._is_order_by_prefix(columns, order_by_columns, equality_columns) for columns in index_columns
+            ):
+                messages.append(
+                    "Order by {} of table `{}` will not use any index.".format(", ".join(order_by), table_name)
+                )
+
+        return messages
+
+    @classmethod
+    def parse_condition(cls, model_class: typing.Type[ModelBase], condition: str) -> typing.Tuple[typing.Dict, bool]:
+        """
+        :return: Columns of table compared in condition with flag of equality comparison, `True` if condition has OR
+        """
+        masked_condition = cls.STRING_LITERAL_REGEX.sub("''", condition)
+        columns = {}
+        for table_name, column, operator in cls.COMPARISON_REGEX.findall(masked_condition):
+            if not cls._is_table_column(model_class, table_name, column):
+                continue
+            is_equality = re.sub(r"\s+", " ", operator.upper()) in cls.EQUALITY_OPERATORS
+            columns[column] = columns.get(column, False) or is_equality
+        return columns, bool(re.search(r"\bOR\b|\|\|", masked_condition, re.I))
+
+    @classmethod
+    def parse_order_by(
+        cls, model_class: typing.Type[ModelBase], order_by: typing.Tuple
+    ) -> typing.Optional[typing.List[str]]:
+        """
+        :return: Ordered columns of table or None if some item is not plain column of table
+        """
+        columns = []
+        for item in order_by:
+            found = cls.ORDER_BY_COLUMN_REGEX.match(item.strip())
+            if not found or not cls._is_table_column(model_class, found.group(1), found.group(2)):
+                return None
+            columns.append(found.group(2))
+        return columns
+
+    @staticmethod
+    def _is_table_column(model_class: typing.Type[ModelBase], table_name: str, column: str) -> bool:
+        if table_name and table_name != model_class.Meta.TABLE_NAME:
+            return False
+        return column in model_class.Meta.ATTRIBUTE_LIST
+
+    @staticmethod
+    def _is_order_by_prefix(
+        index_columns: typing.Tuple[str, ...], order_by_columns: typing.List[str], equality_columns: typing.Set[str]
+    ) -> bool:
+        # leading index columns compared by equality in condition do not break index order
+        position = 0
+        while (
+            position < len(index_columns)
+            and index_columns[position] in equality_columns
+            and index_columns[position] not in order_by_columns
+        ):
+            position += 1
+        return list(index_columns[position:position + len(order_by_columns)]) == order_by_columns
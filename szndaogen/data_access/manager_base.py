@@ -1,9 +1,19 @@
+import copy
+import importlib
+import re
+import threading
 import typing
 
 from ..tools.log import Logger
 
 from .db import DBI
-from .model_base import ModelBase
+from .identity_map import IdentityMap
+from .index_check import IndexUsageChecker
+from .model_base import ModelBase, Relation
+from .partitions import PartitionPruner
+from .profiling import ManagerProfiler
+from .sharding import ShardRouter, merge_sorted, parse_order_by
+from .single_flight import SingleFlight
 from ..config import Config
 
 
@@ -11,18 +21,63 @@ class ManagerException(BaseException):
     pass
 
 
+SELECT_REGEX = re.compile(r"^\s*SELECT\b", re.I)
+
+
+def _copy_row(row: typing.Optional[typing.Dict]) -> typing.Optional[typing.Dict]:
+    return dict(row) if row else row
+
+
+def _copy_rows(rows: typing.List[typing.Dict]) -> typing.List[typing.Dict]:
+    return [dict(row) for row in rows] if rows else rows
+
+
+def _timeout_kwargs(timeout_ms: typing.Optional[int]) -> typing.Dict[str, int]:
+    # DBI fetch methods get time limit only if it is set, so DBI replacements without it keep working
+    return {"timeout_ms": timeout_ms} if timeout_ms else {}
+
+
 class ViewManagerBase:
     MODEL_CLASS = ModelBase
+    SINGLE_FLIGHT_READS: bool = None
+    """ Coalesce identical concurrent `select_one` and `select_all` queries, None => `Config.MANAGER_SINGLE_FLIGHT_READS` """
+
+    _single_flight = SingleFlight()
+    _projection_model_classes: typing.Dict[typing.Tuple, typing.Type[ModelBase]] = {}
 
     def __init__(self, dbi: DBI = None):
         """
         Init function of base model manager class
         :param dbi: Instance of database connector. If empty it will be created automatically. Instance of DBI is usualy used with combination of transaction wrapper @DBI.transaction("dbi")
         """
-        self.dbi = DBI() if dbi is None else dbi
+        self._shard_router: ShardRouter = getattr(self.MODEL_CLASS.Meta, "SHARD_ROUTER", None)
+        self._shard_managers: typing.Dict[str, ViewManagerBase] = {}
+        # shard managers are created lazily also from threads of `ShardRouter.map`
+        self._shard_managers_lock = threading.Lock()
+        if self._shard_router is not None:
+            if not getattr(self.MODEL_CLASS.Meta, "SHARD_KEY", None):
+                raise ManagerException(f"Sharded {self.MODEL_CLASS.__name__} has no Meta.SHARD_KEY.")
+            # manager without DBI routes queries to shards, manager with DBI works on shard of the DBI only
+            if dbi is not None and getattr(dbi, "profile", DBI.DEFAULT_PROFILE) not in self._shard_router.shards:
+                raise ManagerException(
+                    f"{self.__class__.__name__} works with shards {', '.join(self._shard_router.shards)}, "
+                    f"but DBI instance of profile '{dbi.profile}' was passed."
+                )
+        else:
+            profile = getattr(self.MODEL_CLASS.Meta, "DB_PROFILE", None) or DBI.DEFAULT_PROFILE
+            if dbi is None:
+                dbi = DBI(profile=profile)
+            elif getattr(dbi, "profile", DBI.DEFAULT_PROFILE) != profile:
+                raise ManagerException(
+                    f"{self.__class__.__name__} works with DB profile '{profile}', "
+                    f"but DBI instance of profile '{dbi.profile}' was passed."
+                )
+        self.dbi = dbi
         self.bulk_insert_buffer_size = 50
         self.bulk_insert_sql_statement = ""
         self.bulk_insert_values_buffer = []
+        self.bulk_insert_columns: typing.Tuple[str, ...] = ()
+        """ Columns of buffered bulk insert statement """
 
     @classmethod
     def create_model_instance(cls, init_data: dict = None) -> ModelBase:
@@ -31,6 +86,7 @@ class ViewManagerBase:
 
         return cls.MODEL_CLASS(init_data)
 
+    @ManagerProfiler.profile_method
     def select_one(
         self,
         *args,
@@ -38,6 +94,8 @@ class ViewManagerBase:
         condition_params: typing.Tuple = (),
         projection: typing.Tuple = (),
         order_by: typing.Tuple = (),
+        partitions: typing.Tuple = (),
+        timeout_ms: int = None,
     ) -> ModelBase:
         """
         Select one row from DB table or View
@@ -47,44 +105,105 @@ class ViewManagerBase:
         :param condition_params: Positional params for SQL condition
             (Will be used if there are no positional args from primary keys)
         :param order_by: Params for SQL order by statement
+        :param partitions: Names of table partitions to read from, see `get_partitions`
+        :param timeout_ms: Execution time limit of query, None => `Model.Meta.QUERY_TIMEOUT_MS`, 0 => no limit
+        :raise QueryTimeoutException: Query exceeded its time limit
         """
-        base_condition = self.MODEL_CLASS.Meta.SQL_STATEMENT_WHERE_BASE
-
-        if args:
-            condition = self._prepare_primary_sql_condition()
-            condition_params = args
-
-        projection_statement = ", ".join(projection) if projection else "*"
-        order_by_sql_format = ", ".join(order_by)
-        limit = 1
-
-        if base_condition == "1":
-            where_statement = f"WHERE ({condition})" if condition else ""
-        else:
-            where_statement = f"WHERE {base_condition} AND ({condition})" if condition else f"WHERE {base_condition}"
+        if self._shard_router is not None:
+            shard_key = self.MODEL_CLASS.Meta.SHARD_KEY
+            primary_keys = self.MODEL_CLASS.Meta.PRIMARY_KEYS
+            kwargs = dict(
+                condition=condition,
+                condition_params=condition_params,
+                projection=projection,
+                order_by=order_by,
+                partitions=partitions,
+                timeout_ms=timeout_ms,
+            )
+            if args and shard_key in primary_keys:
+                shard_manager = self._get_shard_manager_by_key(args[primary_keys.index(shard_key)])
+                if shard_manager is not None:
+                    return shard_manager.select_one(*args, **kwargs)
+            elif self.dbi is None:
+                merge_order_by = self._get_merge_order_by(order_by)
+                results = self._shard_router.map(
+                    lambda shard: self._get_shard_manager(shard).select_one(*args, **kwargs)
+                )
+                merged = merge_sorted(
+                    [[item] for item in results if item is not None],
+                    merge_order_by,
+                    string_sort_key=self._shard_router.string_sort_key,
+                )
+                return next(merged, None)
 
-        order_by_statement = f"ORDER BY {order_by_sql_format}" if order_by else ""
-        limit_statement = f"LIMIT {limit}" if limit else ""
+        base_condition = self.MODEL_CLASS.Meta.SQL_STATEMENT_WHERE_BASE
+        partition_statement = self._prepare_partition_statement(partitions, self.MODEL_CLASS.Meta.SQL_STATEMENT)
+        # row mapped from other partition must not be returned for select restricted to partitions
+        identity_map = self._get_identity_map() if args and not projection and not partitions else None
+
+        if identity_map is not None:
+            identity_key = IdentityMap.make_key(self.MODEL_CLASS.Meta.TABLE_NAME, args)
+            model_instance = identity_map.get(identity_key)
+            if model_instance is not None:
+                Logger.log.info("ViewManagerBase.select_one.identity_map", manager=self.__class__.__name__)
+                return model_instance
+
+        with ManagerProfiler.phase("build_sql"):
+            if args:
+                condition = self._prepare_primary_sql_condition()
+                condition_params = args
+            elif Config.MANAGER_CHECK_INDEXES:
+                IndexUsageChecker.check(self.MODEL_CLASS, condition, order_by, manager_name=self.__class__.__name__)
+
+            projection_statement = ", ".join(projection) if projection else "*"
+            order_by_sql_format = ", ".join(order_by)
+            limit = 1
+
+            if base_condition == "1":
+                where_statement = f"WHERE ({condition})" if condition else ""
+            else:
+                where_statement = (
+                    f"WHERE {base_condition} AND ({condition})" if condition else f"WHERE {base_condition}"
+                )
 
-        sql = self.MODEL_CLASS.Meta.SQL_STATEMENT.format(
-            PROJECTION=projection_statement,
-            WHERE=where_statement,
-            ORDER_BY=order_by_statement,
-            LIMIT=limit_statement,
-            OFFSET="",
-        )
+            order_by_statement = f"ORDER BY {order_by_sql_format}" if order_by else ""
+            limit_statement = f"LIMIT {limit}" if limit else ""
+            timeout_ms = self._get_timeout_ms(timeout_ms)
+
+            sql = self._format_sql_statement(
+                self.MODEL_CLASS,
+                HINTS=self._prepare_hints_statement(timeout_ms),
+                PROJECTION=projection_statement,
+                PARTITION=partition_statement,
+                WHERE=where_statement,
+                ORDER_BY=order_by_statement,
+                LIMIT=limit_statement,
+                OFFSET="",
+            )
 
         Logger.log.info("ViewManagerBase.select_one.sql", manager=self.__class__.__name__)
 
-        result = self.dbi.fetch_one(sql, condition_params)
+        with ManagerProfiler.phase("db"):
+            result = self._fetch(self.dbi.fetch_one, sql, condition_params, _copy_row, timeout_ms)
 
         Logger.log.info("ViewManagerBase.select_one.result", result=result, manager=self.__class__.__name__)
 
-        if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
-            return self.MODEL_CLASS(result).map_model_attributes() if result else None
+        if not result:
+            return None
 
-        return self.MODEL_CLASS(result) if result else None
+        with ManagerProfiler.phase("models"):
+            model_class = self._get_projection_model_class(projection)
+            if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
+                model_instance = model_class(result).map_model_attributes()
+            else:
+                model_instance = model_class(result)
+
+        if identity_map is not None:
+            return identity_map.add(model_instance)
 
+        return model_instance
+
+    @ManagerProfiler.profile_method
     def select_all(
         self,
         condition: str = "1",
@@ -93,6 +212,9 @@ class ViewManagerBase:
         order_by: typing.Tuple = (),
         limit: int = 0,
         offset: int = 0,
+        prefetch: typing.Tuple = (),
+        partitions: typing.Tuple = (),
+        timeout_ms: int = None,
     ) -> typing.List[ModelBase]:
         """
         Select all rows matching the condition
@@ -102,8 +224,137 @@ class ViewManagerBase:
         :param condition_params: Positional params for SQL condition
         :param order_by: Params for SQL order by statement
         :param limit: Params for SQL limit statement
+        :param prefetch: Names of relations from `Model.Meta.RELATIONS` to be loaded by one query per relation
+            and attached to result models as attributes of the same name
+        :param partitions: Names of table partitions to read from, see `get_partitions`
+        :param timeout_ms: Execution time limit of every query, None => `Model.Meta.QUERY_TIMEOUT_MS`, 0 => no limit
+        :raise QueryTimeoutException: Query exceeded its time limit
+        """
+        if self._shard_router is not None and self.dbi is None:
+            # every shard returns first limit + offset rows, merged result is sliced
+            merge_order_by = self._get_merge_order_by(order_by)
+            results = self._shard_router.map(
+                lambda shard: self._get_shard_manager(shard).select_all(
+                    condition=condition,
+                    condition_params=condition_params,
+                    projection=projection,
+                    order_by=order_by,
+                    limit=limit + offset if limit else 0,
+                    prefetch=prefetch,
+                    partitions=partitions,
+                    timeout_ms=timeout_ms,
+                )
+            )
+            return list(
+                merge_sorted(
+                    results, merge_order_by, limit, offset, string_sort_key=self._shard_router.string_sort_key
+                )
+            )
+
+        with ManagerProfiler.phase("build_sql"):
+            timeout_ms = self._get_timeout_ms(timeout_ms)
+            sql = self._prepare_select_all_sql(condition, projection, order_by, limit, offset, partitions, timeout_ms)
+
+        Logger.log.info("ViewManagerBase.select_all.sql", manager=self.__class__.__name__)
+
+        with ManagerProfiler.phase("db"):
+            results = self._fetch(self.dbi.fetch_all, sql, condition_params, _copy_rows, timeout_ms)
+
+        Logger.log.info("ViewManagerBase.select_all.result", result=results, manager=self.__class__.__name__)
+
+        with ManagerProfiler.phase("models"):
+            model_class = self._get_projection_model_class(projection)
+            if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
+                Logger.log.debug("ViewManagerBase.select_all.result.list.automapped")
+                models = [model_class(result).map_model_attributes() for result in results]
+            else:
+                Logger.log.debug("ViewManagerBase.select_all.result.list")
+                models = [model_class(result) for result in results]
+
+            identity_map = self._get_identity_map() if not projection else None
+            if identity_map is not None:
+                models = [identity_map.add(model_instance) for model_instance in models]
+
+        with ManagerProfiler.phase("prefetch"):
+            for relation_name in prefetch:
+                self._prefetch_relation(models, relation_name, timeout_ms)
+
+        return models
+
+    def select_iter(
+        self,
+        condition: str = "1",
+        condition_params: typing.Tuple = (),
+        projection: typing.Tuple = (),
+        order_by: typing.Tuple = (),
+        limit: int = 0,
+        offset: int = 0,
+        batch_size: int = 1000,
+        partitions: typing.Tuple = (),
+        timeout_ms: int = None,
+    ) -> typing.Iterator[ModelBase]:
+        """
+        Stream rows matching the condition one by one without loading whole result into memory.
+        DB connection is occupied until iterator is exhausted or closed. Identity map is not used.
+        :param offset: SQL offset
+        :param projection: sql projection - default *
+        :param condition: SQL condition
+        :param condition_params: Positional params for SQL condition
+        :param order_by: Params for SQL order by statement
+        :param limit: Params for SQL limit statement
+        :param batch_size: Number of rows fetched from DB cursor at once
+        :param partitions: Names of table partitions to read from, see `get_partitions`
+        :param timeout_ms: Execution time limit of query, None => `Model.Meta.QUERY_TIMEOUT_MS`, 0 => no limit.
+            Server measures time until the last row is sent, so slow consumer of iterator counts too.
+        :raise QueryTimeoutException: Query exceeded its time limit
         """
+        if self._shard_router is not None and self.dbi is None:
+            # shards are streamed and merged lazily in calling thread, every shard occupies one connection
+            merge_order_by = self._get_merge_order_by(order_by)
+            iterators = [
+                self._get_shard_manager(shard).select_iter(
+                    condition=condition,
+                    condition_params=condition_params,
+                    projection=projection,
+                    order_by=order_by,
+                    limit=limit + offset if limit else 0,
+                    batch_size=batch_size,
+                    partitions=partitions,
+                    timeout_ms=timeout_ms,
+                )
+                for shard in self._shard_router.shards
+            ]
+            yield from merge_sorted(
+                iterators, merge_order_by, limit, offset, string_sort_key=self._shard_router.string_sort_key
+            )
+            return
+
+        timeout_ms = self._get_timeout_ms(timeout_ms)
+        sql = self._prepare_select_all_sql(condition, projection, order_by, limit, offset, partitions, timeout_ms)
+
+        Logger.log.info("ViewManagerBase.select_iter.sql", manager=self.__class__.__name__)
+
+        model_class = self._get_projection_model_class(projection)
+        for result in self.dbi.fetch_iter(sql, condition_params, batch_size=batch_size, **_timeout_kwargs(timeout_ms)):
+            if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
+                yield model_class(result).map_model_attributes()
+            else:
+                yield model_class(result)
+
+    def _prepare_select_all_sql(
+        self,
+        condition: str,
+        projection: typing.Tuple,
+        order_by: typing.Tuple,
+        limit: int,
+        offset: int,
+        partitions: typing.Tuple = (),
+        timeout_ms: int = None,
+    ) -> str:
         base_condition = self.MODEL_CLASS.Meta.SQL_STATEMENT_WHERE_BASE
+        partition_statement = self._prepare_partition_statement(partitions, self.MODEL_CLASS.Meta.SQL_STATEMENT)
+        if Config.MANAGER_CHECK_INDEXES:
+            IndexUsageChecker.check(self.MODEL_CLASS, condition, order_by, manager_name=self.__class__.__name__)
 
         projection_statement = ", ".join(projection) if projection else "*"
 
@@ -124,26 +375,238 @@ class ViewManagerBase:
         limit_statement = f"LIMIT {limit}" if limit else ""
         offset_statement = f"OFFSET {offset}" if offset else ""
 
-        sql = self.MODEL_CLASS.Meta.SQL_STATEMENT.format(
+        return self._format_sql_statement(
+            self.MODEL_CLASS,
+            HINTS=self._prepare_hints_statement(timeout_ms),
             PROJECTION=projection_statement,
+            PARTITION=partition_statement,
             WHERE=where_statement,
             ORDER_BY=order_by_statement,
             LIMIT=limit_statement,
             OFFSET=offset_statement,
         )
 
-        Logger.log.info("ViewManagerBase.select_all.sql", manager=self.__class__.__name__)
+    def _prefetch_relation(self, models: typing.List[ModelBase], relation_name: str, timeout_ms: int = None):
+        """
+        Load related models of all given models by one batched IN query and attach them to models.
+        :param models: Models owning relation
+        :param relation_name: Name of relation from `Model.Meta.RELATIONS`
+        :param timeout_ms: Execution time limit of query, None => no limit
+        """
+        relation: Relation = getattr(self.MODEL_CLASS.Meta, "RELATIONS", {}).get(relation_name)
+        if relation is None:
+            raise ManagerException(
+                f"Can't prefetch relation '{relation_name}'. It is not defined in {self.MODEL_CLASS.__name__}.Meta.RELATIONS"
+            )
 
-        results = self.dbi.fetch_all(sql, condition_params)
+        related_model_class = self._get_relation_model_class(relation)
+        unique_keys = {}
+        for model_instance in models:
+            key = tuple(model_instance.model_data.get(column) for column in relation.columns)
+            if None not in key:
+                unique_keys[key] = True
+        keys = list(unique_keys)
+
+        related_models = {}
+        if keys:
+            if len(relation.referenced_columns) == 1:
+                condition = "`{}` IN ({})".format(relation.referenced_columns[0], ", ".join(["%s"] * len(keys)))
+                condition_params = tuple(key[0] for key in keys)
+            else:
+                columns_statement = ", ".join("`{}`".format(column) for column in relation.referenced_columns)
+                key_statement = "({})".format(", ".join(["%s"] * len(relation.referenced_columns)))
+                condition = "({}) IN ({})".format(columns_statement, ", ".join([key_statement] * len(keys)))
+                condition_params = tuple(value for key in keys for value in key)
+
+            sql = self._format_sql_statement(
+                related_model_class,
+                HINTS=self._prepare_hints_statement(timeout_ms),
+                PROJECTION="*",
+                PARTITION="",
+                WHERE=f"WHERE {condition}",
+                ORDER_BY="",
+                LIMIT="",
+                OFFSET="",
+            )
 
-        Logger.log.info("ViewManagerBase.select_all.result", result=results, manager=self.__class__.__name__)
+            Logger.log.info(
+                "ViewManagerBase.prefetch.sql", relation=relation_name, keys=len(keys), manager=self.__class__.__name__
+            )
+
+            results = self.dbi.fetch_all(sql, condition_params, **_timeout_kwargs(timeout_ms))
+            identity_map = self.dbi.identity_map if related_model_class.Meta.PRIMARY_KEYS else None
+            for result in results:
+                related_model = related_model_class(result)
+                if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
+                    related_model.map_model_attributes()
+                if identity_map is not None:
+                    related_model = identity_map.add(related_model)
+                key = tuple(related_model.model_data.get(column) for column in relation.referenced_columns)
+                if relation.is_many:
+                    related_models.setdefault(key, []).append(related_model)
+                else:
+                    related_models.setdefault(key, related_model)
+
+        for model_instance in models:
+            key = tuple(model_instance.model_data.get(column) for column in relation.columns)
+            related = related_models.get(key)
+            if relation.is_many:
+                related = list(related) if related else []
+            model_instance.__setattr__(relation_name, related)
+
+    def _get_relation_model_class(self, relation: Relation) -> typing.Type[ModelBase]:
+        package = self.MODEL_CLASS.__module__.rpartition(".")[0]
+        module_name = f"{package}.{relation.model_module}" if package else relation.model_module
+        return getattr(importlib.import_module(module_name), relation.model_class)
+
+    @classmethod
+    def get_partitions(cls, key_from=None, key_to=None) -> typing.Tuple[str, ...]:
+        """
+        Names of RANGE or LIST partitions which can contain rows with partitioning key in given range.
+        Result is meant for `partitions` param of select and delete methods.
+        :param key_from: Lowest value of partitioning column (inclusive), None => unbounded
+        :param key_to: Highest value of partitioning column (inclusive), None => unbounded
+        """
+        try:
+            return PartitionPruner.get_partitions(cls.MODEL_CLASS, key_from, key_to)
+        except ValueError as e:
+            raise ManagerException(str(e)) from e
+
+    def _fetch(
+        self,
+        fetch: typing.Callable,
+        sql: str,
+        condition_params: typing.Tuple,
+        copy_result: typing.Callable,
+        timeout_ms: int = None,
+    ):
+        """
+        Run select by DBI fetch method. Identical selects running concurrently in other threads are executed once
+        if single flight reads are enabled, every caller gets own copy of rows.
+        """
+        is_enabled = self.SINGLE_FLIGHT_READS
+        if is_enabled is None:
+            is_enabled = Config.MANAGER_SINGLE_FLIGHT_READS
+        # transaction has to read its own writes
+        if not is_enabled or self.dbi._is_in_transaction:
+            return fetch(sql, condition_params, **_timeout_kwargs(timeout_ms))
+        key = (self.dbi.profile, fetch.__name__, sql, tuple(condition_params), timeout_ms)
+        try:
+            hash(key)
+        except TypeError:
+            return fetch(sql, condition_params, **_timeout_kwargs(timeout_ms))
+        return ViewManagerBase._single_flight.do(
+            key, lambda: fetch(sql, condition_params, **_timeout_kwargs(timeout_ms)), copy_result
+        )
+
+    def _get_shard_manager(self, shard: str) -> "ViewManagerBase":
+        """
+        Copy of this manager working with DBI of given shard
+        """
+        shard_manager = self._shard_managers.get(shard)
+        if shard_manager is not None:
+            return shard_manager
+        with self._shard_managers_lock:
+            shard_manager = self._shard_managers.get(shard)
+            if shard_manager is None:
+                shard_manager = copy.copy(self)
+                shard_manager.dbi = DBI(profile=shard)
+                shard_manager._shard_router = None
+                shard_manager._shard_managers = {}
+                shard_manager._shard_managers_lock = threading.Lock()
+                shard_manager._reset_bulk_insert_buffer()
+                self._shard_managers[shard] = shard_manager
+        return shard_manager
+
+    def _get_shard_manager_by_key(self, key) -> typing.Optional["ViewManagerBase"]:
+        """
+        Manager of shard owning the key. None if query belongs to this manager bound to one shard by its DBI.
+        """
+        if key is None:
+            raise ManagerException(
+                f"Can't route query of {self.__class__.__name__}, shard key "
+                f"'{self.MODEL_CLASS.Meta.SHARD_KEY}' is not set."
+            )
+        shard = self._shard_router.get_shard(key)
+        if self.dbi is None:
+            return self._get_shard_manager(shard)
+        if shard != self.dbi.profile:
+            raise ManagerException(
+                f"{self.__class__.__name__} is bound to shard '{self.dbi.profile}', but key {key!r} belongs "
+                f"to shard '{shard}'."
+            )
+        return None
 
-        if Config.MANAGER_AUTO_MAP_MODEL_ATTRIBUTES:
-            Logger.log.debug("ViewManagerBase.select_all.result.list.automapped")
-            return [self.MODEL_CLASS(result).map_model_attributes() for result in results]
+    def _get_shard_manager_by_model(self, model_instance: ModelBase) -> typing.Optional["ViewManagerBase"]:
+        if self._shard_router is None:
+            return None
+        return self._get_shard_manager_by_key(model_instance.__getattribute__(self.MODEL_CLASS.Meta.SHARD_KEY))
+
+    def _get_merge_order_by(self, order_by: typing.Tuple) -> typing.Tuple:
+        """
+        Order by used for merging results of shards, it is validated before queries are sent
+        """
+        if not order_by and self.MODEL_CLASS.Meta.SQL_STATEMENT_ORDER_BY_DEFAULT:
+            order_by = (self.MODEL_CLASS.Meta.SQL_STATEMENT_ORDER_BY_DEFAULT,)
+        try:
+            parse_order_by(order_by)
+        except ValueError as e:
+            raise ManagerException(str(e)) from e
+        return order_by
+
+    def _get_timeout_ms(self, timeout_ms: typing.Optional[int]) -> typing.Optional[int]:
+        """
+        :param timeout_ms: Time limit passed to select, None => `Model.Meta.QUERY_TIMEOUT_MS`
+        :return: Time limit of query in milliseconds, None => no limit
+        """
+        if timeout_ms is None:
+            timeout_ms = getattr(self.MODEL_CLASS.Meta, "QUERY_TIMEOUT_MS", None)
+        if timeout_ms is None or timeout_ms == 0:
+            return None
+        if not isinstance(timeout_ms, int) or timeout_ms < 0:
+            raise ManagerException(f"Invalid query timeout {timeout_ms!r}, use positive number of milliseconds.")
+        return timeout_ms
 
-        Logger.log.debug("ViewManagerBase.select_all.result.list")
-        return [self.MODEL_CLASS(result) for result in results]
+    @staticmethod
+    def _prepare_hints_statement(timeout_ms: typing.Optional[int]) -> str:
+        """
+        :return: Optimizer hints comment placed right after SELECT keyword
+        """
+        return f"/*+ MAX_EXECUTION_TIME({timeout_ms}) */" if timeout_ms else ""
+
+    @staticmethod
+    def _format_sql_statement(model_class: typing.Type[ModelBase], **statements) -> str:
+        """
+        Fill placeholders of `Model.Meta.SQL_STATEMENT`. Hints of models generated without {HINTS} placeholder
+        are inserted after leading SELECT, statements starting otherwise are run without hints.
+        """
+        sql_statement = model_class.Meta.SQL_STATEMENT
+        if statements.get("HINTS") and "{HINTS}" not in sql_statement:
+            sql_statement = SELECT_REGEX.sub(lambda found: found.group(0) + " {HINTS}", sql_statement, count=1)
+        return sql_statement.format(**statements)
+
+    @classmethod
+    def _prepare_partition_statement(cls, partitions: typing.Tuple, sql_statement: str = None) -> str:
+        """
+        :param partitions: Names of table partitions
+        :param sql_statement: Statement which has to contain {PARTITION} placeholder
+        :return: SQL partition selection or empty string if there are no partitions
+        """
+        if not partitions:
+            return ""
+        meta = cls.MODEL_CLASS.Meta
+        if sql_statement is not None and "{PARTITION}" not in sql_statement:
+            raise ManagerException(
+                f"Can't select partitions of {cls.MODEL_CLASS.__name__}. "
+                "There is no {PARTITION} placeholder in Meta.SQL_STATEMENT, regenerate the model."
+            )
+        known_partitions = getattr(meta, "PARTITIONS", None) or {}
+        unknown_partitions = [name for name in partitions if name not in known_partitions]
+        if unknown_partitions:
+            raise ManagerException(
+                "Unknown partition(s) {} of table `{}`.".format(", ".join(unknown_partitions), meta.TABLE_NAME)
+            )
+        return PartitionPruner.render_clause(partitions)
 
     @staticmethod
     def models_into_dicts(result: typing.List[ModelBase]) -> typing.List[typing.Dict]:
@@ -153,6 +616,50 @@ class ViewManagerBase:
         """
         return [item.to_dict() for item in result]
 
+    def _get_projection_model_class(self, projection: typing.Tuple) -> typing.Type[ModelBase]:
+        """
+        Model class for select results. Projection without some model columns gives partial model class.
+        Model classes are cached by projection.
+        :param projection: SQL projection
+        """
+        if not projection:
+            return self.MODEL_CLASS
+
+        key = (self.MODEL_CLASS, tuple(projection))
+        model_class = ViewManagerBase._projection_model_classes.get(key)
+        if model_class is None:
+            columns = self._parse_projection_columns(projection)
+            if columns is None or set(self.MODEL_CLASS.Meta.ATTRIBUTE_LIST).issubset(columns):
+                model_class = self.MODEL_CLASS
+            else:
+                model_class = self.MODEL_CLASS.partial_class(columns)
+            ViewManagerBase._projection_model_classes[key] = model_class
+        return model_class
+
+    @staticmethod
+    def _parse_projection_columns(projection: typing.Tuple) -> typing.Optional[typing.List[str]]:
+        """
+        Result column names of SQL projection. Returns None if projection contains wildcard.
+        :param projection: SQL projection e.g. ("id", "`t`.`name`", "COUNT(*) AS `count`")
+        """
+        columns = []
+        for item in projection:
+            item = item.strip()
+            if item == "*" or item.endswith(".*"):
+                return None
+            alias = re.split(r"\s+AS\s+", item, flags=re.IGNORECASE)
+            column = alias[-1] if len(alias) > 1 else item.split()[-1].split(".")[-1]
+            columns.append(column.strip("`"))
+        return columns
+
+    def _get_identity_map(self) -> typing.Optional[IdentityMap]:
+        """
+        Identity map of current unit of work. Models without primary keys are never mapped.
+        """
+        if not self.MODEL_CLASS.Meta.PRIMARY_KEYS:
+            return None
+        return self.dbi.identity_map
+
     @classmethod
     def _prepare_primary_sql_condition(cls):
         args = ["{} = %s".format(primary_key) for primary_key in cls.MODEL_CLASS.Meta.PRIMARY_KEYS]
@@ -164,6 +671,7 @@ class ViewManagerBase:
 
 
 class TableManagerBase(ViewManagerBase):
+    @ManagerProfiler.profile_method
     def update_one(self, model_instance: ModelBase, exclude_none_values: bool = False, exclude_columns: list = None) -> int:
         """
         Update one database record based on model attributes
@@ -172,34 +680,48 @@ class TableManagerBase(ViewManagerBase):
         :param exclude_columns: You can exclude columns names from update statement
         :return: Number of affected rows
         """
+        shard_manager = self._get_shard_manager_by_model(model_instance)
+        if shard_manager is not None:
+            return shard_manager.update_one(
+                model_instance, exclude_none_values=exclude_none_values, exclude_columns=exclude_columns
+            )
+
         exclude_columns = exclude_columns or []
         if not self.MODEL_CLASS.Meta.PRIMARY_KEYS:
             raise ManagerException("Can't update record based on model instance. There are no primary keys specified.")
 
-        set_prepare = []
-        set_prepare_params = []
-        for attribute_name in self.MODEL_CLASS.Meta.ATTRIBUTE_LIST:
-            value = model_instance.__getattribute__(attribute_name)
-            if (exclude_none_values and value is None) or attribute_name in exclude_columns:
-                continue
-            set_prepare.append("`{}` = %s".format(attribute_name))
-            set_prepare_params.append(value)
-
-        condition_prepare = self._prepare_primary_sql_condition()
-        condition_prepare_params = self._prepare_primary_sql_condition_params(model_instance)
-
-        sql = "UPDATE `{}` SET {} WHERE {} LIMIT 1".format(
-            self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(set_prepare), condition_prepare
-        )
+        with ManagerProfiler.phase("build_sql"):
+            set_prepare = []
+            set_prepare_params = []
+            # partial model updates loaded columns only
+            for attribute_name in model_instance.Meta.ATTRIBUTE_LIST:
+                value = model_instance.__getattribute__(attribute_name)
+                if (exclude_none_values and value is None) or attribute_name in exclude_columns:
+                    continue
+                set_prepare.append("`{}` = %s".format(attribute_name))
+                set_prepare_params.append(value)
+
+            condition_prepare = self._prepare_primary_sql_condition()
+            condition_prepare_params = self._prepare_primary_sql_condition_params(model_instance)
+
+            sql = "UPDATE `{}` SET {} WHERE {} LIMIT 1".format(
+                self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(set_prepare), condition_prepare
+            )
 
         Logger.log.info("TableManagerBase.update_one.sql", manager=self.__class__.__name__)
 
-        result = self.dbi.execute(sql, set_prepare_params + condition_prepare_params)
+        with ManagerProfiler.phase("db"):
+            result = self.dbi.execute(sql, set_prepare_params + condition_prepare_params)
+
+        self._update_identity_map(
+            model_instance, is_complete=not (exclude_none_values or exclude_columns or model_instance.IS_PARTIAL)
+        )
 
         Logger.log.info("TableManagerBase.update_one.result", result=result, manager=self.__class__.__name__)
 
         return result
 
+    @ManagerProfiler.profile_method
     def insert_one(
         self,
         model_instance: ModelBase,
@@ -217,53 +739,72 @@ class TableManagerBase(ViewManagerBase):
         :param use_insert_ignore_statement: Use INSERT IGNORE statement
         :return: Last inserted id if it is possible
         """
-        exclude_columns = exclude_columns or []
-        insert_prepare = []
-        insert_prepare_values = []
-        insert_prepare_params = []
-        update_prepare = []
-        for attribute_name in self.MODEL_CLASS.Meta.ATTRIBUTE_LIST:
-            value = model_instance.__getattribute__(attribute_name)
-            if (exclude_none_values and value is None) or attribute_name in exclude_columns:
-                continue
-            insert_prepare.append("`{}`".format(attribute_name))
-            insert_prepare_values.append("%s")
-            insert_prepare_params.append(value)
-            if use_on_duplicate_update_statement:
-                update_prepare.append("`{0}` = VALUES(`{0}`)".format(attribute_name))
-
-        if use_on_duplicate_update_statement:
-            sql = "INSERT INTO `{}` ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
-                self.MODEL_CLASS.Meta.TABLE_NAME,
-                ", ".join(insert_prepare),
-                ", ".join(insert_prepare_values),
-                ", ".join(update_prepare),
-            )
-        elif use_insert_ignore_statement:
-            sql = "INSERT IGNORE INTO `{}` ({}) VALUES ({})".format(
-                self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
-            )
-        else:
-            sql = "INSERT INTO `{}` ({}) VALUES ({})".format(
-                self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+        shard_manager = self._get_shard_manager_by_model(model_instance)
+        if shard_manager is not None:
+            return shard_manager.insert_one(
+                model_instance,
+                exclude_none_values=exclude_none_values,
+                exclude_columns=exclude_columns,
+                use_on_duplicate_update_statement=use_on_duplicate_update_statement,
+                use_insert_ignore_statement=use_insert_ignore_statement,
             )
 
-        Logger.log.info("TableManagerBase.insert_one.sql", manager=self.__class__.__name__)
+        with ManagerProfiler.phase("build_sql"):
+            exclude_columns = exclude_columns or []
+            insert_prepare = []
+            insert_prepare_values = []
+            insert_prepare_params = []
+            update_prepare = []
+            for attribute_name in model_instance.Meta.ATTRIBUTE_LIST:
+                value = model_instance.__getattribute__(attribute_name)
+                if (exclude_none_values and value is None) or attribute_name in exclude_columns:
+                    continue
+                insert_prepare.append("`{}`".format(attribute_name))
+                insert_prepare_values.append("%s")
+                insert_prepare_params.append(value)
+                if use_on_duplicate_update_statement:
+                    update_prepare.append("`{0}` = VALUES(`{0}`)".format(attribute_name))
+
+            if use_on_duplicate_update_statement:
+                sql = "INSERT INTO `{}` ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
+                    self.MODEL_CLASS.Meta.TABLE_NAME,
+                    ", ".join(insert_prepare),
+                    ", ".join(insert_prepare_values),
+                    ", ".join(update_prepare),
+                )
+            elif use_insert_ignore_statement:
+                sql = "INSERT IGNORE INTO `{}` ({}) VALUES ({})".format(
+                    self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+                )
+            else:
+                sql = "INSERT INTO `{}` ({}) VALUES ({})".format(
+                    self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+                )
 
-        result = self.dbi.execute(sql, insert_prepare_params)
+        Logger.log.info("TableManagerBase.insert_one.sql", manager=self.__class__.__name__)
 
-        # set primary key value
-        if (
-            result
-            and len(self.MODEL_CLASS.Meta.PRIMARY_KEYS) == 1
-            and self.MODEL_CLASS.Meta.ATTRIBUTE_TYPES[self.MODEL_CLASS.Meta.PRIMARY_KEYS[0]] == int
-        ):
-            model_instance.__setattr__(self.MODEL_CLASS.Meta.PRIMARY_KEYS[0], result)
+        with ManagerProfiler.phase("db"):
+            result = self.dbi.execute(sql, insert_prepare_params)
+
+        self._set_inserted_primary_key(model_instance, result)
+
+        # ignored or updated existing row can differ from the model
+        self._update_identity_map(
+            model_instance,
+            is_complete=not (
+                exclude_none_values
+                or exclude_columns
+                or model_instance.IS_PARTIAL
+                or use_on_duplicate_update_statement
+                or use_insert_ignore_statement
+            ),
+        )
 
         Logger.log.info("TableManagerBase.insert_one.result", result=result, manager=self.__class__.__name__)
 
         return result
 
+    @ManagerProfiler.profile_method
     def insert_one_bulk(
         self,
         model_instance: ModelBase,
@@ -283,38 +824,57 @@ class TableManagerBase(ViewManagerBase):
         :param auto_flush: Auto flush bulks from buffer after N records (defined in self.bulk_insert_buffer_size)
         :return: Number of items in buffer
         """
-        exclude_columns = exclude_columns or []
-        insert_prepare = []
-        insert_prepare_values = []
-        insert_prepare_params = []
-        update_prepare = []
-        for attribute_name in self.MODEL_CLASS.Meta.ATTRIBUTE_LIST:
-            value = model_instance.__getattribute__(attribute_name)
-            if (exclude_none_values and value is None) or attribute_name in exclude_columns:
-                continue
-            insert_prepare.append("`{}`".format(attribute_name))
-            insert_prepare_values.append("%s")
-            insert_prepare_params.append(value)
-            if use_on_duplicate_update_statement:
-                update_prepare.append("`{0}` = VALUES(`{0}`)".format(attribute_name))
+        shard_manager = self._get_shard_manager_by_model(model_instance)
+        if shard_manager is not None:
+            # every shard has its own buffer
+            shard_manager.bulk_insert_buffer_size = self.bulk_insert_buffer_size
+            return shard_manager.insert_one_bulk(
+                model_instance,
+                exclude_none_values=exclude_none_values,
+                exclude_columns=exclude_columns,
+                use_on_duplicate_update_statement=use_on_duplicate_update_statement,
+                use_insert_ignore_statement=use_insert_ignore_statement,
+                auto_flush=auto_flush,
+            )
 
-        if not self.bulk_insert_sql_statement:
-            if use_on_duplicate_update_statement:
-                self.bulk_insert_sql_statement = "INSERT INTO `{}` ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
-                    self.MODEL_CLASS.Meta.TABLE_NAME,
-                    ", ".join(insert_prepare),
-                    ", ".join(insert_prepare_values),
-                    ", ".join(update_prepare),
-                )
-            elif use_insert_ignore_statement:
-                self.bulk_insert_sql_statement = "INSERT IGNORE INTO `{}` ({}) VALUES ({})".format(
-                    self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
-                )
-            else:
-                self.bulk_insert_sql_statement = "INSERT INTO `{}` ({}) VALUES ({})".format(
-                    self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+        with ManagerProfiler.phase("build_sql"):
+            insert_prepare = []
+            insert_prepare_values = []
+            insert_prepare_params = []
+            update_prepare = []
+            columns = self.get_bulk_insert_columns(model_instance, exclude_none_values, exclude_columns)
+            for attribute_name in columns:
+                insert_prepare.append("`{}`".format(attribute_name))
+                insert_prepare_values.append("%s")
+                insert_prepare_params.append(model_instance.__getattribute__(attribute_name))
+                if use_on_duplicate_update_statement:
+                    update_prepare.append("`{0}` = VALUES(`{0}`)".format(attribute_name))
+
+            if self.bulk_insert_sql_statement and columns != self.bulk_insert_columns:
+                raise ManagerException(
+                    "Can't add model with columns {} into bulk insert of columns {}. Flush buffer first.".format(
+                        ", ".join(columns), ", ".join(self.bulk_insert_columns)
+                    )
                 )
 
+            if not self.bulk_insert_sql_statement:
+                self.bulk_insert_columns = columns
+                if use_on_duplicate_update_statement:
+                    self.bulk_insert_sql_statement = "INSERT INTO `{}` ({}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
+                        self.MODEL_CLASS.Meta.TABLE_NAME,
+                        ", ".join(insert_prepare),
+                        ", ".join(insert_prepare_values),
+                        ", ".join(update_prepare),
+                    )
+                elif use_insert_ignore_statement:
+                    self.bulk_insert_sql_statement = "INSERT IGNORE INTO `{}` ({}) VALUES ({})".format(
+                        self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+                    )
+                else:
+                    self.bulk_insert_sql_statement = "INSERT INTO `{}` ({}) VALUES ({})".format(
+                        self.MODEL_CLASS.Meta.TABLE_NAME, ", ".join(insert_prepare), ", ".join(insert_prepare_values)
+                    )
+
         self.bulk_insert_values_buffer.append(insert_prepare_params)
         buffer_len = len(self.bulk_insert_values_buffer)
         if auto_flush and buffer_len >= self.bulk_insert_buffer_size:
@@ -322,15 +882,29 @@ class TableManagerBase(ViewManagerBase):
 
         return buffer_len
 
+    @ManagerProfiler.profile_method
     def insert_bulk_flush(self) -> int:
         """
         Flush prepared inserts from buffer
         :return: Number of inserted rows
         """
+        if self._shard_router is not None and self.dbi is None:
+            results = [
+                shard_manager.insert_bulk_flush()
+                for shard_manager in self._shard_managers.values()
+                if shard_manager.bulk_insert_values_buffer
+            ]
+            return sum(results) if results else None
 
         result = None
         if self.bulk_insert_values_buffer:
-            result = self.dbi.execute_many(self.bulk_insert_sql_statement, self.bulk_insert_values_buffer)
+            with ManagerProfiler.phase("db"):
+                result = self.dbi.execute_many(self.bulk_insert_sql_statement, self.bulk_insert_values_buffer)
+
+        # bulk statements could update existing rows (ON DUPLICATE KEY UPDATE), mapped models are not reliable any more
+        identity_map = self._get_identity_map()
+        if identity_map is not None:
+            identity_map.evict_table(self.MODEL_CLASS.Meta.TABLE_NAME)
 
         Logger.log.info(
             "TableManagerBase.insert_one_bulk_flush.result",
@@ -339,32 +913,72 @@ class TableManagerBase(ViewManagerBase):
             manager=self.__class__.__name__,
         )
 
+        self._reset_bulk_insert_buffer()
+        return result
+
+    @staticmethod
+    def get_bulk_insert_columns(
+        model_instance: ModelBase, exclude_none_values: bool = False, exclude_columns: list = None
+    ) -> typing.Tuple[str, ...]:
+        """
+        Columns inserted by `insert_one_bulk`, models of one bulk must have the same columns.
+        Partial model inserts loaded columns only.
+        :param model_instance: Model instance
+        :param exclude_none_values: See `insert_one_bulk`
+        :param exclude_columns: See `insert_one_bulk`
+        """
+        exclude_columns = exclude_columns or []
+        return tuple(
+            attribute_name
+            for attribute_name in model_instance.Meta.ATTRIBUTE_LIST
+            if attribute_name not in exclude_columns
+            and not (exclude_none_values and model_instance.__getattribute__(attribute_name) is None)
+        )
+
+    def _reset_bulk_insert_buffer(self):
         self.bulk_insert_sql_statement = ""
         self.bulk_insert_values_buffer = []
-        return result
+        self.bulk_insert_columns = ()
+        for shard_manager in self._shard_managers.values():
+            shard_manager._reset_bulk_insert_buffer()
 
+    @ManagerProfiler.profile_method
     def delete_one(self, model_instance: ModelBase) -> int:
         """
         Delete one row matching primary key condition.
         :param model_instance: Instance of model
         :return: Number of affected rows
         """
-        condition_prepare = self._prepare_primary_sql_condition()
-        condition_prepare_params = self._prepare_primary_sql_condition_params(model_instance)
+        shard_manager = self._get_shard_manager_by_model(model_instance)
+        if shard_manager is not None:
+            return shard_manager.delete_one(model_instance)
+
+        with ManagerProfiler.phase("build_sql"):
+            condition_prepare = self._prepare_primary_sql_condition()
+            condition_prepare_params = self._prepare_primary_sql_condition_params(model_instance)
 
-        sql_statement = "DELETE FROM  `{}` WHERE {} LIMIT 1"
-        sql = sql_statement.format(self.MODEL_CLASS.Meta.TABLE_NAME, condition_prepare)
+            sql_statement = "DELETE FROM `{}` WHERE {} LIMIT 1"
+            sql = sql_statement.format(self.MODEL_CLASS.Meta.TABLE_NAME, condition_prepare)
 
         Logger.log.info("TableManagerBase.delete_one.sql", manager=self.__class__.__name__)
 
-        result = self.dbi.execute(sql, condition_prepare_params)
+        with ManagerProfiler.phase("db"):
+            result = self.dbi.execute(sql, condition_prepare_params)
+
+        self._evict_identity_map(model_instance)
 
         Logger.log.info(f"TableManagerBase.delete_one.result", result=result, manager=self.__class__.__name__)
 
         return result
 
+    @ManagerProfiler.profile_method
     def delete_all(
-        self, condition: str, condition_params: typing.Tuple = (), order_by: typing.Tuple = (), limit: int = 0
+        self,
+        condition: str,
+        condition_params: typing.Tuple = (),
+        order_by: typing.Tuple = (),
+        limit: int = 0,
+        partitions: typing.Tuple = (),
     ) -> int:
         """
         Delete all table rows matching condition.
@@ -372,25 +986,76 @@ class TableManagerBase(ViewManagerBase):
         :param condition_params: SQL condition position params
         :param order_by: SQL order statement
         :param limit: SQL limit statement
+        :param partitions: Names of table partitions to delete from, see `get_partitions`
         :return: Number of affected rows
         """
-        where_statement = f"WHERE {condition}"
-        order_by_sql_format = ", ".join(order_by)
-        order_by_statement = f"ORDER BY {order_by_sql_format}" if order_by else ""
-        limit_statement = f"LIMIT {limit}" if limit else ""
-
-        sql_statement = "DELETE FROM `{TABLE}` {WHERE} {ORDER_BY} {LIMIT}"
-        sql = sql_statement.format(
-            TABLE=self.MODEL_CLASS.Meta.TABLE_NAME,
-            WHERE=where_statement,
-            ORDER_BY=order_by_statement,
-            LIMIT=limit_statement,
-        )
+        if self._shard_router is not None and self.dbi is None:
+            if limit:
+                raise ManagerException(f"Can't delete with limit from all shards of {self.__class__.__name__}.")
+            results = self._shard_router.map(
+                lambda shard: self._get_shard_manager(shard).delete_all(
+                    condition, condition_params=condition_params, order_by=order_by, partitions=partitions
+                )
+            )
+            return sum(results)
+
+        with ManagerProfiler.phase("build_sql"):
+            partition_statement = self._prepare_partition_statement(partitions)
+            if Config.MANAGER_CHECK_INDEXES:
+                IndexUsageChecker.check(self.MODEL_CLASS, condition, order_by, manager_name=self.__class__.__name__)
+
+            where_statement = f"WHERE {condition}"
+            order_by_sql_format = ", ".join(order_by)
+            order_by_statement = f"ORDER BY {order_by_sql_format}" if order_by else ""
+            limit_statement = f"LIMIT {limit}" if limit else ""
+
+            sql_statement = "DELETE FROM `{TABLE}` {PARTITION} {WHERE} {ORDER_BY} {LIMIT}"
+            sql = sql_statement.format(
+                TABLE=self.MODEL_CLASS.Meta.TABLE_NAME,
+                PARTITION=partition_statement,
+                WHERE=where_statement,
+                ORDER_BY=order_by_statement,
+                LIMIT=limit_statement,
+            )
 
         Logger.log.info("TableManagerBase.delete_all.sql", manager=self.__class__.__name__)
 
-        result = self.dbi.execute(sql, condition_params)
+        with ManagerProfiler.phase("db"):
+            result = self.dbi.execute(sql, condition_params)
+
+        identity_map = self._get_identity_map()
+        if identity_map is not None:
+            identity_map.evict_table(self.MODEL_CLASS.Meta.TABLE_NAME)
 
         Logger.log.info("TableManagerBase.delete_all.result", result=result, manager=self.__class__.__name__)
 
         return result
+
+    def _set_inserted_primary_key(self, model_instance: ModelBase, result: int):
+        """
+        Set last inserted ID into model instance if table has one integer primary key
+        """
+        if (
+            result
+            and len(self.MODEL_CLASS.Meta.PRIMARY_KEYS) == 1
+            and self.MODEL_CLASS.Meta.ATTRIBUTE_TYPES[self.MODEL_CLASS.Meta.PRIMARY_KEYS[0]] == int
+        ):
+            model_instance.__setattr__(self.MODEL_CLASS.Meta.PRIMARY_KEYS[0], result)
+
+    def _update_identity_map(self, model_instance: ModelBase, is_complete: bool = True):
+        """
+        Register written model instance in identity map of current unit of work
+        :param model_instance: Written model instance
+        :param is_complete: `False` if some columns were excluded from statement and model doesn't represent stored row
+        """
+        identity_map = self._get_identity_map()
+        if identity_map is not None:
+            if is_complete:
+                identity_map.put(model_instance)
+            else:
+                identity_map.evict(model_instance)
+
+    def _evict_identity_map(self, model_instance: ModelBase):
+        identity_map = self._get_identity_map()
+        if identity_map is not None:
+            identity_map.evict(model_instance)
@@ -1,6 +1,41 @@
 import typing
 
 
+class Relation(typing.NamedTuple):
+    """
+    Foreign key relation descriptor stored in `Model.Meta.RELATIONS`
+    """
+
+    table_name: str
+    """ Name of related table """
+    model_module: str
+    """ Module name of related model placed in the same package as model owning relation """
+    model_class: str
+    """ Class name of related model """
+    columns: typing.Tuple
+    """ Columns of model owning relation """
+    referenced_columns: typing.Tuple
+    """ Columns of related model matching `columns` """
+    is_many: bool
+    """ `True` => list of related models (one-to-many), `False` => one related model or None (many-to-one) """
+
+
+class Index(typing.NamedTuple):
+    """
+    Table index descriptor stored in `Model.Meta.INDEXES`
+    """
+
+    columns: typing.Tuple
+    """ Indexed columns in index order """
+    is_unique: bool
+    index_type: str = "BTREE"
+    """ "BTREE", "HASH", "FULLTEXT" or "SPATIAL" """
+
+
+class UnloadedAttributeError(AttributeError):
+    pass
+
+
 class ModelBase:
     """
     Base model class
@@ -16,9 +51,28 @@ class ModelBase:
         ATTRIBUTE_LIST: typing.List = []
         ATTRIBUTE_TYPES: typing.Dict = {}
         MODEL_DATA_CONVERTOR: typing.Dict = {}
+        RELATIONS: typing.Dict[str, Relation] = {}
+        INDEXES: typing.Dict[str, Index] = {}
+        PARTITION_METHOD: str = None
+        """ "RANGE", "RANGE COLUMNS", "LIST", "LIST COLUMNS", "HASH", "LINEAR HASH", "KEY", "LINEAR KEY" or None """
+        PARTITION_EXPRESSION: str = None
+        PARTITIONS: typing.Dict[str, str] = {}
+        """ Partition name => upper bound of RANGE partition or values of LIST partition, in partition order """
+        DB_PROFILE: str = None
+        """ Name of connection profile (see `Config.MYSQL_PROFILES`) used by managers, None => default profile """
+        SHARD_KEY: str = None
+        """ Column routing rows of sharded table to shards by `SHARD_ROUTER` """
+        SHARD_ROUTER = None
+        """ `sharding.ShardRouter` of sharded table, None => table is not sharded """
+        QUERY_TIMEOUT_MS: int = None
+        """ Default execution time limit of selects, None => no limit """
 
     DATATYPES_CONVERTOR = {"<class 'decimal.Decimal'>": float}
 
+    IS_PARTIAL = False
+    """ `True` => model class contains only subset of table columns loaded by select with projection """
+    _partial_classes: typing.Dict[typing.Tuple, typing.Type["ModelBase"]] = {}
+
     def __init__(self, init_data: typing.Dict = {}):
         self.model_data: typing.Dict = self._convert_datatypes(init_data)
 
@@ -55,6 +109,56 @@ class ModelBase:
             model_clone.model_data = self.model_data.copy()
         return model_clone
 
+    @classmethod
+    def partial_class(cls, columns: typing.Iterable[str]) -> typing.Type["ModelBase"]:
+        """
+        Lightweight model class containing only given columns. Model attributes are mapped from loaded data and
+        access to other table columns raises `UnloadedAttributeError`. Classes are cached by columns.
+        :param columns: Loaded columns
+        """
+        columns = tuple(columns)
+        key = (cls, columns)
+        partial_class = cls._partial_classes.get(key)
+        if partial_class is None:
+            partial_class = cls._create_partial_class(columns)
+            partial_class = cls._partial_classes.setdefault(key, partial_class)
+        return partial_class
+
+    @classmethod
+    def _create_partial_class(cls, columns: typing.Tuple) -> typing.Type["ModelBase"]:
+        model_class = cls
+        all_columns = frozenset(cls.Meta.ATTRIBUTE_LIST)
+        loaded_columns = [column for column in cls.Meta.ATTRIBUTE_LIST if column in columns]
+
+        class Meta(cls.Meta):
+            ATTRIBUTE_LIST: typing.List = loaded_columns
+
+        def __init__(self, init_data: typing.Dict = None):
+            ModelBase.__init__(self, {} if init_data is None else init_data)
+            for attribute_name in loaded_columns:
+                object.__setattr__(self, attribute_name, self.model_data.get(attribute_name))
+
+        def __getattr__(self, item):
+            if item in all_columns:
+                raise UnloadedAttributeError(
+                    "Attribute '{}' of {} was not loaded. Add it into select projection.".format(
+                        item, model_class.__name__
+                    )
+                )
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, item))
+
+        return type(
+            "{}Partial".format(cls.__name__),
+            (cls,),
+            {
+                "Meta": Meta,
+                "IS_PARTIAL": True,
+                "__init__": __init__,
+                "__getattr__": __getattr__,
+                "__module__": cls.__module__,
+            },
+        )
+
     @classmethod
     def _convert_datatypes(cls, item: dict) -> dict:
         for key, value in item.items():
@@ -0,0 +1,161 @@
+import datetime
+import re
+import time
+import typing
+
+from .model_base import ModelBase
+
+
+def _to_date(value) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _to_datetime(value) -> datetime.datetime:
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    value = str(value)
+    return datetime.datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S" if len(value) > 10 else "%Y-%m-%d")
+
+
+def _to_days(value) -> int:
+    # TO_DAYS('0001-01-01') = 366
+    return _to_date(value).toordinal() + 365
+
+
+def _to_seconds(value) -> int:
+    value = _to_datetime(value)
+    return _to_days(value) * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _unix_timestamp(value) -> int:
+    # session time zone of MySQL is expected to be the same as local time zone
+    return int(time.mktime(_to_datetime(value).timetuple()))
+
+
+class PartitionPruner:
+    """
+    Explicit partition pruning of RANGE and LIST partitioned tables based on `Model.Meta.PARTITIONS`.
+    Partitioning expression has to be plain column or one of `FUNCTIONS` applied on column.
+    """
+
+    EXPRESSION_REGEX = re.compile(r"^\s*(?:(\w+)\s*\(\s*)?`?(\w+)`?\s*(\))?\s*$")
+    VALUE_REGEX = re.compile(r"'((?:[^'\\]|\\.|'')*)'|([^,\s]+)")
+    MAXVALUE = object()
+    FUNCTIONS: typing.Dict[str, typing.Callable] = {
+        "to_days": _to_days,
+        "to_seconds": _to_seconds,
+        "year": lambda value: _to_date(value).year,
+        "unix_timestamp": _unix_timestamp,
+    }
+
+    @classmethod
+    def get_partitions(
+        cls, model_class: typing.Type[ModelBase], key_from=None, key_to=None
+    ) -> typing.Tuple[str, ...]:
+        """
+        Names of partitions which can contain rows with partitioning key between `key_from` and `key_to`.
+        Empty result means no partition can contain such rows.
+        :param model_class: Model class with `Meta.PARTITIONS`
+        :param key_from: Lowest value of partitioning column (inclusive), None => unbounded
+        :param key_to: Highest value of partitioning column (inclusive), None => unbounded
+        """
+        meta = model_class.Meta
+        method = getattr(meta, "PARTITION_METHOD", None)
+        partitions = getattr(meta, "PARTITIONS", None)
+        if not method or not partitions:
+            raise ValueError(f"Table `{meta.TABLE_NAME}` is not partitioned.")
+        if method.split()[0] not in ("RANGE", "LIST"):
+            raise ValueError(
+                f"Partitions of table `{meta.TABLE_NAME}` can't be pruned by key range, partitioning is {method}."
+            )
+
+        convert = cls._get_key_convertor(meta.TABLE_NAME, getattr(meta, "PARTITION_EXPRESSION", None))
+        key_from = None if key_from is None else convert(key_from)
+        key_to = None if key_to is None else convert(key_to)
+
+        if method.startswith("RANGE"):
+            return cls._get_range_partitions(partitions, key_from, key_to)
+        return cls._get_list_partitions(partitions, key_from, key_to)
+
+    @staticmethod
+    def render_clause(partitions: typing.Iterable[str]) -> str:
+        """
+        :return: SQL partition selection e.g. "PARTITION (`p2023`, `p2024`)"
+        """
+        return "PARTITION ({})".format(", ".join("`{}`".format(name.replace("`", "``")) for name in partitions))
+
+    @classmethod
+    def _get_range_partitions(cls, partitions: typing.Dict[str, str], key_from, key_to) -> typing.Tuple[str, ...]:
+        selected = []
+        lower_bound = None
+        for name, description in partitions.items():
+            upper_bound = cls._parse_values(description)[0]
+            # partition holds keys from previous bound (inclusive) to its bound (exclusive)
+            if (key_to is None or lower_bound is None or cls._compare(lower_bound, key_to) <= 0) and (
+                key_from is None or upper_bound is cls.MAXVALUE or cls._compare(key_from, upper_bound) < 0
+            ):
+                selected.append(name)
+            lower_bound = upper_bound
+        return tuple(selected)
+
+    @classmethod
+    def _get_list_partitions(cls, partitions: typing.Dict[str, str], key_from, key_to) -> typing.Tuple[str, ...]:
+        selected = []
+        for name, description in partitions.items():
+            for value in cls._parse_values(description):
+                if value is None:
+                    continue
+                if (key_from is None or cls._compare(key_from, value) <= 0) and (
+                    key_to is None or cls._compare(value, key_to) <= 0
+                ):
+                    selected.append(name)
+                    break
+        return tuple(selected)
+
+    @classmethod
+    def _get_key_convertor(cls, table_name: str, expression: typing.Optional[str]) -> typing.Callable:
+        found = cls.EXPRESSION_REGEX.match(expression or "")
+        if not found or bool(found.group(1)) != bool(found.group(3)):
+            raise ValueError(f"Partitioning expression '{expression}' of table `{table_name}` is not supported.")
+        function_name = found.group(1)
+        if function_name is None:
+            return lambda value: value
+        if function_name.lower() not in cls.FUNCTIONS:
+            raise ValueError(f"Partitioning function '{function_name}' of table `{table_name}` is not supported.")
+        return cls.FUNCTIONS[function_name.lower()]
+
+    @classmethod
+    def _parse_values(cls, description: typing.Optional[str]) -> typing.List:
+        """
+        :param description: Partition description e.g. "738886", "MAXVALUE", "'2024-01-01'" or "1,2,NULL"
+        """
+        values = []
+        for quoted, plain in cls.VALUE_REGEX.findall(description or ""):
+            if quoted or not plain:
+                values.append(quoted.replace("''", "'"))
+            elif plain.upper() == "MAXVALUE":
+                values.append(cls.MAXVALUE)
+            elif plain.upper() == "NULL":
+                values.append(None)
+            else:
+                values.append(float(plain) if "." in plain else int(plain))
+        return values
+
+    @staticmethod
+    def _to_literal(value) -> str:
+        if isinstance(value, datetime.datetime):
+            return value.isoformat(" ")
+        return str(value)
+
+    @staticmethod
+    def _compare(left, right) -> int:
+        # string bounds of COLUMNS partitioning are compared with keys in MySQL literal format
+        if isinstance(left, str) != isinstance(right, str):
+            left, right = (PartitionPruner._to_literal(value) for value in (left, right))
+        return (left > right) - (left < right)
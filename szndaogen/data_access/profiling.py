@@ -0,0 +1,267 @@
+import cProfile
+import pstats
+import random
+import threading
+import typing
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class _Phase:
+    __slots__ = ("call", "name", "start")
+
+    def __init__(self, call: "_Call", name: str):
+        self.call = call
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = perf_counter() - self.start
+        self.call.phases[self.name] = self.call.phases.get(self.name, 0.0) + duration
+        return False
+
+
+class _Call:
+    __slots__ = ("stack", "manager", "method", "phases", "children_time")
+
+    def __init__(self, stack: typing.Tuple[str, ...], manager: str, method: str):
+        self.stack = stack
+        self.manager = manager
+        self.method = method
+        self.phases: typing.Dict[str, float] = {}
+        self.children_time = 0.0
+
+
+class MethodStats(typing.NamedTuple):
+    manager: str
+    method: str
+    calls: int
+    total_s: float
+    """ Time of calls including nested manager calls """
+    phases: typing.Dict[str, float]
+    """ Phase name => time, "other" is time outside of phases and nested calls (e.g. logging) """
+
+
+class ManagerProfiler:
+    """
+    Opt-in profiler of manager methods. Every profiled call is split into phases ("build_sql", "db", "models",
+    "prefetch"), time outside of phases is reported as "other". Profiling is toggled at runtime by `enable` and
+    `disable`, disabled profiler costs one attribute check per manager call.
+
+    How to use it:
+        ManagerProfiler.enable(sample_rate=0.1)\n
+        ...\n
+        ManagerProfiler.get_stats()  # per manager and method\n
+        ManagerProfiler.dump_collapsed("manager.folded")  # flamegraph.pl manager.folded > manager.svg\n
+    """
+
+    is_enabled: bool = False
+    sample_rate: float = 1.0
+    """ Fraction of top level manager calls which are profiled """
+    use_cprofile: bool = False
+    """ Run `cProfile` during profiled calls, see `dump_cprofile` """
+
+    _NULL_PHASE = _NullPhase()
+    _lock = threading.Lock()
+    _local = threading.local()
+    _method_stats: typing.Dict[typing.Tuple[str, str], typing.List] = {}
+    _stacks: typing.Dict[typing.Tuple[str, ...], float] = {}
+    _profiles: typing.List[cProfile.Profile] = []
+
+    @classmethod
+    def enable(cls, sample_rate: float = 1.0, use_cprofile: bool = False):
+        """
+        :param sample_rate: Fraction of top level manager calls to be profiled, 1.0 => every call
+        :param use_cprofile: Collect `cProfile` statistics of profiled calls as well
+        """
+        cls.sample_rate = sample_rate
+        cls.use_cprofile = use_cprofile
+        cls.is_enabled = True
+
+    @classmethod
+    def disable(cls):
+        cls.is_enabled = False
+
+    @classmethod
+    def reset(cls):
+        """
+        Drop collected statistics
+        """
+        with cls._lock:
+            cls._method_stats = {}
+            cls._stacks = {}
+            cls._profiles = []
+        cls._local = threading.local()
+
+    @classmethod
+    @contextmanager
+    def profiling(cls, sample_rate: float = 1.0, use_cprofile: bool = False):
+        """
+        Enable profiler in `with` block, previous state is restored on exit
+        """
+        previous = (cls.is_enabled, cls.sample_rate, cls.use_cprofile)
+        cls.enable(sample_rate, use_cprofile)
+        try:
+            yield cls
+        finally:
+            cls.is_enabled, cls.sample_rate, cls.use_cprofile = previous
+
+    @classmethod
+    def profile_method(cls, fnc: typing.Callable) -> typing.Callable:
+        """
+        Decorator of manager methods. Decorated method is profiled if profiler is enabled.
+        `super()` call from decorated override (e.g. generated fast path) is part of the calling one.
+        """
+        method_name = fnc.__name__
+
+        @wraps(fnc)
+        def wrapper(self, *args, **kwargs):
+            if not cls.is_enabled:
+                return fnc(self, *args, **kwargs)
+            manager = self.__class__.__name__
+            calls = getattr(cls._local, "calls", None)
+            if calls and calls[-1] is not None and (calls[-1].manager, calls[-1].method) == (manager, method_name):
+                return fnc(self, *args, **kwargs)
+            with cls.call(manager, method_name):
+                return fnc(self, *args, **kwargs)
+
+        return wrapper
+
+    @classmethod
+    @contextmanager
+    def call(cls, manager: str, method: str):
+        """
+        Profile block as call of manager method. Nested calls are recorded under calling method.
+        :param manager: Name of manager class
+        :param method: Name of method
+        """
+        calls = getattr(cls._local, "calls", None)
+        if calls is None:
+            calls = cls._local.calls = []
+        parent = calls[-1] if calls else None
+        if calls and parent is None:
+            # nested in call which was not sampled
+            yield None
+            return
+        if not calls and (not cls.is_enabled or (cls.sample_rate < 1.0 and random.random() >= cls.sample_rate)):
+            calls.append(None)
+            try:
+                yield None
+            finally:
+                calls.pop()
+            return
+
+        frame = f"{manager}.{method}"
+        call = _Call((parent.stack if parent else ()) + (frame,), manager, method)
+        profile = cls._get_profile() if cls.use_cprofile and parent is None else None
+        calls.append(call)
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # another profiler is active (only one is allowed since Python 3.12)
+                profile = None
+        start = perf_counter()
+        try:
+            yield call
+        finally:
+            duration = perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            calls.pop()
+            if parent is not None:
+                parent.children_time += duration
+            cls._record(call, duration)
+
+    @classmethod
+    def phase(cls, name: str):
+        """
+        Context manager timing phase of current profiled call. It does nothing outside of profiled call.
+        :param name: Phase name e.g. "build_sql", "db", "models"
+        """
+        calls = getattr(cls._local, "calls", None)
+        if not calls or calls[-1] is None:
+            return cls._NULL_PHASE
+        return _Phase(calls[-1], name)
+
+    @classmethod
+    def get_stats(cls) -> typing.List[MethodStats]:
+        """
+        :return: Statistics per manager and method ordered by total time
+        """
+        with cls._lock:
+            stats = [
+                MethodStats(manager, method, calls, total, dict(phases))
+                for (manager, method), (calls, total, phases) in cls._method_stats.items()
+            ]
+        return sorted(stats, key=lambda item: item.total_s, reverse=True)
+
+    @classmethod
+    def dump_collapsed(cls, path: str):
+        """
+        Save statistics in collapsed stack format of flamegraph tools (e.g. `flamegraph.pl`, speedscope),
+        values are microseconds
+        :param path: Output file path
+        """
+        with cls._lock:
+            stacks = sorted(cls._stacks.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, duration in stacks:
+                microseconds = int(round(duration * 1000000))
+                if microseconds:
+                    f.write("{} {}\n".format(";".join(stack), microseconds))
+
+    @classmethod
+    def dump_cprofile(cls, path: str):
+        """
+        Save `cProfile` statistics of profiled calls, profiler has to be enabled with `use_cprofile=True`.
+        File can be read by `pstats`, `snakeviz` or converted by `flameprof`.
+        :param path: Output file path
+        """
+        with cls._lock:
+            profiles = list(cls._profiles)
+        if not profiles:
+            raise ValueError("There are no cProfile statistics. Enable profiler with use_cprofile=True.")
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+    @classmethod
+    def _get_profile(cls) -> cProfile.Profile:
+        # cProfile profiles only thread which enabled it, every thread has its own profile
+        profile = getattr(cls._local, "profile", None)
+        if profile is None:
+            profile = cls._local.profile = cProfile.Profile()
+            with cls._lock:
+                cls._profiles.append(profile)
+        return profile
+
+    @classmethod
+    def _record(cls, call: _Call, duration: float):
+        other = duration - call.children_time - sum(call.phases.values())
+        with cls._lock:
+            method_stats = cls._method_stats.get((call.manager, call.method))
+            if method_stats is None:
+                method_stats = cls._method_stats[(call.manager, call.method)] = [0, 0.0, {}]
+            method_stats[0] += 1
+            method_stats[1] += duration
+            phases = method_stats[2]
+            for name, phase_duration in call.phases.items():
+                phases[name] = phases.get(name, 0.0) + phase_duration
+                cls._stacks[call.stack + (name,)] = cls._stacks.get(call.stack + (name,), 0.0) + phase_duration
+            phases["other"] = phases.get("other", 0.0) + other
+            cls._stacks[call.stack] = cls._stacks.get(call.stack, 0.0) + other
@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+import typing
+
+from mysql.connector import Error
+
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+
+class RetryStats(typing.NamedTuple):
+    transactions: int
+    """ Number of transactions run with the policy """
+    attempts: int
+    """ Number of runs of wrapped functions including retries """
+    retries: int
+    recovered: int
+    """ Transactions which succeeded after retry """
+    exhausted: int
+    """ Transactions which failed with retryable error after last attempt """
+    backoff_s: float
+    """ Total time spent waiting between attempts """
+    errors: typing.Dict[int, int]
+    """ Error code => number of retryable errors """
+
+
+class RetryPolicy:
+    """
+    Retry policy of `DBI.transaction`. Transaction failed with retryable error (deadlock or lock wait timeout by
+    default) is rolled back and wrapped function is run again in new transaction after exponential backoff with jitter.
+    One policy can be shared by more transactions, its statistics are collected across all of them.
+
+    How to use it:
+        ORDER_RETRY = RetryPolicy(max_attempts=5, backoff_s=0.02)\n
+        @DBI.transaction("dbi", retry_policy=ORDER_RETRY)\n
+        def place_order(dbi):\n
+            ...\n
+        ORDER_RETRY.get_stats()\n
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        error_codes: typing.Iterable[int] = (ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT),
+        backoff_s: float = 0.05,
+        max_backoff_s: float = 2.0,
+        jitter: bool = True,
+        sleep: typing.Callable[[float], None] = time.sleep,
+    ):
+        """
+        :param max_attempts: Maximal number of runs of wrapped function, 1 => no retry
+        :param error_codes: MySQL error codes which are retried
+        :param backoff_s: Delay before first retry, it doubles with every next retry
+        :param max_backoff_s: Upper limit of delay
+        :param jitter: Wait random time between zero and delay ("full jitter"), so competing transactions don't retry
+            at the same moment
+        :param sleep: Function waiting between attempts
+        """
+        if max_attempts < 1:
+            raise ValueError("Retry policy needs at least one attempt.")
+        self.max_attempts = max_attempts
+        self.error_codes = frozenset(error_codes)
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.jitter = jitter
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def is_retryable(self, ex: BaseException) -> bool:
+        return isinstance(ex, Error) and ex.errno in self.error_codes
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        :param attempt: Number of failed attempt, starting by 1
+        :return: Seconds to wait before next attempt
+        """
+        delay = min(self.max_backoff_s, self.backoff_s * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def get_stats(self) -> RetryStats:
+        with self._lock:
+            return RetryStats(
+                self._transactions,
+                self._attempts,
+                self._attempts - self._transactions,
+                self._recovered,
+                self._exhausted,
+                self._backoff_s,
+                dict(self._errors),
+            )
+
+    def reset_stats(self):
+        with self._lock:
+            self._transactions = 0
+            self._attempts = 0
+            self._recovered = 0
+            self._exhausted = 0
+            self._backoff_s = 0.0
+            self._errors: typing.Dict[int, int] = {}
+
+    def on_attempt(self, attempt: int):
+        with self._lock:
+            self._attempts += 1
+            if attempt == 1:
+                self._transactions += 1
+
+    def on_success(self, attempt: int):
+        if attempt > 1:
+            with self._lock:
+                self._recovered += 1
+
+    def on_error(self, ex: BaseException, attempt: int) -> typing.Optional[float]:
+        """
+        Record failed attempt
+        :return: Seconds to wait before next attempt, None => error is not retried
+        """
+        if not self.is_retryable(ex):
+            return None
+        with self._lock:
+            self._errors[ex.errno] = self._errors.get(ex.errno, 0) + 1
+            if attempt >= self.max_attempts:
+                self._exhausted += 1
+                return None
+        delay = self.get_delay(attempt)
+        with self._lock:
+            self._backoff_s += delay
+        return delay
@@ -0,0 +1,229 @@
+import abc
+import bisect
+import heapq
+import itertools
+import os
+import re
+import threading
+import typing
+import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .model_base import ModelBase
+
+
+def case_insensitive_sort_key(value: str) -> str:
+    """
+    Sort key of strings approximating case and accent insensitive MySQL collations (e.g. utf8mb4_0900_ai_ci)
+    """
+    return "".join(char for char in unicodedata.normalize("NFKD", value.casefold()) if not unicodedata.combining(char))
+
+
+class ShardRouter(abc.ABC):
+    """
+    Maps value of shard key (see `Model.Meta.SHARD_KEY`) onto shard. Every shard is a connection profile
+    (see `Config.MYSQL_PROFILES`) with identical schema. Queries without shard key are run on all shards concurrently
+    by thread pool shared by all managers using the router.
+    """
+
+    def __init__(
+        self,
+        shards: typing.Sequence[str],
+        max_workers: int = None,
+        string_sort_key: typing.Optional[typing.Callable[[str], typing.Any]] = case_insensitive_sort_key,
+    ):
+        """
+        :param shards: Names of connection profiles of shards
+        :param max_workers: Number of threads running queries on shards, default number of shards
+        :param string_sort_key: Sort key of string values used for merging results of shards, it has to follow
+            collation of order by columns. Default fits case insensitive collations, None => binary collations.
+        """
+        if not shards:
+            raise ValueError("Shard router needs at least one shard.")
+        self.shards = tuple(shards)
+        self.max_workers = max_workers or len(self.shards)
+        self.string_sort_key = string_sort_key
+        self._executor: ThreadPoolExecutor = None
+        self._executor_pid: int = None
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def get_shard(self, key) -> str:
+        """
+        :param key: Value of shard key
+        :return: Name of shard owning the key
+        """
+
+    def map(self, fnc: typing.Callable[[str], typing.Any], shards: typing.Sequence[str] = None) -> typing.List:
+        """
+        Run function on shards concurrently
+        :param fnc: Function called with shard name
+        :param shards: Names of shards, default all shards
+        :return: Results in order of shards
+        """
+        shards = self.shards if shards is None else tuple(shards)
+        if len(shards) == 1:
+            return [fnc(shards[0])]
+        futures = [self._get_executor().submit(fnc, shard) for shard in shards]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._executor_pid != pid:
+            # threads of executor don't survive fork, forked child creates its own executor
+            self._executor = None
+            self._executor_pid = pid
+            self._lock = threading.Lock()
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="szndaogen-shard")
+        return self._executor
+
+
+class HashShardRouter(ShardRouter):
+    """
+    Integer keys are routed by modulo, other keys by CRC32 of their string value
+    """
+
+    def __init__(
+        self,
+        shards: typing.Sequence[str],
+        hash_function: typing.Callable[[typing.Any], int] = None,
+        max_workers: int = None,
+        string_sort_key: typing.Optional[typing.Callable[[str], typing.Any]] = case_insensitive_sort_key,
+    ):
+        """
+        :param shards: Names of connection profiles of shards
+        :param hash_function: Custom hash of shard key, it has to be stable across processes
+        :param max_workers: Number of threads running queries on shards, default number of shards
+        :param string_sort_key: See `ShardRouter.__init__`
+        """
+        super().__init__(shards, max_workers, string_sort_key)
+        self.hash_function = hash_function or self.default_hash
+
+    @staticmethod
+    def default_hash(key) -> int:
+        if isinstance(key, int):
+            return key
+        return zlib.crc32(str(key).encode("utf-8"))
+
+    def get_shard(self, key) -> str:
+        return self.shards[self.hash_function(key) % len(self.shards)]
+
+
+class RangeShardRouter(ShardRouter):
+    """
+    Keys lower than first boundary belong to first shard, keys from first boundary (inclusive) to second one
+    (exclusive) belong to second shard etc.
+    """
+
+    def __init__(
+        self,
+        boundaries: typing.Sequence,
+        shards: typing.Sequence[str],
+        max_workers: int = None,
+        string_sort_key: typing.Optional[typing.Callable[[str], typing.Any]] = case_insensitive_sort_key,
+    ):
+        """
+        :param boundaries: Sorted lower bounds of all shards but first one
+        :param shards: Names of connection profiles of shards, one more than boundaries
+        :param max_workers: Number of threads running queries on shards, default number of shards
+        :param string_sort_key: See `ShardRouter.__init__`
+        """
+        super().__init__(shards, max_workers, string_sort_key)
+        if len(self.shards) != len(boundaries) + 1:
+            raise ValueError("Range shard router needs exactly one shard more than boundaries.")
+        if list(boundaries) != sorted(boundaries):
+            raise ValueError("Boundaries of range shard router have to be sorted.")
+        self.boundaries = tuple(boundaries)
+
+    def get_shard(self, key) -> str:
+        return self.shards[bisect.bisect_right(self.boundaries, key)]
+
+
+class _OrderKey:
+    """
+    Sort key of model following SQL ORDER BY, NULL is lower than any value as in MySQL
+    """
+
+    __slots__ = ("values", "descending")
+
+    def __init__(self, values: typing.Tuple, descending: typing.Tuple[bool, ...]):
+        self.values = values
+        self.descending = descending
+
+    def __lt__(self, other: "_OrderKey") -> bool:
+        for left, right, descending in zip(self.values, other.values, self.descending):
+            if left == right:
+                continue
+            if descending:
+                left, right = right, left
+            if left is None:
+                return True
+            if right is None:
+                return False
+            return left < right
+        return False
+
+
+ORDER_BY_ITEM_REGEX = re.compile(r"^\s*(?:`?\w+`?\.)?`?(\w+)`?(?:\s+(ASC|DESC))?\s*$", re.I)
+
+
+def parse_order_by(order_by: typing.Sequence[str]) -> typing.List[typing.Tuple[str, bool]]:
+    """
+    :param order_by: SQL order by items e.g. ("`created` DESC", "id")
+    :return: List of (column name, descending)
+    :raise ValueError: Item is not plain column
+    """
+    columns = []
+    for item in order_by:
+        for part in item.split(","):
+            found = ORDER_BY_ITEM_REGEX.match(part)
+            if not found:
+                raise ValueError(f"Results of shards can't be merged by '{part.strip()}', order by columns only.")
+            columns.append((found.group(1), (found.group(2) or "").upper() == "DESC"))
+    return columns
+
+
+def merge_sorted(
+    results: typing.Sequence[typing.Iterable[ModelBase]],
+    order_by: typing.Sequence[str] = (),
+    limit: int = 0,
+    offset: int = 0,
+    string_sort_key: typing.Optional[typing.Callable[[str], typing.Any]] = case_insensitive_sort_key,
+) -> typing.Iterator[ModelBase]:
+    """
+    K-way merge of models sorted by the same order by on every shard. Results without order by are concatenated.
+    :param results: Sorted models per shard
+    :param order_by: SQL order by items of shard queries
+    :param limit: Maximum number of merged models, 0 => all
+    :param offset: Number of merged models to skip
+    :param string_sort_key: Sort key of string values following collation shards sorted them by, None => binary
+    """
+    if order_by:
+        columns = parse_order_by(order_by)
+        descending = tuple(is_descending for _, is_descending in columns)
+
+        def get_value(model_instance: ModelBase, column: str):
+            value = model_instance.model_data.get(column)
+            if string_sort_key is not None and isinstance(value, str):
+                return string_sort_key(value)
+            return value
+
+        merged = heapq.merge(
+            *results,
+            key=lambda model_instance: _OrderKey(
+                tuple(get_value(model_instance, column) for column, _ in columns), descending
+            )
+        )
+    else:
+        merged = itertools.chain.from_iterable(results)
+    return itertools.islice(merged, offset, offset + limit if limit else None)
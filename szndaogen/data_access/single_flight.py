@@ -0,0 +1,76 @@
+import threading
+import typing
+
+
+class _Flight:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalescing of identical concurrent calls. First caller of a key runs the function, callers of the same key
+    arriving before it finishes wait and share its result (or exception). Result is shared only by calls in flight,
+    nothing is cached after the call finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: typing.Dict[typing.Hashable, _Flight] = {}
+        self.executed_count = 0
+        """ Number of calls which ran the function """
+        self.coalesced_count = 0
+        """ Number of calls which waited for result of another call """
+
+    def do(
+        self,
+        key: typing.Hashable,
+        fnc: typing.Callable[[], typing.Any],
+        copy_result: typing.Callable[[typing.Any], typing.Any] = None,
+    ):
+        """
+        :param key: Identity of call
+        :param fnc: Function called without arguments
+        :param copy_result: Function copying result, every caller gets own copy if more callers share one result
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+                self.executed_count += 1
+            else:
+                flight.waiters += 1
+                self.coalesced_count += 1
+
+        if not is_leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy_result(flight.result) if copy_result else flight.result
+
+        try:
+            flight.result = fnc()
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                # no other waiter can join after flight was removed
+                has_waiters = flight.waiters > 0
+            flight.event.set()
+        return copy_result(flight.result) if copy_result and has_waiters else flight.result
+
+    def get_waiters(self, key: typing.Hashable) -> int:
+        """
+        :return: Number of callers waiting for call in flight
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            return flight.waiters if flight is not None else 0
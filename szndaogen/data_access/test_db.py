@@ -0,0 +1,272 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .db import DBI, ConnectionProfile
+from .manager_base import ManagerException, TableManagerBase
+from ..benchmarks.fake_driver import FakeConnection, FakeCursor, FakeDriver, FakePool, RowFactory
+from ..config import Config
+
+row_factory = RowFactory(width=5)
+
+
+class RecordingDriver(FakeDriver):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queries = []
+
+    def on_query(self, sql, params):
+        self.queries.append((sql, params))
+        super().on_query(sql, params)
+
+
+class OrdersManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("orders")
+
+
+class ReportsManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("reports")
+    MODEL_CLASS.Meta.DB_PROFILE = "reporting"
+
+
+@pytest.fixture
+def drivers():
+    primary = RecordingDriver(row_factory, result_size=3)
+    reporting = RecordingDriver(row_factory, result_size=2)
+    with primary.install(), reporting.install("reporting", session={"time_zone": "+00:00"}):
+        yield primary, reporting
+
+
+def test_managers_route_by_model_profile(drivers):
+    primary, reporting = drivers
+    assert len(OrdersManager().select_all()) == 3
+    assert len(ReportsManager().select_all()) == 2
+    assert [sql.split()[3] for sql, _ in primary.queries] == ["`orders`"]
+    assert reporting.queries[0] == ("SET SESSION time_zone = %s", ("+00:00",))
+    assert [sql.split()[3] for sql, _ in reporting.queries[1:]] == ["`reports`"]
+
+
+def test_session_is_set_once_per_connection(drivers):
+    _, reporting = drivers
+    with DBI.unit_of_work(profile="reporting") as dbi:
+        manager = ReportsManager(dbi)
+        manager.select_all()
+        manager.select_all()
+    assert [sql.startswith("SET SESSION") for sql, _ in reporting.queries] == [True, False, False]
+
+
+class PooledConnection(FakeConnection):
+    """
+    Pooled connection wrapping reused physical connection like `PooledMySQLConnection`
+    """
+
+    def __init__(self, driver: FakeDriver, physical_connection: FakeConnection):
+        super().__init__(driver, physical_connection.connection_id)
+        self._cnx = physical_connection
+
+
+class ReusingPool(FakePool):
+    def __init__(self, driver: FakeDriver):
+        super().__init__(driver)
+        self.physical_connection = driver.connect()
+
+    def get_connection(self) -> FakeConnection:
+        return PooledConnection(self.driver, self.physical_connection)
+
+
+class RecycledIdPool(FakePool):
+    """
+    New physical connection with thread id of previous one, e.g. after server restart
+    """
+
+    def get_connection(self) -> FakeConnection:
+        return FakeConnection(self.driver, 1)
+
+
+@pytest.mark.parametrize("pool_class, expected_sets", [(ReusingPool, 1), (RecycledIdPool, 2)])
+def test_session_is_set_once_per_physical_connection(drivers, pool_class, expected_sets):
+    _, reporting = drivers
+    DBI.connection_pools["reporting"] = pool_class(reporting)
+    for _ in range(2):
+        with DBI.unit_of_work(profile="reporting") as dbi:
+            ReportsManager(dbi).select_all()
+    assert sum(sql.startswith("SET SESSION") for sql, _ in reporting.queries) == expected_sets
+
+
+def test_manager_rejects_dbi_of_other_profile(drivers):
+    with pytest.raises(ManagerException):
+        ReportsManager(DBI())
+    assert OrdersManager(DBI(profile="default")).dbi.profile == "default"
+
+
+def test_profile_from_config():
+    Config.MYSQL_PROFILES = {"archive": {"host": "archive.db", "database": "archive", "session": {"sql_mode": ""}}}
+    try:
+        profile = DBI.get_profile("archive")
+        assert profile == ConnectionProfile(name="archive", host="archive.db", database="archive", session={"sql_mode": ""})
+        assert profile.connection_config["host"] == "archive.db"
+        assert DBI(profile="archive").profile == "archive"
+        with pytest.raises(LookupError):
+            DBI.get_profile("missing")
+    finally:
+        Config.MYSQL_PROFILES = {}
+        DBI.profiles.pop("archive", None)
+        DBI.connection_pools.pop("archive", None)
+
+
+@pytest.mark.parametrize("name", ["time_zone; DROP TABLE x", "@@time_zone", "@user_variable"])
+def test_invalid_session_variable(drivers, name):
+    with RecordingDriver(row_factory).install("broken", session={name: 1}):
+        with pytest.raises(ValueError):
+            DBI(profile="broken").execute("SELECT 1")
+
+
+class ClosingDriver(RecordingDriver):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.released = []
+
+    def release(self, connection):
+        self.released.append(connection.connection_id)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_forked_child_drops_parent_pools():
+    driver = ClosingDriver(row_factory)
+    with driver.install():
+        dbi = DBI()
+        dbi._get_connection()
+        pid = os.fork()
+        if pid == 0:
+            # child process, nothing may be closed over sockets shared with parent
+            status = 4
+            try:
+                status = 0 if DBI.connection_pool is None and not DBI.is_initialized else 1
+                DBI.profiles.pop(DBI.DEFAULT_PROFILE)  # default profile of Config has no pool
+                DBI()
+                status = status or (0 if DBI._pid == os.getpid() and DBI.connection_pool is None else 2)
+                status = status or (0 if not driver.released else 3)
+            except BaseException:
+                status = 4
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+        assert DBI.connection_pool is not None and DBI.is_initialized
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_dbi_created_before_fork_rebuilds_pools_in_child():
+    driver = ClosingDriver(row_factory)
+    with driver.install(), driver.install(profile="reports"):
+        dbi, reports_dbi = DBI(), DBI(profile="reports")
+        dbi.fetch_one("SELECT 1")
+        pid = os.fork()
+        if pid == 0:
+            status = 4
+            try:
+                created_pools = []
+                DBI._create_pool = staticmethod(
+                    lambda profile, pool_name: created_pools.append(pool_name) or FakePool(driver)
+                )
+                dbi.fetch_one("SELECT 1")
+                reports_dbi.fetch_one("SELECT 1")
+                status = 0 if created_pools == ["app_pool", "app_pool_reports"] else 1
+                status = status or (0 if dbi._get_pool() is DBI.connection_pool is not None else 2)
+                status = status or (0 if reports_dbi._get_pool() is DBI.connection_pools["reports"] else 3)
+            except BaseException:
+                status = 4
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+
+
+def test_pid_change_without_fork_hooks():
+    driver = ClosingDriver(row_factory)
+    with driver.install():
+        dbi = DBI()
+        connection = dbi._get_connection()
+        dbi._connection_pid = -1
+        assert dbi._get_connection() is not connection
+        assert driver.connection_count == 2 and not driver.released
+
+        DBI._pid = -1
+        DBI.profiles.pop(DBI.DEFAULT_PROFILE)  # default profile of Config has no pool
+        DBI()
+        assert DBI._pid == os.getpid() and DBI.connection_pool is None
+
+
+class IsolationCursor(FakeCursor):
+    def execute(self, sql, params=()):
+        connection = self.connection
+        if connection.is_closed or connection.owner != threading.get_ident() or connection.is_busy:
+            connection.driver.violations.append(sql)
+        connection.is_busy = True
+        try:
+            super().execute(sql, params)
+        finally:
+            connection.is_busy = False
+
+
+class IsolationConnection(FakeConnection):
+    def __init__(self, driver, connection_id):
+        super().__init__(driver, connection_id)
+        self.owner = threading.get_ident()
+        self.is_closed = False
+        self.is_busy = False
+
+    def cursor(self, dictionary=False):
+        return IsolationCursor(self, dictionary=dictionary)
+
+    def close(self):
+        if self.owner != threading.get_ident():
+            self.driver.violations.append("close")
+        self.is_closed = True
+        super().close()
+
+
+class IsolationDriver(FakeDriver):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.violations = []
+
+    def connect(self):
+        connection = super().connect()
+        return IsolationConnection(self, connection.connection_id)
+
+
+def test_shared_dbi_keeps_connection_per_thread():
+    driver = IsolationDriver(row_factory, result_size=5, latency_ms=0.2)
+    thread_count, iterations = 16, 20
+
+    with driver.install():
+        shared_dbi = DBI()
+        manager = OrdersManager(shared_dbi)
+
+        class Service:
+            dbi = shared_dbi
+
+            @DBI.use_self_dbi()
+            def run(self):
+                models = manager.select_all(limit=5)
+                manager.select_one(1)
+                manager.update_one(models[0].map_model_attributes())
+                return len(models)
+
+        def worker():
+            barrier.wait(timeout=5)
+            return [Service().run() + len(manager.select_all()) for _ in range(iterations)]
+
+        barrier = threading.Barrier(thread_count)
+        with ThreadPoolExecutor(thread_count) as executor:
+            results = list(executor.map(lambda _: worker(), range(thread_count)))
+
+    assert driver.violations == []
+    assert results == [[10] * iterations] * thread_count
+    # pinned run and unpinned select_all get own connection
+    assert driver.connection_count == thread_count * iterations * 2
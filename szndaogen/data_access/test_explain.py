@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from mysql.connector import errors
+
+from .explain import ExplainCapture, TablePlan, parse_plan
+from .manager_base import TableManagerBase
+from ..benchmarks.fake_driver import FakeDriver, RowFactory
+
+row_factory = RowFactory(width=3, type_mix=("int", "str"))
+
+PLANS = {
+    "users": FakeDriver.create_plan("users", rows=52000),
+    "orders": FakeDriver.create_plan("orders", "const", key="PRIMARY"),
+}
+
+
+class UsersManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("users")
+
+
+class OrdersManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("orders")
+
+
+class BrokenExplainDriver(FakeDriver):
+    def on_query(self, sql, params):
+        super().on_query(sql, params)
+        if sql.startswith("EXPLAIN"):
+            raise errors.ProgrammingError(msg="EXPLAIN denied", errno=1142)
+
+
+@pytest.fixture
+def capture():
+    ExplainCapture.reset()
+    with ExplainCapture.capturing(scan_rows_threshold=1000):
+        yield ExplainCapture
+    ExplainCapture.reset()
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        (
+            "SELECT /*+ MAX_EXECUTION_TIME(100) */ *  FROM `t1` WHERE (`id` IN (%s, %s, %s)) LIMIT 10",
+            "SELECT * FROM `t1` WHERE (`id` IN (...)) LIMIT ?",
+        ),
+        (
+            "SELECT * FROM `p2022` WHERE ((`a`, `b`) IN ((%s, %s), (%s, %s))) AND name = 'x''y' AND v > -1.5",
+            "SELECT * FROM `p2022` WHERE ((`a`, `b`) IN (...)) AND name = ? AND v > ?",
+        ),
+    ],
+)
+def test_fingerprint(sql, expected):
+    assert ExplainCapture.get_fingerprint(sql) == expected
+
+
+def test_parse_join_plan():
+    plan = {
+        "query_block": {
+            "select_id": 1,
+            "nested_loop": [
+                {"table": {"table_name": "o", "access_type": "ALL", "rows_examined_per_scan": 3000}},
+                {"table": {"table_name": "c", "access_type": "eq_ref", "key": "PRIMARY", "rows": 1}},
+            ],
+        }
+    }
+    assert parse_plan(plan) == (TablePlan("o", "ALL", None, 3000), TablePlan("c", "eq_ref", "PRIMARY", 1))
+
+
+def test_every_fingerprint_is_explained_once(capture, tmp_path):
+    with FakeDriver(row_factory, result_size=3, plans=PLANS).install() as driver:
+        UsersManager().select_all("name = %s", ("Jane",))
+        UsersManager().select_all("name = %s", ("John",))
+        list(UsersManager().select_iter("name = %s", ("Jane",)))
+        OrdersManager().select_one(1)
+    # select_iter runs the same SQL as select_all
+    assert driver.query_count == 4 + 2
+
+    users_plan, orders_plan = capture.get_plans()
+    assert (users_plan.executions, users_plan.get_scans()) == (3, [TablePlan("users", "ALL", None, 52000)])
+    assert orders_plan.tables == (TablePlan("orders", "const", "PRIMARY", 1, ("PRIMARY",)),)
+    assert capture.get_flagged_plans() == [users_plan]
+    assert capture.get_flagged_plans(scan_rows_threshold=100000) == []
+
+    capture.write_report(str(tmp_path / "explain.txt"))
+    report = (tmp_path / "explain.txt").read_text()
+    assert "2 distinct queries, 1 with table scan over 1000 rows" in report
+    assert "users access_type=ALL key=- rows=52000 executions=3" in report
+    capture.dump_json(str(tmp_path / "explain.json"))
+    assert json.loads((tmp_path / "explain.json").read_text())[1]["tables"][0]["key"] == "PRIMARY"
+
+
+def test_explain_error_does_not_break_query(capture):
+    with BrokenExplainDriver(row_factory, result_size=3).install():
+        assert len(UsersManager().select_all()) == 3
+    (plan,) = capture.get_plans()
+    assert "EXPLAIN denied" in plan.error
+    assert "error: " in capture.get_report()
+
+
+def test_disabled_capture_runs_no_explain():
+    ExplainCapture.reset()
+    with FakeDriver(row_factory).install() as driver:
+        UsersManager().select_one(1)
+    assert driver.query_count == 1
+    assert ExplainCapture.get_plans() == []
@@ -0,0 +1,111 @@
+import typing
+
+import pytest
+
+from .fake_dbi import FakeDBI
+from .identity_map import IdentityMap
+from .manager_base import TableManagerBase
+from .model_base import ModelBase
+
+
+class TModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "table"
+        TABLE_TYPE: str = "BASE TABLE"
+        # fmt: off
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `table` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        # fmt: on
+
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+
+        PRIMARY_KEYS: typing.List = ["id", ]
+        ATTRIBUTE_LIST: typing.List = ["id", "name", ]
+        ATTRIBUTE_TYPES: typing.Dict = {
+            "id": int,
+            "name": str,
+        }
+        MODEL_DATA_CONVERTOR: typing.Dict = {
+        }
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.id: int = None
+        self.name: str = None
+        super().__init__(init_data)
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = TModel
+
+
+_rows = [{"id": 1, "name": "first"}, {"id": 2, "name": "second"}]
+
+
+def test_select_one_without_identity_map():
+    dbi = FakeDBI(_rows)
+    manager = TManager(dbi=dbi)
+    assert manager.select_one(1) is not manager.select_one(1)
+    assert len(dbi.queries) == 2
+
+
+def test_select_one_served_from_identity_map():
+    dbi = FakeDBI(_rows)
+    dbi.identity_map = IdentityMap()
+    manager = TManager(dbi=dbi)
+    model = manager.select_one(1)
+    assert manager.select_one(1) is model
+    assert TManager(dbi=dbi).select_one(1) is model
+    assert len(dbi.queries) == 1
+
+
+def test_select_all_populates_identity_map():
+    dbi = FakeDBI(_rows)
+    dbi.identity_map = IdentityMap()
+    manager = TManager(dbi=dbi)
+    first = manager.select_one(1)
+    models = manager.select_all()
+    assert models[0] is first
+    assert manager.select_one(2) is models[1]
+    assert len(dbi.queries) == 2
+
+
+def test_select_with_projection_bypasses_identity_map():
+    dbi = FakeDBI(_rows)
+    dbi.identity_map = IdentityMap()
+    manager = TManager(dbi=dbi)
+    manager.select_all(projection=("id",))
+    assert len(dbi.identity_map) == 0
+
+
+def test_writes_update_identity_map():
+    dbi = FakeDBI(_rows)
+    dbi.identity_map = IdentityMap()
+    manager = TManager(dbi=dbi)
+    model = manager.select_one(1)
+
+    changed = TModel({"id": 1, "name": "changed"})
+    manager.update_one(changed)
+    assert manager.select_one(1) is changed
+
+    manager.delete_one(changed)
+    assert manager.select_one(1) is not changed
+
+    manager.select_all()
+    manager.delete_all("name = %s", ("first",))
+    assert len(dbi.identity_map) == 0
+    assert model is not manager.select_one(1)
+
+
+@pytest.mark.parametrize("option", ["use_insert_ignore_statement", "use_on_duplicate_update_statement"])
+def test_insert_ignore_and_upsert_evict_identity_map(option):
+    dbi = FakeDBI(_rows)
+    dbi.identity_map = IdentityMap()
+    manager = TManager(dbi=dbi)
+    stored = manager.select_one(1)
+
+    # stored row stays or it is merged with the model, model does not represent it
+    inserted = TModel({"id": 1, "name": "ignored"})
+    manager.insert_one(inserted, **{option: True})
+    loaded = manager.select_one(1)
+    assert loaded is not inserted and loaded is not stored
+    assert loaded.to_dict()["name"] == "first"
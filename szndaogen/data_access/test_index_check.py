@@ -0,0 +1,108 @@
+import typing
+
+import pytest
+
+from .fake_dbi import FakeDBI
+from .index_check import IndexUsageChecker
+from .manager_base import TableManagerBase
+from .model_base import Index, ModelBase
+from ..config import Config
+from ..tools.log import BaseLogger, Logger
+
+
+class TModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "users"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `users` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["id", ]
+        INDEXES: typing.Dict = {
+            "PRIMARY": Index(columns=("id", ), is_unique=True, index_type="BTREE"),
+            "users_company_created": Index(columns=("company_id", "created", ), is_unique=False, index_type="BTREE"),
+            "users_bio": Index(columns=("bio", ), is_unique=False, index_type="FULLTEXT"),
+        }
+        ATTRIBUTE_LIST: typing.List = ["id", "company_id", "name", "bio", "created", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"id": int, "company_id": int, "name": str, "bio": str, "created": str}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.id: int = None
+        self.company_id: int = None
+        self.name: str = None
+        self.bio: str = None
+        self.created: str = None
+        super().__init__(init_data)
+
+
+@pytest.mark.parametrize(
+    "condition, order_by, warnings_count",
+    [
+        ("1", (), 0),
+        ("id = %s", (), 0),
+        ("`users`.`company_id` IN (%s, %s) AND name = %s", (), 0),
+        ("name = %s", (), 1),
+        ("name = 'company_id = 1'", (), 1),
+        ("bio LIKE %s", (), 1),
+        ("company_id = %s OR name = %s", (), 1),
+        ("1", ("id",), 0),
+        ("1", ("`users`.`id` DESC",), 0),
+        ("company_id = %s", ("created DESC",), 0),
+        ("1", ("created",), 1),
+        ("1", ("name",), 1),
+        ("1", ("RAND()",), 1),
+        ("name = %s", ("name",), 2),
+        ("`other`.`name` = %s", (), 0),
+    ],
+)
+def test_index_usage_warnings(condition, order_by, warnings_count):
+    assert len(IndexUsageChecker.get_warnings(TModel, condition, order_by)) == warnings_count
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = TModel
+
+
+class CollectingLogger(BaseLogger):
+    def __init__(self):
+        super().__init__()
+        self.warnings = []
+
+    def warning(self, event: str, **kwargs) -> str:
+        self.warnings.append(kwargs)
+        return super().warning(event, **kwargs)
+
+
+@pytest.fixture
+def logger(monkeypatch):
+    logger = CollectingLogger()
+    monkeypatch.setattr(Logger, "log", logger)
+    IndexUsageChecker.reset()
+    yield logger
+    IndexUsageChecker.reset()
+
+
+@pytest.mark.parametrize("is_enabled, warnings_count", [(True, 1), (False, 0)])
+def test_manager_logs_unindexed_condition_once(monkeypatch, logger, is_enabled, warnings_count):
+    monkeypatch.setattr(Config, "MANAGER_CHECK_INDEXES", is_enabled)
+    manager = TManager(dbi=FakeDBI())
+    manager.select_all("name = %s", ("john",))
+    manager.select_all("name = %s", ("jane",))
+    manager.select_all("company_id = %s", (1,), order_by=("created",))
+
+    assert len(logger.warnings) == warnings_count
+    if warnings_count:
+        assert logger.warnings[0]["manager"] == "TManager"
+        assert logger.warnings[0]["message"] == "Condition on column(s) name of table `users` will not use any index."
+
+
+def test_reported_query_shapes_are_bounded(monkeypatch, logger):
+    monkeypatch.setattr(IndexUsageChecker, "MAX_REPORTED", 2)
+    for condition in ("name = 'a'", "name = 'b'", "name = 'a'", "name = 'c'", "name = 'a'", "name = 'b'"):
+        IndexUsageChecker.check(TModel, condition)
+
+    # 'a' stays remembered as recently checked, 'b' is dropped by 'c' and reported again
+    reported_conditions = [warning["condition"] for warning in logger.warnings]
+    assert reported_conditions == ["name = 'a'", "name = 'b'", "name = 'c'", "name = 'b'"]
+    assert len(IndexUsageChecker._reported) == 2
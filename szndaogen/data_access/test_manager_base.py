@@ -0,0 +1,97 @@
+import typing
+
+import pytest
+
+from .fake_dbi import FakeDBI
+from .manager_base import ManagerException, TableManagerBase
+from .model_base import ModelBase, UnloadedAttributeError
+
+
+class TModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "table"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `table` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["id", ]
+        ATTRIBUTE_LIST: typing.List = ["id", "name", "description", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"id": int, "name": str, "description": str}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.id: int = None
+        self.name: str = "default"
+        self.description: str = "default"
+        super().__init__(init_data)
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = TModel
+
+
+_parse_projection_columns_input = [
+    (("id", "name"), ["id", "name"]),
+    (("`t`.`id`", "t.name AS `title`", "COUNT(*) cnt"), ["id", "title", "cnt"]),
+    (("t.*",), None),
+]
+
+
+@pytest.mark.parametrize("projection, expected", _parse_projection_columns_input)
+def test_parse_projection_columns(projection, expected):
+    assert TManager._parse_projection_columns(projection) == expected
+
+
+def test_select_with_projection_returns_partial_model():
+    manager = TManager(dbi=FakeDBI([{"id": 1, "name": "first"}]))
+    model = manager.select_all(projection=("id", "name"))[0]
+    assert model.IS_PARTIAL
+    assert type(model) is type(manager.select_all(projection=("id", "name"))[0])
+    assert (model.id, model.name) == (1, "first")
+    with pytest.raises(UnloadedAttributeError):
+        _ = model.description
+
+    full_model = manager.select_all(projection=("id", "name", "description"))[0]
+    assert type(full_model) is TModel
+
+
+def test_update_partial_model_touches_loaded_columns_only():
+    dbi = FakeDBI([{"id": 1, "name": "first"}])
+    manager = TManager(dbi=dbi)
+    model = manager.select_all(projection=("id", "name"))[0]
+    model.name = "changed"
+    manager.update_one(model)
+    assert dbi.executed == [("UPDATE `table` SET `id` = %s, `name` = %s WHERE id = %s LIMIT 1", [1, "changed", 1])]
+
+
+def test_select_iter_streams_models():
+    class StreamingDBI(FakeDBI):
+        def fetch_iter(self, sql, sql_args: tuple = (), dictionary_output=True, batch_size: int = 1000):
+            self.executed.append((sql, batch_size))
+            for row in self.rows:
+                yield dict(row)
+
+    dbi = StreamingDBI([{"id": 1, "name": "first", "description": ""}, {"id": 2, "name": "second", "description": ""}])
+    models = TManager(dbi=dbi).select_iter(order_by=("id ASC",), batch_size=10)
+    assert not dbi.executed
+    assert [model.to_dict()["id"] for model in models] == [1, 2]
+    assert dbi.executed == [("SELECT * FROM `table` WHERE (1) ORDER BY id ASC  ", 10)]
+
+
+def test_bulk_insert_of_partial_models():
+    dbi = FakeDBI()
+    manager = TManager(dbi=dbi)
+    partial_class = TModel.partial_class(("id", "name"))
+    manager.insert_one_bulk(partial_class({"id": 1, "name": "first"}))
+    manager.insert_one_bulk(partial_class({"id": 2, "name": "second"}))
+    with pytest.raises(ManagerException):
+        manager.insert_one_bulk(TModel({"id": 3}))
+    with pytest.raises(ManagerException):
+        manager.insert_one_bulk(TModel.partial_class(("id",))({"id": 4}))
+    assert manager.insert_bulk_flush() == 2
+    manager.insert_one_bulk(TModel.partial_class(("id",))({"id": 4}))
+    manager.insert_bulk_flush()
+    assert dbi.executed == [
+        ("INSERT INTO `table` (`id`, `name`) VALUES (%s, %s)", [[1, "first"], [2, "second"]]),
+        ("INSERT INTO `table` (`id`) VALUES (%s)", [[4]]),
+    ]
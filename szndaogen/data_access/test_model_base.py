@@ -1,6 +1,8 @@
 import typing
 
-from .model_base import ModelBase
+import pytest
+
+from .model_base import ModelBase, UnloadedAttributeError
 
 
 class TModel(ModelBase):
@@ -54,3 +56,20 @@ def test_model_clone():
     assert model_clone.id == model.id
     assert model_clone.name == model.name
     assert model_clone.to_dict() == model.to_dict()
+
+
+def test_model_partial_class():
+    partial_class = TModel.partial_class(("name",))
+    assert partial_class is TModel.partial_class(("name",))
+    assert partial_class.IS_PARTIAL and not TModel.IS_PARTIAL
+    assert partial_class.Meta.ATTRIBUTE_LIST == ["name"]
+    assert partial_class.Meta.TABLE_NAME == TModel.Meta.TABLE_NAME
+
+    model = partial_class({"name": "partial_name"})
+    assert isinstance(model, TModel)
+    assert model.name == "partial_name"
+    assert model.to_dict() == {"name": "partial_name"}
+    with pytest.raises(UnloadedAttributeError):
+        _ = model.id
+    with pytest.raises(AttributeError):
+        _ = model.unknown_attribute
@@ -0,0 +1,151 @@
+import datetime
+import typing
+
+import pytest
+
+from .fake_dbi import FakeDBI
+from .identity_map import IdentityMap
+from .manager_base import ManagerException, TableManagerBase
+from .model_base import ModelBase
+from .partitions import PartitionPruner
+
+
+class TModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "events"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `events` {PARTITION} {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["id", "created", ]
+        PARTITION_METHOD: str = "RANGE"
+        PARTITION_EXPRESSION: str = "to_days(`created`)"
+        PARTITIONS: typing.Dict = {
+            "p2021": "738521",
+            "p2022": "738886",
+            "pmax": "MAXVALUE",
+        }
+        ATTRIBUTE_LIST: typing.List = ["id", "created", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"id": int, "created": datetime.date}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.id: int = None
+        self.created: datetime.date = None
+        super().__init__(init_data)
+
+
+def _model_class(**meta_attributes) -> typing.Type[ModelBase]:
+    return type("PartitionedModel", (ModelBase,), {"Meta": type("Meta", (TModel.Meta,), meta_attributes)})
+
+
+@pytest.mark.parametrize(
+    "meta_attributes, key_from, key_to, expected",
+    [
+        ({}, datetime.date(2021, 6, 1), datetime.date(2021, 12, 31), ("p2021",)),
+        ({}, datetime.date(2022, 1, 1), datetime.date(2022, 1, 1), ("p2022",)),
+        ({}, datetime.datetime(2022, 12, 31, 23, 59), None, ("p2022", "pmax")),
+        ({}, None, "2021-12-31", ("p2021",)),
+        ({}, None, None, ("p2021", "p2022", "pmax")),
+        (
+            {"PARTITION_METHOD": "RANGE COLUMNS", "PARTITION_EXPRESSION": "`created`", "PARTITIONS": {
+                "p2022": "'2022-01-01'", "p2023": "'2023-01-01'",
+            }},
+            datetime.datetime(2022, 1, 1, 10, 0),
+            datetime.date(2024, 1, 1),
+            ("p2023",),
+        ),
+        (
+            {"PARTITION_METHOD": "RANGE", "PARTITION_EXPRESSION": "year(`created`)", "PARTITIONS": {
+                "p2022": "2022", "p2023": "2023",
+            }},
+            datetime.date(2020, 1, 1),
+            datetime.date(2021, 1, 1),
+            ("p2022",),
+        ),
+        (
+            {"PARTITION_METHOD": "LIST", "PARTITION_EXPRESSION": "`id`", "PARTITIONS": {
+                "podd": "1,3,5", "peven": "2,4,NULL",
+            }},
+            4,
+            5,
+            ("podd", "peven"),
+        ),
+        (
+            {"PARTITION_METHOD": "LIST", "PARTITION_EXPRESSION": "`id`", "PARTITIONS": {
+                "podd": "1,3,5", "peven": "2,4,NULL",
+            }},
+            6,
+            None,
+            (),
+        ),
+    ],
+)
+def test_get_partitions(meta_attributes, key_from, key_to, expected):
+    assert PartitionPruner.get_partitions(_model_class(**meta_attributes), key_from, key_to) == expected
+
+
+@pytest.mark.parametrize(
+    "meta_attributes",
+    [
+        {"PARTITION_METHOD": None, "PARTITIONS": {}},
+        {"PARTITION_METHOD": "HASH", "PARTITION_EXPRESSION": "`id`", "PARTITIONS": {"p0": None, "p1": None}},
+        {"PARTITION_EXPRESSION": "month(`created`)"},
+        {"PARTITION_EXPRESSION": "`id` DIV 10"},
+    ],
+)
+def test_get_partitions_unsupported(meta_attributes):
+    with pytest.raises(ValueError):
+        PartitionPruner.get_partitions(_model_class(**meta_attributes), 1, 2)
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = TModel
+
+
+def test_manager_selects_partitions():
+    dbi = FakeDBI()
+    manager = TManager(dbi=dbi)
+    partitions = manager.get_partitions(datetime.date(2022, 6, 1), datetime.date(2023, 6, 1))
+    assert partitions == ("p2022", "pmax")
+
+    manager.select_all("created >= %s", (datetime.date(2022, 6, 1),), partitions=partitions)
+    manager.select_one(1, datetime.date(2022, 6, 1), partitions=("p2022",))
+    list(manager.select_iter(partitions=partitions))
+    manager.delete_all("created < %s", (datetime.date(2022, 1, 1),), partitions=("p2021",))
+    manager.select_all()
+
+    assert dbi.queries == [
+        "SELECT * FROM `events` PARTITION (`p2022`, `pmax`) WHERE (created >= %s)",
+        "SELECT * FROM `events` PARTITION (`p2022`) WHERE (id = %s AND created = %s) LIMIT 1",
+        "SELECT * FROM `events` PARTITION (`p2022`, `pmax`) WHERE (1)",
+        "DELETE FROM `events` PARTITION (`p2021`) WHERE created < %s",
+        "SELECT * FROM `events` WHERE (1)",
+    ]
+
+
+def test_select_one_with_partitions_skips_identity_map():
+    dbi = FakeDBI()
+    dbi.identity_map = IdentityMap()
+    dbi.identity_map.add(TModel({"id": 1, "created": datetime.date(2021, 6, 1)}))
+    manager = TManager(dbi=dbi)
+
+    assert manager.select_one(1, datetime.date(2021, 6, 1), partitions=("p2022",)) is None
+    assert dbi.queries == ["SELECT * FROM `events` PARTITION (`p2022`) WHERE (id = %s AND created = %s) LIMIT 1"]
+    assert manager.select_one(1, datetime.date(2021, 6, 1)) is not None
+    assert len(dbi.queries) == 1
+
+
+@pytest.mark.parametrize(
+    "meta_attributes, partitions",
+    [
+        ({}, ("p2020",)),
+        ({"SQL_STATEMENT": "SELECT {PROJECTION} FROM `events` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"}, ("p2022",)),
+    ],
+)
+def test_manager_rejects_partitions(meta_attributes, partitions):
+    class Manager(TableManagerBase):
+        MODEL_CLASS = _model_class(**meta_attributes)
+
+    with pytest.raises(ManagerException):
+        Manager(dbi=FakeDBI()).select_all(partitions=partitions)
@@ -0,0 +1,112 @@
+import typing
+
+import pytest
+
+from .fake_dbi import FakeDBI
+from .manager_base import ManagerException, TableManagerBase
+from .model_base import ModelBase, Relation
+
+
+class CustomersModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "customers"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `customers` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["customerNumber", ]
+        ATTRIBUTE_LIST: typing.List = ["customerNumber", "name", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"customerNumber": int, "name": str}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+        RELATIONS: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.customerNumber: int = None
+        self.name: str = None
+        super().__init__(init_data)
+
+
+class OrderdetailsModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "orderdetails"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `orderdetails` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["orderNumber", "productCode", ]
+        ATTRIBUTE_LIST: typing.List = ["orderNumber", "productCode", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"orderNumber": int, "productCode": str}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+        RELATIONS: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.orderNumber: int = None
+        self.productCode: str = None
+        super().__init__(init_data)
+
+
+class OrdersModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "orders"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `orders` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["orderNumber", ]
+        ATTRIBUTE_LIST: typing.List = ["orderNumber", "customerNumber", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"orderNumber": int, "customerNumber": int}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+        RELATIONS: typing.Dict = {
+            "customers": Relation(
+                table_name="customers",
+                model_module="test_prefetch",
+                model_class="CustomersModel",
+                columns=("customerNumber", ),
+                referenced_columns=("customerNumber", ),
+                is_many=False,
+            ),
+            "orderdetails": Relation(
+                table_name="orderdetails",
+                model_module="test_prefetch",
+                model_class="OrderdetailsModel",
+                columns=("orderNumber", ),
+                referenced_columns=("orderNumber", ),
+                is_many=True,
+            ),
+        }
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.orderNumber: int = None
+        self.customerNumber: int = None
+        super().__init__(init_data)
+
+
+class OrdersManager(TableManagerBase):
+    MODEL_CLASS = OrdersModel
+
+
+_tables = {
+    "orders": [{"orderNumber": 1, "customerNumber": 10}, {"orderNumber": 2, "customerNumber": 10},
+               {"orderNumber": 3, "customerNumber": 20}],
+    "customers": [{"customerNumber": 10, "name": "ten"}, {"customerNumber": 20, "name": "twenty"}],
+    "orderdetails": [{"orderNumber": 1, "productCode": "A"}, {"orderNumber": 1, "productCode": "B"},
+                     {"orderNumber": 3, "productCode": "C"}],
+}
+
+
+def test_prefetch_many_to_one_and_one_to_many():
+    dbi = FakeDBI(tables=_tables)
+    orders = OrdersManager(dbi=dbi).select_all(prefetch=("customers", "orderdetails"))
+
+    assert dbi.queries[1:] == [
+        "SELECT * FROM `customers` WHERE `customerNumber` IN (%s, %s)",
+        "SELECT * FROM `orderdetails` WHERE `orderNumber` IN (%s, %s, %s)",
+    ]
+    assert [order.customers.to_dict()["name"] for order in orders] == ["ten", "ten", "twenty"]
+    assert orders[0].customers is orders[1].customers
+    assert [[item.to_dict()["productCode"] for item in order.orderdetails] for order in orders] == [["A", "B"], [], ["C"]]
+
+
+def test_prefetch_unknown_relation():
+    with pytest.raises(ManagerException):
+        OrdersManager(dbi=FakeDBI(tables=_tables)).select_all(prefetch=("payments",))
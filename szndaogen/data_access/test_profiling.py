@@ -0,0 +1,75 @@
+import pstats
+
+import pytest
+
+from .manager_base import TableManagerBase
+from .profiling import ManagerProfiler
+from ..benchmarks.fake_driver import FakeDriver, RowFactory
+
+row_factory = RowFactory(width=5)
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("items")
+
+
+@pytest.fixture
+def driver():
+    ManagerProfiler.reset()
+    with FakeDriver(row_factory, result_size=20).install() as driver:
+        yield driver
+    ManagerProfiler.disable()
+    ManagerProfiler.reset()
+
+
+def _run_queries():
+    manager = TManager()
+    models = manager.select_all()
+    manager.select_one(1)
+    manager.bulk_insert_buffer_size = 10
+    for model_instance in models:
+        manager.insert_one_bulk(model_instance)
+
+
+def test_disabled_profiler_collects_nothing(driver):
+    _run_queries()
+    with ManagerProfiler.profiling(sample_rate=0.0):
+        _run_queries()
+    assert ManagerProfiler.get_stats() == []
+    assert not ManagerProfiler.is_enabled
+
+
+def test_profiler_collects_phases_per_method(driver, tmp_path):
+    with ManagerProfiler.profiling():
+        _run_queries()
+    _run_queries()
+
+    stats = {(item.manager, item.method): item for item in ManagerProfiler.get_stats()}
+    assert {key: item.calls for key, item in stats.items()} == {
+        ("TManager", "select_all"): 1,
+        ("TManager", "select_one"): 1,
+        ("TManager", "insert_one_bulk"): 20,
+        ("TManager", "insert_bulk_flush"): 2,
+    }
+    select_all = stats[("TManager", "select_all")]
+    assert set(select_all.phases) == {"build_sql", "db", "models", "prefetch", "other"}
+    assert sum(select_all.phases.values()) == pytest.approx(select_all.total_s)
+
+    collapsed_path = tmp_path / "manager.folded"
+    ManagerProfiler.dump_collapsed(str(collapsed_path))
+    stacks = [line.rsplit(" ", 1)[0] for line in collapsed_path.read_text().splitlines()]
+    assert "TManager.select_all;db" in stacks
+    assert "TManager.insert_one_bulk;TManager.insert_bulk_flush;db" in stacks
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in collapsed_path.read_text().splitlines())
+
+
+def test_profiler_dumps_cprofile_stats(driver, tmp_path):
+    with pytest.raises(ValueError):
+        ManagerProfiler.dump_cprofile(str(tmp_path / "empty.prof"))
+
+    with ManagerProfiler.profiling(use_cprofile=True):
+        _run_queries()
+    ManagerProfiler.dump_cprofile(str(tmp_path / "manager.prof"))
+
+    functions = {function_name for _, _, function_name in pstats.Stats(str(tmp_path / "manager.prof")).stats}
+    assert {"fetch_all", "execute_many"} <= functions
@@ -0,0 +1,133 @@
+import pytest
+from mysql.connector import errors
+
+from .db import CR_SERVER_LOST_EXTENDED, DBI, ER_QUERY_TIMEOUT, QueryTimeoutException
+from .manager_base import ManagerException, TableManagerBase
+from ..benchmarks.fake_driver import FakeConnection, FakeDriver, RowFactory
+
+row_factory = RowFactory(width=3, type_mix=("int", "str"))
+
+
+class SlowDriver(FakeDriver):
+    """
+    Selects exceed time limit, error is raised by server or by client read timeout
+    """
+
+    def __init__(self, errno: int = None, *args, **kwargs):
+        super().__init__(row_factory, *args, **kwargs)
+        self.errno = errno
+        self.queries = []
+        self.released = []
+
+    def on_query(self, sql, params):
+        super().on_query(sql, params)
+        self.queries.append(sql)
+        if self.errno and sql.startswith("SELECT"):
+            raise errors.OperationalError(msg="Query execution was interrupted", errno=self.errno)
+
+    def release(self, connection: FakeConnection):
+        self.released.append(connection)
+
+
+class ItemsManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("items")
+
+
+class LegacyManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("legacy")
+
+
+# model generated before {HINTS} placeholder, with default time limit
+LegacyManager.MODEL_CLASS.Meta.SQL_STATEMENT = "SELECT {PROJECTION} FROM `legacy` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+LegacyManager.MODEL_CLASS.Meta.QUERY_TIMEOUT_MS = 500
+
+
+class FakeSocket:
+    def __init__(self):
+        self._connection_timeout = 5.0
+        self.timeouts = []
+
+    def set_connection_timeout(self, timeout):
+        self._connection_timeout = timeout
+        self.timeouts.append(timeout)
+
+
+class SocketDriver(SlowDriver):
+    def connect(self) -> FakeConnection:
+        connection = super().connect()
+        connection._socket = FakeSocket()
+        return connection
+
+
+@pytest.mark.parametrize(
+    "manager_class, timeout_ms, expected",
+    [
+        (ItemsManager, None, "SELECT  * FROM `items`"),
+        (ItemsManager, 250, "SELECT /*+ MAX_EXECUTION_TIME(250) */ * FROM `items`"),
+        (LegacyManager, None, "SELECT /*+ MAX_EXECUTION_TIME(500) */ * FROM `legacy`"),
+        (LegacyManager, 0, "SELECT * FROM `legacy`"),
+    ],
+)
+def test_select_has_execution_time_hint(manager_class, timeout_ms, expected):
+    with SlowDriver().install() as driver:
+        manager_class().select_all(timeout_ms=timeout_ms)
+        list(manager_class().select_iter(timeout_ms=timeout_ms))
+        manager_class().select_one(1, timeout_ms=timeout_ms)
+    assert [sql[: len(expected)] for sql in driver.queries] == [expected] * 3
+
+
+def test_invalid_timeout():
+    with SlowDriver().install(), pytest.raises(ManagerException):
+        ItemsManager().select_all(timeout_ms=-1)
+
+
+def test_server_timeout_returns_connection_to_pool():
+    with SlowDriver(ER_QUERY_TIMEOUT).install() as driver:
+        with pytest.raises(QueryTimeoutException) as ex_info:
+            ItemsManager().select_all(timeout_ms=100)
+    timeout_ex = ex_info.value
+    assert (timeout_ex.errno, timeout_ex.timeout_ms, timeout_ex.is_client_side) == (ER_QUERY_TIMEOUT, 100, False)
+    assert isinstance(ex_info.value, errors.Error)
+    assert [connection.is_open for connection in driver.released] == [True]
+
+
+def test_client_read_timeout_is_restored():
+    with SocketDriver().install() as driver:
+        ItemsManager().select_all(timeout_ms=100)
+        ItemsManager().select_all()
+    assert [connection._socket.timeouts for connection in driver.released] == [[1.1, 5.0], []]
+
+
+@pytest.mark.parametrize(
+    "select",
+    [
+        lambda manager: manager.select_one(1, timeout_ms=100),
+        lambda manager: manager.select_all(timeout_ms=100),
+        lambda manager: list(manager.select_iter(timeout_ms=100)),
+    ],
+)
+def test_client_timeout_discards_connection(select):
+    with SlowDriver(CR_SERVER_LOST_EXTENDED).install() as driver:
+        with pytest.raises(QueryTimeoutException) as ex_info:
+            select(ItemsManager())
+    assert ex_info.value.is_client_side
+    # connection was disconnected and returned, pool reconnects it before next use
+    assert [connection.is_open for connection in driver.released] == [False]
+
+
+def test_lost_connection_without_timeout_is_not_converted():
+    with SlowDriver(CR_SERVER_LOST_EXTENDED).install():
+        with pytest.raises(errors.OperationalError) as ex_info:
+            ItemsManager().select_all()
+    assert not isinstance(ex_info.value, QueryTimeoutException)
+
+
+def test_timeout_in_transaction_is_rolled_back_without_connection():
+    @DBI.transaction("dbi")
+    def read(dbi):
+        return ItemsManager(dbi).select_all(timeout_ms=100)
+
+    with SlowDriver(CR_SERVER_LOST_EXTENDED).install() as driver:
+        with pytest.raises(QueryTimeoutException):
+            read()
+    assert [connection.is_open for connection in driver.released] == [False]
@@ -0,0 +1,83 @@
+import pytest
+from mysql.connector import errors
+
+from .db import DBI
+from .retry import ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT, RetryPolicy, RetryStats
+from ..benchmarks.fake_driver import FakeDriver
+
+
+class ContendedDriver(FakeDriver):
+    def __init__(self, failures, *args, **kwargs):
+        """
+        :param failures: Error codes raised by first updates
+        """
+        super().__init__(*args, **kwargs)
+        self.failures = list(failures)
+
+    def on_query(self, sql, params):
+        super().on_query(sql, params)
+        if sql.startswith("UPDATE") and self.failures:
+            errno = self.failures.pop(0)
+            raise errors.DatabaseError(msg="Contention", errno=errno)
+
+
+def _create_policy(max_attempts=3):
+    delays = []
+    return RetryPolicy(max_attempts=max_attempts, backoff_s=0.01, jitter=False, sleep=delays.append), delays
+
+
+def _run(driver: FakeDriver, policy: RetryPolicy):
+    runs = []
+
+    @DBI.transaction("dbi", retry_policy=policy)
+    def update(dbi: DBI):
+        runs.append(dbi)
+        return dbi.execute("UPDATE `items` SET `name` = %s WHERE id = %s LIMIT 1", ("item", 1))
+
+    with driver.install():
+        try:
+            return update()
+        finally:
+            assert len({id(dbi) for dbi in runs}) == len(runs)
+
+
+@pytest.mark.parametrize(
+    "attempt, expected", [(1, 0.01), (2, 0.02), (3, 0.04), (10, 2.0)],
+)
+def test_backoff(attempt, expected):
+    policy, _ = _create_policy()
+    assert policy.get_delay(attempt) == pytest.approx(expected)
+    assert 0 <= RetryPolicy(backoff_s=0.01).get_delay(attempt) <= expected
+
+
+def test_transaction_is_retried_on_fresh_connection():
+    policy, delays = _create_policy()
+    driver = ContendedDriver([ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT])
+    assert _run(driver, policy) == 1
+    assert delays == pytest.approx([0.01, 0.02])
+    assert driver.connection_count == 3
+    assert policy.get_stats() == RetryStats(
+        transactions=1,
+        attempts=3,
+        retries=2,
+        recovered=1,
+        exhausted=0,
+        backoff_s=pytest.approx(0.03),
+        errors={ER_LOCK_DEADLOCK: 1, ER_LOCK_WAIT_TIMEOUT: 1},
+    )
+
+
+def test_retries_are_exhausted():
+    policy, delays = _create_policy(max_attempts=2)
+    with pytest.raises(errors.DatabaseError):
+        _run(ContendedDriver([ER_LOCK_DEADLOCK] * 3), policy)
+    assert len(delays) == 1
+    assert policy.get_stats()[:5] == (1, 2, 1, 0, 1)
+
+
+def test_other_errors_are_not_retried():
+    policy, delays = _create_policy()
+    with pytest.raises(errors.DatabaseError):
+        _run(ContendedDriver([1062]), policy)
+    assert delays == []
+    assert policy.get_stats()[:5] == (1, 1, 0, 0, 0)
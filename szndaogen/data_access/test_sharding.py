@@ -0,0 +1,176 @@
+import threading
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from .db import DBI
+from .manager_base import ManagerException, TableManagerBase
+from .sharding import HashShardRouter, RangeShardRouter, ShardRouter, merge_sorted
+from ..benchmarks.fake_driver import FakeDriver, RowFactory
+
+SHARDS = ("users_0", "users_1", "users_2", "users_3")
+row_factory = RowFactory(width=4, type_mix=("int", "str", "null"))
+
+
+class RecordingDriver(FakeDriver):
+    barrier: threading.Barrier = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queries = []
+
+    def on_query(self, sql, params):
+        self.queries.append(sql)
+        if self.barrier is not None:
+            # passes only if all shards are queried at the same time
+            self.barrier.wait(timeout=5)
+        super().on_query(sql, params)
+
+
+class UsersManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("users")
+    MODEL_CLASS.Meta.SHARD_KEY = "id"
+    MODEL_CLASS.Meta.SHARD_ROUTER = HashShardRouter(SHARDS)
+
+
+@pytest.fixture
+def drivers():
+    drivers = [RecordingDriver(row_factory, result_size=index + 1) for index in range(len(SHARDS))]
+    with ExitStack() as stack:
+        for shard, driver in zip(SHARDS, drivers):
+            stack.enter_context(driver.install(shard))
+        yield drivers
+
+
+@pytest.mark.parametrize("key, expected", [(1, "b"), (7, "d"), (8, "a"), ("user", "b"), ("user-2", "c")])
+def test_hash_router(key, expected):
+    assert HashShardRouter(("a", "b", "c", "d")).get_shard(key) == expected
+
+
+@pytest.mark.parametrize("key, expected", [(-5, "a"), (99, "a"), (100, "b"), (199, "b"), (200, "c"), (10 ** 9, "c")])
+def test_range_router(key, expected):
+    assert RangeShardRouter((100, 200), ("a", "b", "c")).get_shard(key) == expected
+
+
+def test_range_router_validation():
+    with pytest.raises(ValueError):
+        RangeShardRouter((100, 200), ("a", "b"))
+    with pytest.raises(ValueError):
+        RangeShardRouter((200, 100), ("a", "b", "c"))
+
+
+def test_keyed_queries_go_to_owning_shard(drivers):
+    manager = UsersManager()
+    model_instance = manager.select_one(6).map_model_attributes()
+    model_instance.id = 6
+    assert [len(driver.queries) for driver in drivers] == [0, 0, 1, 0]
+    manager.update_one(model_instance)
+    manager.delete_one(model_instance)
+    model_instance.id = 5
+    manager.insert_one(model_instance)
+    assert [len(driver.queries) for driver in drivers] == [0, 1, 3, 0]
+
+    model_instance.id = None
+    with pytest.raises(ManagerException):
+        manager.insert_one(model_instance)
+
+
+def test_fan_out_is_concurrent_and_merged(drivers):
+    RecordingDriver.barrier = threading.Barrier(len(SHARDS))
+    try:
+        models = UsersManager().select_all(order_by=("id", "column_1 DESC"), limit=5, offset=1)
+    finally:
+        RecordingDriver.barrier = None
+    # shards return ids 1..1, 1..2, 1..3 and 1..4
+    assert [model_instance.model_data["id"] for model_instance in models] == [1, 1, 1, 2, 2]
+    assert all("LIMIT 6" in driver.queries[0] for driver in drivers)
+
+
+def test_fan_out_select_iter_and_delete_all(drivers):
+    models = UsersManager().select_iter(order_by=("`id`",), limit=5)
+    assert [model_instance.model_data["id"] for model_instance in models] == [1, 1, 1, 1, 2]
+    assert UsersManager().delete_all("column_2 IS NULL") == len(SHARDS)
+    with pytest.raises(ManagerException):
+        UsersManager().delete_all("1", limit=10)
+    with pytest.raises(ManagerException):
+        UsersManager().select_all(order_by=("RAND()",))
+
+
+def test_bulk_insert_is_buffered_per_shard(drivers):
+    manager = UsersManager()
+    for model_instance in manager.select_all():
+        model_instance.map_model_attributes()
+        manager.insert_one_bulk(model_instance)
+    manager.insert_bulk_flush()
+    assert sum("INSERT" in sql for driver in drivers for sql in driver.queries) == len(manager._shard_managers)
+
+
+def test_shard_managers_are_created_once_by_concurrent_queries(drivers):
+    class SlowCopyManager(UsersManager):
+        def _reset_bulk_insert_buffer(self):
+            # widens window between creation of shard manager and its registration
+            time.sleep(0.01)
+            super()._reset_bulk_insert_buffer()
+
+    manager = SlowCopyManager()
+    shard_managers = []
+    threads = [
+        threading.Thread(target=lambda: shard_managers.append(manager._get_shard_manager("users_1")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(shard_manager) for shard_manager in shard_managers}) == 1
+
+
+def test_manager_bound_to_shard(drivers):
+    manager = UsersManager(DBI(profile="users_1"))
+    manager.select_all()
+    manager.select_one(5)
+    assert [len(driver.queries) for driver in drivers] == [0, 2, 0, 0]
+    with pytest.raises(ManagerException):
+        manager.select_one(6)
+    with pytest.raises(ManagerException):
+        UsersManager(DBI())
+
+
+class Item:
+    def __init__(self, value):
+        self.model_data = {"value": value}
+
+
+def test_router_without_get_shard_fails_on_creation():
+    class IncompleteRouter(ShardRouter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteRouter(SHARDS)
+
+
+def test_merge_sorted_nulls_first():
+    results = [[Item(None), Item(2)], [Item(1), Item(3)]]
+    assert [item.model_data["value"] for item in merge_sorted(results, ("value",))] == [None, 1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "string_sort_key, results, expected",
+    [
+        # shards sorted by case and accent insensitive collation
+        (
+            "default",
+            [["apple", "Banana", "cherry"], ["Avocado", "ébène", "Fig"]],
+            ["apple", "Avocado", "Banana", "cherry", "ébène", "Fig"],
+        ),
+        # shards sorted by binary collation
+        (None, [["Banana", "apple"], ["Avocado", "cherry"]], ["Avocado", "Banana", "apple", "cherry"]),
+    ],
+)
+def test_merge_sorted_follows_collation(string_sort_key, results, expected):
+    kwargs = {} if string_sort_key == "default" else {"string_sort_key": string_sort_key}
+    results = [[Item(value) for value in result] for result in results]
+    merged = merge_sorted(results, ("`value` ASC",), limit=len(expected), **kwargs)
+    assert [item.model_data["value"] for item in merged] == expected
+    assert [item.model_data["value"] for item in merge_sorted(results, ("value",), limit=2, **kwargs)] == expected[:2]
@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .db import DBI
+from .manager_base import TableManagerBase, ViewManagerBase
+from .single_flight import SingleFlight
+from ..benchmarks.fake_driver import FakeDriver, RowFactory
+
+row_factory = RowFactory(width=4, type_mix=("int", "decimal", "str"))
+
+
+class GatedDriver(FakeDriver):
+    """
+    Queries wait until test releases them
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+        self.error: BaseException = None
+
+    def on_query(self, sql, params):
+        super().on_query(sql, params)
+        assert self.gate.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+
+
+class ItemsManager(TableManagerBase):
+    MODEL_CLASS = row_factory.create_model_class("items")
+    SINGLE_FLIGHT_READS = True
+
+
+def _run_concurrently(driver: GatedDriver, fnc, thread_count: int = 8):
+    with ThreadPoolExecutor(thread_count) as executor:
+        futures = [executor.submit(fnc) for _ in range(thread_count)]
+        deadline = time.monotonic() + 5
+        while ViewManagerBase._single_flight.coalesced_count < thread_count - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        driver.gate.set()
+        return [future.exception() or future.result() for future in futures]
+
+
+@pytest.fixture
+def driver():
+    single_flight = ViewManagerBase._single_flight
+    ViewManagerBase._single_flight = SingleFlight()
+    with GatedDriver(row_factory, result_size=3).install() as driver:
+        yield driver
+    ViewManagerBase._single_flight = single_flight
+
+
+def test_concurrent_select_all_runs_once(driver):
+    results = _run_concurrently(driver, lambda: ItemsManager().select_all("id > %s", (0,)))
+    assert driver.query_count == 1
+    assert ViewManagerBase._single_flight.coalesced_count == 7
+    assert all(len(models) == 3 for models in results)
+    # every caller has own models and row dicts
+    assert len({id(models[0].model_data) for models in results}) == len(results)
+    # Decimal is converted to float in every copy
+    assert len({models[1].model_data["column_1"] for models in results}) == 1
+    assert all(type(models[1].model_data["column_1"]) is float for models in results)
+
+
+def test_concurrent_select_one_shares_error(driver):
+    driver.error = RuntimeError("server gone")
+    results = _run_concurrently(driver, lambda: ItemsManager().select_one(1))
+    assert driver.query_count == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_transaction_reads_are_not_coalesced(driver):
+    driver.gate.set()
+
+    @DBI.transaction("dbi")
+    def read(dbi):
+        return ItemsManager(dbi).select_one(1)
+
+    read()
+    assert ViewManagerBase._single_flight.executed_count == 0
+    ItemsManager().select_one(1)
+    assert ViewManagerBase._single_flight.executed_count == 1
@@ -0,0 +1,179 @@
+import threading
+import typing
+
+import pytest
+from mysql.connector import Error
+
+from .db import DBI
+from .fake_dbi import FakeDBI
+from .manager_base import ManagerException, TableManagerBase
+from .model_base import ModelBase
+from .sharding import HashShardRouter
+from .write_behind import WriteBehindQueue, WriteBehindQueueFull
+from ..benchmarks.fake_driver import FakeDriver, RowFactory
+
+
+class TModel(ModelBase):
+    class Meta:
+        TABLE_NAME: str = "events"
+        TABLE_TYPE: str = "BASE TABLE"
+        SQL_STATEMENT: str = "SELECT {PROJECTION} FROM `events` {WHERE} {ORDER_BY} {LIMIT} {OFFSET}"
+        SQL_STATEMENT_WHERE_BASE: str = "1"
+        SQL_STATEMENT_ORDER_BY_DEFAULT: str = ""
+        PRIMARY_KEYS: typing.List = ["id", ]
+        ATTRIBUTE_LIST: typing.List = ["id", "name", ]
+        ATTRIBUTE_TYPES: typing.Dict = {"id": int, "name": str}
+        MODEL_DATA_CONVERTOR: typing.Dict = {}
+
+    def __init__(self, init_data: typing.Dict = {}):
+        self.id: int = None
+        self.name: str = None
+        super().__init__(init_data)
+        self.map_model_attributes()
+
+
+class TManager(TableManagerBase):
+    MODEL_CLASS = TModel
+    fake_dbi: FakeDBI = None
+    """ DBI of managers created by worker thread, None => connection error """
+
+    def __init__(self, dbi: DBI = None):
+        if TManager.fake_dbi is None:
+            raise Error("Can't connect")
+        super().__init__(dbi=TManager.fake_dbi)
+
+
+@pytest.fixture(autouse=True)
+def dbi():
+    TManager.fake_dbi = FakeDBI()
+    yield TManager.fake_dbi
+    TManager.fake_dbi = None
+
+
+def _fail_write(sql, sql_args):
+    raise Error("Lost connection")
+
+
+def test_write_behind_coalesces_batches(dbi):
+    write_queue = WriteBehindQueue(TManager, batch_size=2, flush_interval=60)
+    for index in range(5):
+        write_queue.put(TModel({"id": index, "name": f"event {index}"}))
+    write_queue.close()
+
+    assert [len(params) for _, params in dbi.executed] == [2, 2, 1]
+    assert dbi.executed[0][0] == "INSERT INTO `events` (`id`, `name`) VALUES (%s, %s)"
+    assert dbi.executed[2][1] == [[4, "event 4"]]
+    assert write_queue.written_count == 5
+
+
+def test_write_behind_flush_on_interval(dbi):
+    write_queue = WriteBehindQueue(TManager, batch_size=100, flush_interval=0.01)
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    assert write_queue.flush(timeout=5)
+    assert len(dbi.executed) == 1
+    write_queue.close()
+
+
+def test_write_behind_failed_batch_callback(dbi):
+    failed = []
+    dbi.on_write = _fail_write
+    write_queue = WriteBehindQueue(TManager, batch_size=2, on_batch_failed=lambda batch, ex: failed.append(batch))
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    write_queue.close()
+
+    assert len(failed) == 1 and failed[0][0].id == 1
+    assert write_queue.failed_count == 1
+
+
+def test_write_behind_backpressure(dbi):
+    entered, release = threading.Event(), threading.Event()
+    dbi.on_write = lambda sql, sql_args: (entered.set(), release.wait())
+    write_queue = WriteBehindQueue(TManager, batch_size=1, max_queue_size=1)
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    entered.wait(5)
+    write_queue.put(TModel({"id": 2, "name": "event"}))
+
+    with pytest.raises(WriteBehindQueueFull):
+        write_queue.put(TModel({"id": 3, "name": "event"}), block=False)
+
+    release.set()
+    write_queue.close()
+    assert write_queue.written_count == 2
+
+
+def test_write_behind_groups_batch_by_columns(dbi):
+    write_queue = WriteBehindQueue(TManager, batch_size=3, exclude_none_values=True)
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    write_queue.put(TModel({"id": 2}))
+    write_queue.put(TModel({"id": 3, "name": "event"}))
+    write_queue.close()
+
+    assert dbi.executed == [
+        ("INSERT INTO `events` (`id`, `name`) VALUES (%s, %s)", [[1, "event"], [3, "event"]]),
+        ("INSERT INTO `events` (`id`) VALUES (%s)", [[2]]),
+    ]
+    assert write_queue.written_count == 3
+
+
+def test_write_behind_manager_error_keeps_worker_running(dbi):
+    failed = []
+    TManager.fake_dbi = None
+    write_queue = WriteBehindQueue(TManager, on_batch_failed=lambda batch, ex: failed.append((batch, ex)))
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    assert write_queue.flush(timeout=5)
+    assert len(failed) == 1 and isinstance(failed[0][1], Error)
+
+    TManager.fake_dbi = dbi
+    write_queue.put(TModel({"id": 2, "name": "event"}))
+    write_queue.close()
+    assert (write_queue.failed_count, write_queue.written_count) == (1, 1)
+
+
+def test_write_behind_dead_worker():
+    class DeadWorkerQueue(WriteBehindQueue):
+        def _run(self):
+            pass
+
+    write_queue = DeadWorkerQueue(TManager, max_queue_size=1)
+    write_queue._thread.join(5)
+    with pytest.raises(ManagerException):
+        write_queue.put(TModel({"id": 1, "name": "event"}))
+    with pytest.raises(ManagerException):
+        write_queue.flush()
+    write_queue.close()
+
+
+def test_write_behind_sharded_table():
+    row_factory = RowFactory(width=3, type_mix=("str",))
+
+    class ShardedManager(TableManagerBase):
+        MODEL_CLASS = row_factory.create_model_class("sharded_events")
+        MODEL_CLASS.Meta.SHARD_KEY = "id"
+        MODEL_CLASS.Meta.SHARD_ROUTER = HashShardRouter(("events_0", "events_1"))
+
+    drivers = [FakeDriver(row_factory), FakeDriver(row_factory)]
+    with drivers[0].install("events_0"), drivers[1].install("events_1"):
+        write_queue = WriteBehindQueue(ShardedManager, batch_size=10)
+        for row in row_factory.get_rows(5):
+            write_queue.put(ShardedManager.MODEL_CLASS(row).map_model_attributes())
+        write_queue.close()
+
+    assert (write_queue.written_count, write_queue.failed_count) == (5, 0)
+    assert [driver.query_count for driver in drivers] == [1, 1]
+
+
+def test_write_behind_put_into_full_queue_of_dying_worker():
+    stop_worker = threading.Event()
+
+    class DyingWorkerQueue(WriteBehindQueue):
+        def _run(self):
+            stop_worker.wait(5)
+
+    write_queue = DyingWorkerQueue(TManager, max_queue_size=1)
+    write_queue.put(TModel({"id": 1, "name": "event"}))
+    threading.Timer(0.05, stop_worker.set).start()
+    with pytest.raises(ManagerException) as ex_info:
+        write_queue.put(TModel({"id": 2, "name": "event"}))
+    assert not isinstance(ex_info.value, WriteBehindQueueFull)
+    assert write_queue.enqueued_count == 1
+    write_queue.close()
@@ -0,0 +1,295 @@
+import atexit
+import queue
+import threading
+import time
+import typing
+
+from .db import DBI
+from .manager_base import ManagerException, TableManagerBase
+from .model_base import ModelBase
+from ..tools.log import Logger
+
+
+class WriteBehindQueueFull(ManagerException):
+    pass
+
+
+class WriteBehindQueue:
+    """
+    Background write-behind queue for inserts through `TableManagerBase`.
+    Caller thread only enqueues model instance. Worker thread coalesces queued models into bulk INSERT statements
+    (`insert_one_bulk` + `insert_bulk_flush`) and writes them on its own DB connection when batch is full or
+    `flush_interval` elapsed. Models of batch with different column sets (e.g. `exclude_none_values`) are written
+    by separate statements. Batch of sharded table is written by one statement per shard, so failed batch can be
+    written partially.
+
+    How to use it:
+        events_queue = WriteBehindQueue.for_manager(EventsManager, batch_size=500, flush_interval=0.5)\n
+        events_queue.put(event_model)\n
+    """
+
+    _instances: typing.Dict[typing.Type[TableManagerBase], "WriteBehindQueue"] = {}
+    _instances_lock = threading.Lock()
+
+    _FLUSH = object()
+    _STOP = object()
+    _ALIVE_CHECK_INTERVAL = 0.1
+
+    def __init__(
+        self,
+        manager_class: typing.Type[TableManagerBase],
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        on_batch_failed: typing.Callable[[typing.List[ModelBase], BaseException], None] = None,
+        exclude_none_values: bool = False,
+        exclude_columns: list = None,
+        use_on_duplicate_update_statement: bool = False,
+        use_insert_ignore_statement: bool = False,
+    ):
+        """
+        Init function of write-behind queue. Worker thread is started immediately.
+        :param manager_class: Table manager class used by worker thread for inserts
+        :param batch_size: Maximal number of models written by one bulk statement
+        :param flush_interval: Maximal number of seconds model waits in queue before it is written
+        :param max_queue_size: Maximal number of queued models. `put` blocks or fails if queue is full.
+        :param on_batch_failed: Callback called with models of failed batch and raised exception
+        :param exclude_none_values: See `TableManagerBase.insert_one_bulk`
+        :param exclude_columns: See `TableManagerBase.insert_one_bulk`
+        :param use_on_duplicate_update_statement: See `TableManagerBase.insert_one_bulk`
+        :param use_insert_ignore_statement: See `TableManagerBase.insert_one_bulk`
+        """
+        self.manager_class = manager_class
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_batch_failed = on_batch_failed
+        self.insert_options = {
+            "exclude_none_values": exclude_none_values,
+            "exclude_columns": exclude_columns,
+            "use_on_duplicate_update_statement": use_on_duplicate_update_statement,
+            "use_insert_ignore_statement": use_insert_ignore_statement,
+        }
+
+        self.enqueued_count = 0
+        """ Incremented by caller threads under `_enqueued_count_lock`, other counters by worker thread only """
+        self.written_count = 0
+        self.failed_count = 0
+        self._enqueued_count_lock = threading.Lock()
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._is_closed = False
+        self._manager: typing.Optional[TableManagerBase] = None
+        self._thread = threading.Thread(
+            target=self._run, name="WriteBehindQueue-{}".format(manager_class.__name__), daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def for_manager(cls, manager_class: typing.Type[TableManagerBase], **kwargs) -> "WriteBehindQueue":
+        """
+        Shared write-behind queue of manager class. It is created by first call, `kwargs` of next calls are ignored.
+        :param manager_class: Table manager class
+        :param kwargs: Params of `WriteBehindQueue.__init__`
+        """
+        with cls._instances_lock:
+            instance = cls._instances.get(manager_class)
+            if instance is None or instance._is_closed:
+                instance = cls(manager_class, **kwargs)
+                cls._instances[manager_class] = instance
+        return instance
+
+    def put(self, model_instance: ModelBase, block: bool = True, timeout: float = None):
+        """
+        Enqueue model instance to be inserted. Model should not be modified after it is enqueued.
+        :param model_instance: Model instance
+        :param block: Wait for free space in queue if it is full
+        :param timeout: Maximal number of seconds to wait for free space in queue
+        :raise ManagerException: Queue is closed or its worker thread is not running
+        """
+        if self._is_closed:
+            raise ManagerException("Write-behind queue of {} is closed.".format(self.manager_class.__name__))
+        self._check_worker()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                # full queue is waited for in short steps, worker thread can die meanwhile
+                self._queue.put(model_instance, block=block, timeout=self._get_wait_timeout(deadline))
+                break
+            except queue.Full:
+                if not block or (deadline is not None and time.monotonic() >= deadline):
+                    raise WriteBehindQueueFull(
+                        "Write-behind queue of {} is full ({} items).".format(
+                            self.manager_class.__name__, self._queue.maxsize
+                        )
+                    )
+                self._check_worker()
+        with self._enqueued_count_lock:
+            self.enqueued_count += 1
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Write all models enqueued before this call.
+        :param timeout: Maximal number of seconds to wait
+        :return: `True` if queue was flushed in time
+        :raise ManagerException: Worker thread is not running
+        """
+        if self._is_closed:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flushed = threading.Event()
+        if not self._put_control((self._FLUSH, flushed), deadline):
+            self._check_worker()
+            return False
+        while not flushed.wait(self._get_wait_timeout(deadline)):
+            if not self._thread.is_alive():
+                # worker could set event just before it stopped
+                if flushed.is_set():
+                    break
+                self._check_worker()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self, timeout: float = None):
+        """
+        Write all enqueued models and stop worker thread. It is called automatically on interpreter shutdown.
+        Models left in queue of dead worker thread are dropped.
+        :param timeout: Maximal number of seconds to wait for worker thread
+        """
+        if self._is_closed:
+            return
+        self._is_closed = True
+        atexit.unregister(self.close)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self._put_control(self._STOP, deadline):
+            self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if not self._thread.is_alive() and self._queue.qsize():
+            Logger.log.warning(
+                "WriteBehindQueue.close.dropped", manager=self.manager_class.__name__, count=self._queue.qsize()
+            )
+
+    def _check_worker(self):
+        if not self._thread.is_alive():
+            raise ManagerException(
+                "Write-behind queue worker of {} is not running.".format(self.manager_class.__name__)
+            )
+
+    def _get_wait_timeout(self, deadline: typing.Optional[float]) -> float:
+        if deadline is None:
+            return self._ALIVE_CHECK_INTERVAL
+        return max(0.0, min(self._ALIVE_CHECK_INTERVAL, deadline - time.monotonic()))
+
+    def _put_control(self, item, deadline: typing.Optional[float]) -> bool:
+        """
+        Enqueue control item, full queue is waited for only while worker thread is running
+        :return: `True` if item was enqueued
+        """
+        while self._thread.is_alive():
+            try:
+                self._queue.put(item, timeout=self._get_wait_timeout(deadline))
+                return True
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+        return False
+
+    def _run(self):
+        Logger.log.debug("WriteBehindQueue.start", manager=self.manager_class.__name__)
+
+        batch = []
+        flush_at = None
+        is_running = True
+        while is_running:
+            flushed = None
+            try:
+                timeout = None if not batch else max(0.0, flush_at - time.monotonic())
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._STOP:
+                is_running = False
+            elif isinstance(item, tuple) and item and item[0] is self._FLUSH:
+                flushed = item[1]
+            elif item is not None:
+                if not batch:
+                    flush_at = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            if flushed is not None:
+                flushed.set()
+
+        if self._manager is not None:
+            for dbi in self._get_dbis(self._manager):
+                dbi._is_in_self_dbi = False
+                if dbi._connection:
+                    dbi._close_connection()
+        Logger.log.debug("WriteBehindQueue.done", manager=self.manager_class.__name__)
+
+    def _get_manager(self) -> TableManagerBase:
+        if self._manager is None:
+            manager = self.manager_class()
+            for dbi in self._get_dbis(manager):
+                dbi._is_in_self_dbi = True  # keep one connection for whole worker life
+            self._manager = manager
+        return self._manager
+
+    @staticmethod
+    def _get_dbis(manager: TableManagerBase) -> typing.List[DBI]:
+        # manager of sharded table without DBI writes through managers of shards, each has its own DBI
+        if manager.dbi is None:
+            return [manager._get_shard_manager(shard).dbi for shard in manager._shard_router.shards]
+        return [manager.dbi]
+
+    def _write_batch(self, batch: typing.List[ModelBase]):
+        models_by_columns: typing.Dict[typing.Tuple[str, ...], typing.List[ModelBase]] = {}
+        for model_instance in batch:
+            columns = TableManagerBase.get_bulk_insert_columns(
+                model_instance, self.insert_options["exclude_none_values"], self.insert_options["exclude_columns"]
+            )
+            models_by_columns.setdefault(columns, []).append(model_instance)
+        for models in models_by_columns.values():
+            self._write_models(models)
+
+    def _write_models(self, batch: typing.List[ModelBase]):
+        manager = None
+        try:
+            # manager is created by first batch, failed creation is reported as failed batch and retried by next one
+            manager = self._get_manager()
+            for model_instance in batch:
+                manager.insert_one_bulk(model_instance, auto_flush=False, **self.insert_options)
+            if manager.insert_bulk_flush() is False:
+                raise ManagerException("Bulk insert was not executed. DB connection is not available.")
+            self.written_count += len(batch)
+        except BaseException as ex:
+            self.failed_count += len(batch)
+            Logger.log.exception("WriteBehindQueue.write_batch", message=ex, manager=self.manager_class.__name__)
+            if manager is not None:
+                manager._reset_bulk_insert_buffer()
+                self._drop_connection(manager)
+            if self.on_batch_failed:
+                try:
+                    self.on_batch_failed(batch, ex)
+                except Exception as callback_ex:
+                    Logger.log.exception("WriteBehindQueue.on_batch_failed", message=callback_ex)
+
+    @classmethod
+    def _drop_connection(cls, manager: TableManagerBase):
+        # connection could be broken, next batch gets new one
+        for dbi in cls._get_dbis(manager):
+            connection = dbi._connection
+            dbi._connection = None
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception as ex:
+                    Logger.log.debug("WriteBehindQueue.drop_connection", message=ex)
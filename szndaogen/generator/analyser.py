@@ -1,82 +1,372 @@
 import os
 import re
 import sys
+import typing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 
 import sqlparse
 from jinja2 import Template
 
 from .datatypes import DATATYPES
+from .introspection import SchemaIntrospector
+from .manifest import GenerationManifest
+from .schema import DatabaseSchema, IndexSchema, PartitionSchema, TableSchema
+from .snapshot import save_snapshot
 from ..data_access.db import DBI
 from ..tools.cli_colors import CMD, FG
 
+
+class TableRecord(typing.NamedTuple):
+    """
+    Result of analyse stage. Everything templates of one table are rendered from.
+    """
+
+    table_name: str
+    table_type: str
+    model_name: str
+    fingerprint: str
+    table_description: typing.Tuple[typing.Dict, ...]
+    primary_keys: typing.Tuple[str, ...]
+    indexes: typing.Tuple[IndexSchema, ...]
+    relations: typing.Tuple[typing.Dict, ...]
+    model_imports: typing.Tuple[str, ...]
+    model_convertors: typing.Dict[str, str]
+    enum_types: typing.Tuple[typing.Dict, ...]
+    attr_datatypes: typing.Dict[str, str]
+    view_statement: typing.Optional[str] = None
+    view_statement_create: typing.Optional[str] = None
+    where_base: typing.Optional[str] = None
+    order_by_default: typing.Optional[str] = None
+    partitions: typing.Tuple[PartitionSchema, ...] = ()
+    db_profile: typing.Optional[str] = None
+    query_timeout_ms: typing.Optional[int] = None
+
+
+class RenderedTable(typing.NamedTuple):
+    """
+    Result of render stage
+    """
+
+    table_name: str
+    model_name: str
+    model: str
+    manager: str
+    manager_base: str
+
+
 class Analyser:
-    def __init__(self, output_path: str, custom_templates_path: str = None):
-        self.db = DBI()
+    """
+    Generator pipeline: introspect schema -> analyse tables -> render templates -> write files.
+    Analyse stage produces immutable `TableRecord` per table, so render and write stages can run on a pool of workers.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        custom_templates_path: str = None,
+        fast_path: bool = False,
+        force: bool = False,
+        jobs: int = 1,
+        schema_loader: typing.Any = None,
+        export_snapshot_path: str = None,
+        db_profile: str = None,
+        query_timeout_ms: int = None,
+    ):
+        """
+        :param output_path: Output package path. Generated code is printed to std-out if it is not set.
+        :param custom_templates_path: Path to directory with custom templates
+        :param fast_path: Generate table specific insert, update and delete methods into base managers
+        :param force: Render all tables even if manifest says they did not change
+        :param jobs: Number of processes rendering templates and threads writing files
+        :param schema_loader: Source of schema with `load() -> DatabaseSchema` method e.g. `DDLSchemaLoader` or
+            `SnapshotSchemaLoader` for generation without database. `SchemaIntrospector` of database is default.
+        :param export_snapshot_path: Path where JSON snapshot of loaded schema is saved
+        :param db_profile: Name of connection profile (see `Config.MYSQL_PROFILES`) generated models are tagged with
+        :param query_timeout_ms: Default execution time limit of selects of generated models
+        """
+        if db_profile is not None and not re.match(r"^\w+$", db_profile):
+            raise ValueError(f"Invalid DB profile name '{db_profile}'. Use letters, digits and underscores only.")
+        if query_timeout_ms is not None and query_timeout_ms <= 0:
+            raise ValueError(f"Invalid query timeout {query_timeout_ms}. Use positive number of milliseconds.")
+        self.db = DBI() if schema_loader is None else None
+        self.schema_loader = schema_loader
+        self.export_snapshot_path = export_snapshot_path
+        self.fast_path = fast_path
+        self.db_profile = db_profile
+        self.query_timeout_ms = query_timeout_ms
+        self.force = force
+        self.jobs = max(1, jobs or 1)
         self.base_output_path = output_path
-        self.models_output_path = os.path.join(self.base_output_path, "models")
-        self.managers_output_path = os.path.join(self.base_output_path, "managers")
+        self.models_output_path = os.path.join(self.base_output_path, "models") if output_path else None
+        self.managers_output_path = os.path.join(self.base_output_path, "managers") if output_path else None
 
         self.template_path = custom_templates_path or os.path.join(os.path.dirname(__file__), os.path.dirname(__file__), "../templates/")
         self.model_template_path = os.path.join(self.template_path, "../templates/model.jinja")
         self.manager_template_path = os.path.join(self.template_path, "../templates/manager.jinja")
         self.manager_base_template_path = os.path.join(self.template_path, "../templates/manager_base.jinja")
-
-        self.table_name: str = None
-        self.table_type: str = None
-        self.table_description: list = None
-        self.attr_datatypes = None
-        self.primary_keys: list = None
-        self.model_imports: list = None
-        self.model_convertors: dict = None
-        self.enum_types: list = []
-        self.view_statement: str = None
-        self.view_statement_create: str = None
-        self.where_base: str = None
-        self.order_by_default: str = None
-
-        self.model_j_template: Template = self._get_j_template_instance(self.model_template_path)
-        self.manager_j_template: Template = self._get_j_template_instance(self.manager_template_path)
-        self.manager_base_j_template: Template = self._get_j_template_instance(self.manager_base_template_path)
+        self.registry_template_path = os.path.join(self.template_path, "../templates/registry.jinja")
+        if not os.path.exists(self.registry_template_path):
+            # custom templates made before registry existed
+            self.registry_template_path = os.path.join(os.path.dirname(__file__), "../templates/registry.jinja")
 
     def run(self):
         print(f"{FG.green}Starting Database Access Object Generator{CMD.reset}")
-        table_list = self._list_tables()
-        for table in table_list:
+        schema = self._load_schema()
+        manifest = self._load_manifest()
+
+        records = []
+        generated_tables = []
+        for table in schema.tables:
             try:
-                self.table_name = table[0]
-                self.table_type = table[1]
-                self._describe_table()
-                self._analyze_datatypes()
-                if self.table_type == "VIEW":
-                    self._parse_view_sql_statement()
-                else:
-                    self.view_statement = None
-                    self.view_statement_create = None
-                self._process_model_template()
-                self._process_manager_template()
-                self._process_manager_base_template()
+                fingerprint = GenerationManifest.get_table_fingerprint(schema, table, *self._get_fingerprint_options())
+                if (
+                    manifest
+                    and not self.force
+                    and not manifest.is_changed(table.name, fingerprint)
+                    and self._is_generated(table.name)
+                ):
+                    print(f"Skipping unchanged table `{table.name}`")
+                    manifest.set_fingerprint(table.name, fingerprint)
+                    generated_tables.append(table.name)
+                    continue
+                records.append(self.analyse_table(schema, table, fingerprint))
             except Exception as ex:
-                print(f"{FG.red}Error while processing table '{table}'{CMD.reset}: {ex.__str__()}", file=sys.stderr)
+                self._print_table_error(table.name, ex)
+
+        with self._get_executor(ProcessPoolExecutor) as render_executor, self._get_executor(
+            ThreadPoolExecutor
+        ) as write_executor:
+            render_futures = [
+                render_executor.submit(_render_table, self._get_template_paths(), self.fast_path, record)
+                for record in records
+            ]
+            write_futures = []
+            for record, render_future in zip(records, render_futures):
+                try:
+                    write_futures.append((record, write_executor.submit(self.write_table, render_future.result())))
+                except Exception as ex:
+                    self._print_table_error(record.table_name, ex)
+
+            # results are collected in schema order, so output does not depend on number of workers
+            for record, write_future in write_futures:
+                try:
+                    for message in write_future.result():
+                        print(message)
+                    generated_tables.append(record.table_name)
+                    if manifest:
+                        manifest.set_fingerprint(record.table_name, record.fingerprint)
+                except Exception as ex:
+                    self._print_table_error(record.table_name, ex)
+
+        if manifest:
+            for table_name in manifest.get_dropped_tables(table.name for table in schema.tables):
+                self._remove_generated(table_name)
+            manifest.save()
+        self.write_registry(sorted(generated_tables))
         print(f"{FG.green}DONE{CMD.reset}")
 
-    def _list_tables(self):
-        return self.db.fetch_all("SHOW FULL tables", dictionary_output=False)
-
-    def _describe_table(self):
-        self.table_description = self.db.fetch_all("SHOW FULL COLUMNS FROM `{}`".format(self.table_name))
-        self.primary_keys = [item["Field"] for item in self.table_description if item["Key"] == "PRI"]
-
-    def _parse_view_sql_statement(self):
-        self.view_statement = None
-        self.view_statement_create = None
-        view_statement_info = self.db.fetch_one("SHOW CREATE TABLE `{}`".format(self.table_name))
-        view_statement_create = view_statement_info["Create View"]
-        found = re.findall(r"SECURITY DEFINER VIEW (`[^`]+`) AS (\(?.*\)?$)", view_statement_create)
-        self.view_statement_create = sqlparse.format(
-            view_statement_create, keyword_case="upper", indent_columns=True, wrap_after=2048
+    def analyse_table(self, schema: DatabaseSchema, table: TableSchema, fingerprint: str = None) -> TableRecord:
+        table_description = tuple(column.to_description() for column in table.columns)
+        model_imports, model_convertors, enum_types, attr_datatypes = self._analyze_datatypes(
+            table.name, table_description
+        )
+        view_statement, view_statement_create, where_base, order_by_default = None, None, None, None
+        if table.table_type == "VIEW":
+            view_statement, view_statement_create, where_base, order_by_default = self._parse_view_sql_statement(
+                table.view_definition, table.view_create_statement
+            )
+
+        return TableRecord(
+            table_name=table.name,
+            table_type=table.table_type,
+            model_name=self._get_model_name(table.name),
+            fingerprint=fingerprint
+            or GenerationManifest.get_table_fingerprint(schema, table, *self._get_fingerprint_options()),
+            table_description=table_description,
+            primary_keys=tuple(table.primary_keys),
+            indexes=table.indexes,
+            relations=self._describe_foreign_keys(schema, table),
+            model_imports=model_imports,
+            model_convertors=model_convertors,
+            enum_types=enum_types,
+            attr_datatypes=attr_datatypes,
+            view_statement=view_statement,
+            view_statement_create=view_statement_create,
+            where_base=where_base,
+            order_by_default=order_by_default,
+            partitions=table.partitions,
+            db_profile=self.db_profile,
+            query_timeout_ms=self.query_timeout_ms,
+        )
+
+    def _get_fingerprint_options(self) -> typing.Tuple:
+        # options are appended only if set, so manifests of packages generated without them stay valid
+        options = (self.fast_path,) if self.db_profile is None else (self.fast_path, self.db_profile)
+        if self.query_timeout_ms is not None:
+            options += (f"query_timeout_ms={self.query_timeout_ms}",)
+        return options
+
+    def render_table(self, record: TableRecord) -> RenderedTable:
+        return _render_table(self._get_template_paths(), self.fast_path, record)
+
+    def write_table(self, rendered: RenderedTable) -> typing.List[str]:
+        """
+        Write rendered files of one table
+        :return: Messages to print
+        """
+        model_filename = "{}_model.py".format(rendered.table_name.lower())
+        manager_filename = "{}_manager.py".format(rendered.table_name.lower())
+        manager_base_filename = "{}_manager_base.py".format(rendered.table_name.lower())
+        if not self.base_output_path:
+            return [
+                f"**** MODEL: {rendered.model_name} --> {model_filename} ****\n{rendered.model}",
+                f"**** MANAGER: {rendered.model_name} --> {manager_filename} ****\n{rendered.manager}",
+                f"**** BASE MANAGER: {rendered.model_name} --> {manager_base_filename} ****\n{rendered.manager_base}",
+            ]
+
+        messages = []
+        self._create_module(self.base_output_path)
+        self._create_module(self.models_output_path)
+        self._create_module(self.managers_output_path)
+        self._create_module(os.path.join(self.managers_output_path, "base"))
+
+        file_path = os.path.join(self.models_output_path, model_filename)
+        if self._write_file(file_path, rendered.model):
+            messages.append(f"{CMD.bold}Writing model{CMD.reset} `{rendered.model_name}` into `{file_path}`")
+
+        file_path = os.path.join(self.managers_output_path, manager_filename)
+        if os.path.exists(file_path):
+            messages.append(f"Skipping manager `{rendered.model_name}` exists `{file_path}`")
+        else:
+            messages.append(f"{CMD.bold}Writing manager{CMD.reset} `{rendered.model_name}` into `{file_path}`")
+            with open(file_path, "w") as f:
+                f.write(rendered.manager)
+
+        file_path = os.path.join(self.managers_output_path, "base", manager_base_filename)
+        if self._write_file(file_path, rendered.manager_base):
+            messages.append(f"{CMD.bold}Writing base manager{CMD.reset} `{rendered.model_name}` into `{file_path}`")
+        return messages
+
+    def write_registry(self, table_names: typing.List[str]):
+        """
+        Write `__init__.py` of output package with lazy imports of Models and Managers of given tables
+        """
+        output = _load_j_template(self.registry_template_path).render(
+            tables=[
+                {
+                    "TableName": table_name,
+                    "ModuleName": table_name.lower(),
+                    "ModelName": self._get_model_name(table_name),
+                }
+                for table_name in table_names
+            ]
+        )
+        if not self.base_output_path:
+            print(f"**** REGISTRY: __init__.py ****\n{output}")
+            return
+        self._create_module(self.base_output_path)
+        file_path = os.path.join(self.base_output_path, "__init__.py")
+        if self._write_file(file_path, output):
+            print(f"{CMD.bold}Writing registry{CMD.reset} into `{file_path}`")
+
+    def _load_schema(self) -> DatabaseSchema:
+        schema = (self.schema_loader or SchemaIntrospector(self.db)).load()
+        if self.export_snapshot_path:
+            print(f"{CMD.bold}Writing schema snapshot{CMD.reset} into `{self.export_snapshot_path}`")
+            save_snapshot(schema, self.export_snapshot_path)
+        return schema
+
+    def _load_manifest(self) -> typing.Optional[GenerationManifest]:
+        if not self.base_output_path:
+            return None
+        self._create_module(self.base_output_path)
+        template_hash = GenerationManifest.get_template_hash(
+            *self._get_template_paths(),
+            self.registry_template_path,
+            os.path.join(os.path.dirname(__file__), "../VERSION"),
         )
-        if found:
-            _, view_statement = found[0]
+        # previous manifest is loaded with force too, outputs of dropped tables are removed
+        return GenerationManifest(self.base_output_path, template_hash).load()
+
+    def _get_template_paths(self) -> typing.Tuple[str, str, str]:
+        return self.model_template_path, self.manager_template_path, self.manager_base_template_path
+
+    def _get_executor(self, executor_class: typing.Type[Executor]) -> Executor:
+        return executor_class(max_workers=self.jobs) if self.jobs > 1 else _InlineExecutor()
+
+    def _describe_foreign_keys(self, schema: DatabaseSchema, table: TableSchema) -> typing.Tuple[typing.Dict, ...]:
+        """
+        Prepare relation descriptors from foreign keys referencing or referenced by table.
+        Many-to-one relations are named by referenced table, one-to-many relations by referencing table.
+        """
+        relations = []
+        if table.table_type != "BASE TABLE":
+            return ()
+
+        used_names = {column.name for column in table.columns}
+        for foreign_key in schema.get_foreign_keys(table.name):
+            if foreign_key.table_name == table.name:
+                relations.append(
+                    self._get_relation(
+                        used_names,
+                        foreign_key.name,
+                        foreign_key.referenced_table_name,
+                        list(foreign_key.columns),
+                        list(foreign_key.referenced_columns),
+                        False,
+                    )
+                )
+            if foreign_key.referenced_table_name == table.name:
+                relations.append(
+                    self._get_relation(
+                        used_names,
+                        foreign_key.name,
+                        foreign_key.table_name,
+                        list(foreign_key.referenced_columns),
+                        list(foreign_key.columns),
+                        True,
+                    )
+                )
+        return tuple(relations)
+
+    def _get_relation(
+        self,
+        used_names: set,
+        constraint_name: str,
+        table_name: str,
+        columns: list,
+        referenced_columns: list,
+        is_many: bool,
+    ) -> typing.Dict:
+        name = table_name
+        if name in used_names:
+            name = f"{table_name}_{constraint_name}"
+        used_names.add(name)
+        return {
+            "Name": name,
+            "TableName": table_name,
+            "ModelModule": "{}_model".format(table_name.lower()),
+            "ModelClass": "{}Model".format(self._get_model_name(table_name)),
+            "Columns": columns,
+            "ReferencedColumns": referenced_columns,
+            "IsMany": is_many,
+        }
+
+    @staticmethod
+    def _parse_view_sql_statement(view_definition: str, view_statement_create: str) -> tuple:
+        """
+        :return: View statement template, formatted create statement, base where condition and default order by
+        """
+        view_statement_template = None
+        where_base = None
+        order_by_default = None
+        if view_statement_create:
+            view_statement_create = sqlparse.format(
+                view_statement_create, keyword_case="upper", indent_columns=True, wrap_after=2048
+            )
+        if view_definition:
+            view_statement = view_definition.strip()
             view_statement = view_statement[1:-1] if view_statement.startswith("(") else view_statement
 
             view_statement = sqlparse.format(
@@ -97,11 +387,11 @@ class Analyser:
                 order_by_default = search_order_by.groups()[0]
                 view_statement = re.sub(order_by_regex, "\n", view_statement)
 
-            self.where_base = where_base
-            self.order_by_default = order_by_default
-
             view_statement = sqlparse.format(view_statement, keyword_case="upper", indent_columns=True)
 
+            # optimizer hints (e.g. execution time limit) follow leading SELECT keyword
+            view_statement = re.sub(r"^SELECT\b", "SELECT {HINTS}", view_statement, count=1)
+
             search_group_by = re.search(r"\nGROUP BY", view_statement)
             if search_group_by:
                 found_on_index = search_group_by.start()
@@ -110,83 +400,18 @@ class Analyser:
             else:
                 view_statement_template = f"{view_statement}\n{{WHERE}} \n{{ORDER_BY}} \n{{LIMIT}} \n{{OFFSET}}"
 
-            self.view_statement = view_statement_template
-
-    def _process_model_template(self):
-        model_name = self._get_model_name(self.table_name)
-        model_filename = "{}_model.py".format(self.table_name.lower())
-
-        output = self.model_j_template.render(
-            modelName=model_name,
-            tableName=self.table_name,
-            tableType=self.table_type,
-            tableDescription=self.table_description,
-            modelImports=self.model_imports,
-            modelConvertors=self.model_convertors,
-            primaryKeys=self.primary_keys,
-            enumTypes=self.enum_types,
-            dataTypes=self.attr_datatypes,
-            viewStatement=self.view_statement,
-            viewStatementCreate=self.view_statement_create,
-            whereBase=self.where_base,
-            orderByDefault=self.order_by_default,
-        )
+        return view_statement_template, view_statement_create, where_base, order_by_default
 
-        if self.base_output_path:
-            self._create_module(self.base_output_path)
-            self._create_module(self.models_output_path)
-            file_path = os.path.join(self.models_output_path, model_filename)
-            print(f"{CMD.bold}Writing model{CMD.reset} `{model_name}` into `{file_path}`")
-            with open(file_path, "w") as f:
-                f.write(output)
-        else:
-            print(f"**** MODEL: {model_name} --> {model_filename} ****\n{output}")
-
-    def _process_manager_base_template(self):
-        manager_name = self._get_model_name(self.table_name)
-        manager_filename = "{}_manager_base.py".format(self.table_name.lower())
-
-        output = self.manager_base_j_template.render(
-            modelName=manager_name,
-            tableName=self.table_name,
-            tableType=self.table_type,
-            primaryKeys=self.primary_keys,
-            dataTypes=self.attr_datatypes,
-        )
-
-        if self.managers_output_path:
-            self._create_module(os.path.join(self.managers_output_path, "base"))
-            file_path = os.path.join(self.managers_output_path, "base", manager_filename)
-            print(f"{CMD.bold}Writing base manager{CMD.reset} `{manager_name}` into `{file_path}`")
-            with open(file_path, "w") as f:
-                f.write(output)
-        else:
-            print(f"**** BASE MANAGER: {manager_name} --> {manager_filename} ****\n{output}")
-
-    def _process_manager_template(self):
-        manager_name = self._get_model_name(self.table_name)
-        manager_filename = "{}_manager.py".format(self.table_name.lower())
-
-        output = self.manager_j_template.render(modelName=manager_name, tableName=self.table_name)
-        if self.base_output_path:
-            self._create_module(self.base_output_path)
-            self._create_module(self.managers_output_path)
-            file_path = os.path.join(self.managers_output_path, manager_filename)
-            if os.path.exists(file_path):
-                print(f"Skipping manager `{manager_name}` exists `{file_path}`")
-            else:
-                print(f"{CMD.bold}Writing manager{CMD.reset} `{manager_name}` into `{file_path}`")
-                with open(file_path, "w") as f:
-                    f.write(output)
-        else:
-            print(f"**** MANAGER: {manager_name} --> {manager_filename} ****\n{output}")
-
-    def _analyze_datatypes(self):
-        self.model_imports = []
-        self.model_convertors = {}
-        self.enum_types = []
-        self.attr_datatypes = {}
-        for item in self.table_description:
+    def _analyze_datatypes(self, table_name: str, table_description: typing.Tuple[typing.Dict, ...]) -> tuple:
+        """
+        Add `ModelType` and `ModelDefaultValue` into column descriptions
+        :return: Model imports, model convertors, enum types and attribute datatypes
+        """
+        model_imports = set()
+        model_convertors = {}
+        enum_types = []
+        attr_datatypes = {}
+        for item in table_description:
             attr_name = item["Field"]
             model_datatype = None
             db_datatype, db_datatype_size = self._get_db_datatype(item["Type"])
@@ -194,23 +419,58 @@ class Analyser:
                 db_datatype, DATATYPES["__default__"]
             )
             if db_datatype not in DATATYPES:
-                print(f"{FG.orange}WARNING:{CMD.reset} Unknown datatype '{item['Type']}' found in table '{self.table_name}' attribute '{item['Field']}'. "
+                print(f"{FG.orange}WARNING:{CMD.reset} Unknown datatype '{item['Type']}' found in table '{table_name}' attribute '{item['Field']}'. "
                       f"It will converted into string by default. Best way is to add it into DATATYPES dict.")
             if model_datatype_info:
                 model_datatype = model_datatype_info[0]
                 if model_datatype_info[1]:
-                    self.model_imports.append(model_datatype_info[1])
+                    model_imports.add(model_datatype_info[1])
                 if model_datatype_info[2]:
-                    self.model_convertors[attr_name] = model_datatype_info[2]
+                    model_convertors[attr_name] = model_datatype_info[2]
                 # process ENUMs
                 if db_datatype == "enum":
                     enums_str = db_datatype_size.replace("'", '"').replace(',"', ', "')
-                    self.enum_types.append({"Field": attr_name, "Options": enums_str})
+                    enum_types.append({"Field": attr_name, "Options": enums_str})
             item["ModelType"] = model_datatype
             item["ModelDefaultValue"] = self._wrap_word(item["Default"], model_datatype_info[3], model_datatype_info[4])
-            self.attr_datatypes[attr_name] = model_datatype
-        self.model_imports = list(set(self.model_imports))
-        self.model_imports.sort()
+            attr_datatypes[attr_name] = model_datatype
+        return tuple(sorted(model_imports)), model_convertors, tuple(enum_types), attr_datatypes
+
+    def _get_generated_file_paths(self, table_name: str) -> typing.List[str]:
+        """
+        Files regenerated on every change of table. User editable managers are not included.
+        """
+        return [
+            os.path.join(self.models_output_path, "{}_model.py".format(table_name.lower())),
+            os.path.join(self.managers_output_path, "base", "{}_manager_base.py".format(table_name.lower())),
+        ]
+
+    def _is_generated(self, table_name: str) -> bool:
+        return all(os.path.exists(file_path) for file_path in self._get_generated_file_paths(table_name))
+
+    def _remove_generated(self, table_name: str):
+        for file_path in self._get_generated_file_paths(table_name):
+            if os.path.exists(file_path):
+                print(f"{CMD.bold}Removing{CMD.reset} `{file_path}` of dropped table `{table_name}`")
+                os.remove(file_path)
+
+    @staticmethod
+    def _print_table_error(table_name: str, ex: Exception):
+        print(f"{FG.red}Error while processing table '{table_name}'{CMD.reset}: {ex.__str__()}", file=sys.stderr)
+
+    @staticmethod
+    def _write_file(file_path: str, content: str) -> bool:
+        """
+        Write file only if its content differs, so unchanged files keep their mtime
+        :return: `True` if file was written
+        """
+        if os.path.exists(file_path):
+            with open(file_path, "r") as f:
+                if f.read() == content:
+                    return False
+        with open(file_path, "w") as f:
+            f.write(content)
+        return True
 
     @staticmethod
     def _get_j_template_instance(template_path: str) -> Template:
@@ -245,3 +505,61 @@ class Analyser:
         except Exception as ex:
             #print(f"_create_module exception: {ex}")
             pass
+
+
+class _InlineExecutor(Executor):
+    """
+    Executor running submitted function immediately in caller thread, used if `jobs` is 1
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as ex:
+            future.set_exception(ex)
+        return future
+
+
+@lru_cache(maxsize=None)
+def _load_j_template(template_path: str) -> Template:
+    # cached per process, worker processes load templates once
+    return Analyser._get_j_template_instance(template_path)
+
+
+def _render_table(template_paths: typing.Tuple[str, str, str], fast_path: bool, record: TableRecord) -> RenderedTable:
+    """
+    Render stage. Module level function, so it can be sent into worker processes.
+    """
+    model_template_path, manager_template_path, manager_base_template_path = template_paths
+    model = _load_j_template(model_template_path).render(
+        modelName=record.model_name,
+        tableName=record.table_name,
+        tableType=record.table_type,
+        tableDescription=record.table_description,
+        modelImports=record.model_imports,
+        modelConvertors=record.model_convertors,
+        primaryKeys=record.primary_keys,
+        indexes=record.indexes,
+        partitions=record.partitions,
+        dbProfile=record.db_profile,
+        queryTimeoutMs=record.query_timeout_ms,
+        relations=record.relations,
+        enumTypes=record.enum_types,
+        dataTypes=record.attr_datatypes,
+        viewStatement=record.view_statement,
+        viewStatementCreate=record.view_statement_create,
+        whereBase=record.where_base,
+        orderByDefault=record.order_by_default,
+    )
+    manager = _load_j_template(manager_template_path).render(modelName=record.model_name, tableName=record.table_name)
+    manager_base = _load_j_template(manager_base_template_path).render(
+        modelName=record.model_name,
+        tableName=record.table_name,
+        tableType=record.table_type,
+        primaryKeys=record.primary_keys,
+        dataTypes=record.attr_datatypes,
+        attributeList=[item["Field"] for item in record.table_description],
+        fastPath=fast_path,
+    )
+    return RenderedTable(record.table_name, record.model_name, model, manager, manager_base)
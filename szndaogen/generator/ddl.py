@@ -0,0 +1,476 @@
+import re
+import typing
+
+from .schema import (
+    ColumnSchema,
+    DatabaseSchema,
+    ForeignKeySchema,
+    IndexSchema,
+    PartitionSchema,
+    TableSchema,
+    build_view_create_statement,
+)
+from ..tools.log import Logger
+
+VIEW_PLACEHOLDER_COLUMN_TYPE = "text"
+""" Column type of view columns. `mysqldump` does not dump real types and nullability of view columns. """
+
+
+class DDLSchemaLoader:
+    """
+    Loads database schema from `mysqldump --no-data` output without connection to database.
+    Supported are `CREATE TABLE` and `CREATE VIEW` statements, other statements are ignored.
+    """
+
+    CONDITIONAL_COMMENT_REGEX = re.compile(r"/\*!\d*\s?|\s?\*/")
+    CREATE_TABLE_REGEX = re.compile(r"^CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\S+)\s*\(", re.I)
+    CREATE_VIEW_REGEX = re.compile(
+        r"^CREATE\s+(?:OR\s+REPLACE\s+)?(?:ALGORITHM\s*=\s*\w+\s+)?(?:DEFINER\s*=\s*(\S+)\s+)?"
+        r"(?:SQL\s+SECURITY\s+(\w+)\s+)?VIEW\s+(\S+?)\s*(?:\(([^)]*)\)\s*)?AS\s+(.*)$",
+        re.I | re.S,
+    )
+    VIEW_PLACEHOLDER_COLUMN_REGEX = re.compile(r"\bAS\s+(`(?:[^`]|``)+`)", re.I)
+    PRIMARY_KEY_REGEX = re.compile(r"^PRIMARY\s+KEY\s*(?:\w+\s+)?\((.*)\)", re.I | re.S)
+    INDEX_REGEX = re.compile(
+        r"^(UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)\s*(`(?:[^`]|``)+`|\w+)?\s*\((.*?)\)(?=[^)]*$)", re.I | re.S
+    )
+    FOREIGN_KEY_REGEX = re.compile(
+        r"^(?:CONSTRAINT\s+(`(?:[^`]|``)+`|\w+)\s+)?FOREIGN\s+KEY\s*(?:`(?:[^`]|``)+`\s*)?\(([^)]*)\)\s*"
+        r"REFERENCES\s+(\S+?)\s*\(([^)]*)\)",
+        re.I | re.S,
+    )
+    COLUMN_TYPE_REGEX = re.compile(r"^([a-z]+)", re.I)
+    PARTITION_BY_REGEX = re.compile(
+        r"\bPARTITION\s+BY\s+((?:LINEAR\s+)?(?:RANGE|LIST|HASH|KEY)(?:\s+COLUMNS)?)\s*\(", re.I
+    )
+    PARTITION_REGEX = re.compile(
+        r"^PARTITION\s+(`(?:[^`]|``)+`|\w+)(?:\s+VALUES\s+(?:LESS\s+THAN|IN)\s*(?:(MAXVALUE)|\())?", re.I
+    )
+
+    def __init__(self, file_path: str = None, ddl: str = None):
+        """
+        :param file_path: Path to DDL dump
+        :param ddl: DDL dump content, it is used instead of file
+        """
+        self.file_path = file_path
+        self.ddl = ddl
+
+    def load(self) -> DatabaseSchema:
+        ddl = self.ddl
+        if ddl is None:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                ddl = f.read()
+
+        tables = {}
+        foreign_keys = []
+        for statement in self._split_statements(self._strip_comments(ddl)):
+            found_table = self.CREATE_TABLE_REGEX.match(statement)
+            if found_table:
+                table, table_foreign_keys = self._parse_create_table(
+                    self._unquote_name(found_table.group(1)), statement[found_table.end():]
+                )
+                if tables.get(table.name, table).table_type == "VIEW":
+                    # mysqldump creates temporary table for each view before the view itself
+                    continue
+                tables[table.name] = table
+                foreign_keys.extend(table_foreign_keys)
+                continue
+
+            found_view = self.CREATE_VIEW_REGEX.match(statement)
+            if found_view:
+                view = self._parse_create_view(*found_view.groups(), placeholder=tables.get(
+                    self._unquote_name(found_view.group(3))
+                ))
+                tables[view.name] = view
+                foreign_keys = [foreign_key for foreign_key in foreign_keys if foreign_key.table_name != view.name]
+
+        Logger.log.debug("DDLSchemaLoader.load.done", tables=len(tables))
+        return DatabaseSchema(
+            tables=tuple(tables[table_name] for table_name in sorted(tables)),
+            foreign_keys=tuple(sorted(foreign_keys, key=lambda item: (item.table_name, item.name))),
+        )
+
+    def _parse_create_table(
+        self, table_name: str, body: str
+    ) -> typing.Tuple[TableSchema, typing.List[ForeignKeySchema]]:
+        """
+        :param body: Part of statement after opening parenthesis of `CREATE TABLE`
+        """
+        closing_parenthesis = self._find_closing_parenthesis(body)
+        definitions = self._split_top_level(body[:closing_parenthesis], ",")
+        columns = []
+        indexes = []
+        primary_keys = []
+        unique_keys = set()
+        multiple_keys = set()
+        foreign_keys = []
+        for definition in definitions:
+            definition = definition.strip()
+            if definition.startswith("`"):
+                columns.append(self._parse_column(definition))
+                continue
+
+            found = self.PRIMARY_KEY_REGEX.match(definition)
+            if found:
+                primary_keys = self._parse_name_list(found.group(1))
+                indexes.append(IndexSchema("PRIMARY", tuple(primary_keys), True, self._get_index_type(definition)))
+                continue
+
+            found = self.INDEX_REGEX.match(definition)
+            if found:
+                index_kind = (found.group(1) or "").strip().upper()
+                index_columns = self._parse_name_list(found.group(3))
+                if index_kind == "UNIQUE" and len(index_columns) == 1:
+                    unique_keys.add(index_columns[0])
+                elif index_columns:
+                    multiple_keys.add(index_columns[0])
+                if index_columns:
+                    indexes.append(
+                        IndexSchema(
+                            name=self._unquote_name(found.group(2)) if found.group(2) else index_columns[0],
+                            columns=tuple(index_columns),
+                            is_unique=index_kind == "UNIQUE",
+                            index_type=index_kind if index_kind in ("FULLTEXT", "SPATIAL") else self._get_index_type(definition),
+                        )
+                    )
+                continue
+
+            found = self.FOREIGN_KEY_REGEX.match(definition)
+            if found:
+                constraint_name, columns_list, referenced_table_name, referenced_columns_list = found.groups()
+                constraint_name = (
+                    self._unquote_name(constraint_name) if constraint_name else f"{table_name}_ibfk_{len(foreign_keys) + 1}"
+                )
+                foreign_key_columns = tuple(self._parse_name_list(columns_list))
+                foreign_keys.append(
+                    ForeignKeySchema(
+                        name=constraint_name,
+                        table_name=table_name,
+                        columns=foreign_key_columns,
+                        referenced_table_name=self._unquote_name(referenced_table_name),
+                        referenced_columns=tuple(self._parse_name_list(referenced_columns_list)),
+                    )
+                )
+                multiple_keys.add(foreign_key_columns[0])
+
+        # column key priority is the same as in `SHOW COLUMNS`: PRI, UNI, MUL
+        for index, column in enumerate(columns):
+            key = column.key
+            if column.name in primary_keys:
+                key = "PRI"
+            elif column.name in unique_keys and not key:
+                key = "UNI"
+            elif column.name in multiple_keys and not key:
+                key = "MUL"
+            nullable = "NO" if key == "PRI" else column.nullable
+            columns[index] = column._replace(key=key, nullable=nullable)
+
+        table = TableSchema(
+            name=table_name,
+            table_type="BASE TABLE",
+            columns=tuple(columns),
+            indexes=tuple(sorted(indexes, key=lambda item: item.name.lower())),
+            partitions=self._parse_partitions(body[closing_parenthesis + 1:]),
+        )
+        return table, foreign_keys
+
+    def _parse_partitions(self, table_options: str) -> typing.Tuple[PartitionSchema, ...]:
+        """
+        Parse `PARTITION BY` clause, subpartitions are ignored
+        :param table_options: Part of `CREATE TABLE` statement after column definitions
+        """
+        found = self.PARTITION_BY_REGEX.search(self._mask_strings(table_options))
+        if not found:
+            return ()
+        method = re.sub(r"\s+", " ", found.group(1).upper())
+        rest = table_options[found.end():]
+        expression_end = self._find_closing_parenthesis(rest)
+        expression = rest[:expression_end].strip() or None
+        if expression and (method.endswith("COLUMNS") or method.endswith("KEY")):
+            # information_schema shows column lists quoted
+            expression = ",".join("`{}`".format(name) for name in self._parse_name_list(expression))
+        rest = rest[expression_end + 1:]
+
+        found_count = re.match(r"\s*PARTITIONS\s+(\d+)", rest, re.I)
+        if found_count:
+            rest = rest[found_count.end():]
+        found_definitions = re.match(r"\s*\(", rest)
+        if not found_definitions:
+            # HASH and KEY partitions without definitions are named p0, p1, ...
+            count = int(found_count.group(1)) if found_count else 1
+            return tuple(PartitionSchema(f"p{index}", method, expression) for index in range(count))
+
+        rest = rest[found_definitions.end():]
+        partitions = []
+        for definition in self._split_top_level(rest[: self._find_closing_parenthesis(rest)], ","):
+            found_partition = self.PARTITION_REGEX.match(definition.strip())
+            if not found_partition:
+                continue
+            description = None
+            if found_partition.group(2):
+                description = "MAXVALUE"
+            elif definition.strip()[found_partition.end() - 1:found_partition.end()] == "(":
+                values = definition.strip()[found_partition.end():]
+                description = values[: self._find_closing_parenthesis(values)].strip()
+            partitions.append(
+                PartitionSchema(self._unquote_name(found_partition.group(1)), method, expression, description)
+            )
+        return tuple(partitions)
+
+    def _parse_column(self, definition: str) -> ColumnSchema:
+        name_end = self._find_name_end(definition)
+        name = self._unquote_name(definition[:name_end])
+        rest = definition[name_end:].strip()
+
+        found_type = self.COLUMN_TYPE_REGEX.match(rest)
+        type_end = found_type.end() if found_type else 0
+        if rest[type_end:type_end + 1] == "(":
+            type_end += self._find_closing_parenthesis(rest[type_end + 1:]) + 2
+        while True:
+            found_modifier = re.match(r"\s+(unsigned|zerofill)\b", rest[type_end:], re.I)
+            if not found_modifier:
+                break
+            type_end += found_modifier.end()
+        column_type = rest[:type_end].strip()
+        options = rest[type_end:]
+        options_upper = self._mask_strings(options).upper()
+
+        default = None
+        found_default = re.search(r"\bDEFAULT\s+", options_upper)
+        if found_default:
+            default = self._parse_value(options[found_default.end():])
+
+        comment = ""
+        found_comment = re.search(r"\bCOMMENT\s+", options_upper)
+        if found_comment:
+            comment = self._parse_value(options[found_comment.end():]) or ""
+
+        extra = []
+        if re.search(r"\bAUTO_INCREMENT\b", options_upper):
+            extra.append("auto_increment")
+        found_on_update = re.search(r"\bON\s+UPDATE\s+(CURRENT_TIMESTAMP(?:\(\d*\))?)", options_upper)
+        if found_on_update:
+            extra.append(f"on update {found_on_update.group(1)}")
+        found_generated = re.search(r"\b(VIRTUAL|STORED)\b", options_upper)
+        if re.search(r"\bAS\s*\(", options_upper) and found_generated:
+            extra.append(f"{found_generated.group(1)} GENERATED")
+
+        return ColumnSchema(
+            name=name,
+            column_type=column_type,
+            nullable="NO" if re.search(r"\bNOT\s+NULL\b", options_upper) else "YES",
+            key="",
+            default=default,
+            extra=" ".join(extra),
+            comment=comment,
+        )
+
+    def _parse_create_view(
+        self,
+        definer: typing.Optional[str],
+        security_type: typing.Optional[str],
+        view_name: str,
+        column_list: typing.Optional[str],
+        view_definition: str,
+        placeholder: TableSchema = None,
+    ) -> TableSchema:
+        view_name = self._unquote_name(view_name)
+        view_definition = view_definition.strip()
+        if column_list:
+            column_names = self._parse_name_list(column_list)
+        elif placeholder is not None:
+            column_names = [column.name for column in placeholder.columns]
+        else:
+            column_names = [
+                self._unquote_name(item) for item in self.VIEW_PLACEHOLDER_COLUMN_REGEX.findall(
+                    self._mask_strings(view_definition, keep_quotes="`")
+                )
+            ]
+
+        columns = tuple(
+            ColumnSchema(
+                name=column_name,
+                column_type=VIEW_PLACEHOLDER_COLUMN_TYPE,
+                nullable="YES",
+                key="",
+                default=None,
+                extra="",
+                comment="",
+            )
+            for column_name in column_names
+        )
+        if definer:
+            definer = definer.replace("`", "").replace("'", "")
+        # mysqldump placeholder views like `CREATE VIEW v AS SELECT 1 AS id` have no real definition
+        is_placeholder = definer is None and security_type is None
+        return TableSchema(
+            name=view_name,
+            table_type="VIEW",
+            columns=columns,
+            view_definition=None if is_placeholder else view_definition,
+            view_create_statement=None if is_placeholder else build_view_create_statement(
+                view_name, view_definition, definer, (security_type or "DEFINER").upper()
+            ),
+        )
+
+    def _strip_comments(self, ddl: str) -> str:
+        lines = []
+        for line in ddl.splitlines():
+            stripped = line.strip()
+            if stripped.startswith("--") or stripped.startswith("#"):
+                continue
+            lines.append(line)
+        ddl = "\n".join(lines)
+        ddl = re.sub(r"/\*(?!!).*?\*/", "", ddl, flags=re.S)
+        return self.CONDITIONAL_COMMENT_REGEX.sub(" ", ddl)
+
+    @classmethod
+    def _split_statements(cls, ddl: str) -> typing.List[str]:
+        return [statement.strip() for statement in cls._split_top_level(ddl, ";", nested=False) if statement.strip()]
+
+    @staticmethod
+    def _split_top_level(text: str, separator: str, nested: bool = True) -> typing.List[str]:
+        """
+        Split text by separator outside of quotes and parentheses
+        """
+        parts = []
+        depth = 0
+        quote = None
+        start = 0
+        index = 0
+        while index < len(text):
+            char = text[index]
+            if quote:
+                if char == "\\" and quote != "`":
+                    index += 1
+                elif char == quote:
+                    if text[index + 1:index + 2] == quote:
+                        index += 1
+                    else:
+                        quote = None
+            elif char in "'\"`":
+                quote = char
+            elif char == "(" and nested:
+                depth += 1
+            elif char == ")" and nested:
+                depth -= 1
+            elif char == separator and depth == 0:
+                parts.append(text[start:index])
+                start = index + 1
+            index += 1
+        parts.append(text[start:])
+        return parts
+
+    @classmethod
+    def _find_closing_parenthesis(cls, text: str) -> int:
+        """
+        :param text: Text after opening parenthesis
+        :return: Index of matching closing parenthesis
+        """
+        masked = cls._mask_strings(text, keep_quotes="")
+        depth = 0
+        for index, char in enumerate(masked):
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                if depth == 0:
+                    return index
+                depth -= 1
+        return len(text)
+
+    @staticmethod
+    def _mask_strings(text: str, keep_quotes: str = "`") -> str:
+        """
+        Replace content of quoted strings by spaces, so keywords and parentheses in strings are not matched
+        """
+        masked = []
+        quote = None
+        index = 0
+        while index < len(text):
+            char = text[index]
+            if quote:
+                if char == "\\" and quote != "`":
+                    masked.append("  ")
+                    index += 2
+                    continue
+                if char == quote:
+                    if text[index + 1:index + 2] == quote:
+                        masked.append("  ")
+                        index += 2
+                        continue
+                    quote = None
+                    masked.append(char)
+                else:
+                    masked.append(char if quote in keep_quotes else " ")
+            else:
+                if char in "'\"`":
+                    quote = char
+                masked.append(char)
+            index += 1
+        return "".join(masked)
+
+    @staticmethod
+    def _get_index_type(definition: str) -> str:
+        found = re.search(r"\bUSING\s+(BTREE|HASH)\b", definition, re.I)
+        return found.group(1).upper() if found else "BTREE"
+
+    @staticmethod
+    def _find_name_end(text: str) -> int:
+        index = 1
+        while index < len(text):
+            if text[index] == "`":
+                if text[index + 1:index + 2] == "`":
+                    index += 2
+                    continue
+                return index + 1
+            index += 1
+        return len(text)
+
+    @staticmethod
+    def _unquote_name(name: str) -> str:
+        # last part of `schema`.`table`
+        names = re.findall(r"`((?:[^`]|``)+)`|([^.`\s]+)", name.strip())
+        quoted, plain = names[-1] if names else ("", name)
+        return quoted.replace("``", "`") if quoted else plain
+
+    @classmethod
+    def _parse_name_list(cls, text: str) -> typing.List[str]:
+        names = []
+        for item in cls._split_top_level(text, ","):
+            item = item.strip()
+            if item:
+                # drop index prefix length and order e.g. `name`(10) DESC
+                name = item[: cls._find_name_end(item)] if item.startswith("`") else re.split(r"[\s(]", item)[0]
+                names.append(cls._unquote_name(name))
+        return names
+
+    @staticmethod
+    def _parse_value(text: str) -> typing.Optional[str]:
+        """
+        Parse literal at the beginning of text as `information_schema` shows it
+        """
+        text = text.lstrip()
+        if text[:1] in ("'", '"'):
+            quote = text[0]
+            value = []
+            index = 1
+            while index < len(text):
+                char = text[index]
+                if char == "\\" and index + 1 < len(text):
+                    value.append({"n": "\n", "t": "\t", "r": "\r", "0": "\0"}.get(text[index + 1], text[index + 1]))
+                    index += 2
+                    continue
+                if char == quote:
+                    if text[index + 1:index + 2] == quote:
+                        value.append(quote)
+                        index += 2
+                        continue
+                    break
+                value.append(char)
+                index += 1
+            return "".join(value)
+        if text.startswith("("):
+            return text[1: DDLSchemaLoader._find_closing_parenthesis(text[1:]) + 1]
+        found = re.match(r"[^\s,]+(?:\(\d*\))?", text)
+        value = found.group(0) if found else None
+        return None if value is None or value.upper() == "NULL" else value
@@ -0,0 +1,162 @@
+import typing
+
+from .schema import (
+    ColumnSchema,
+    DatabaseSchema,
+    ForeignKeySchema,
+    IndexSchema,
+    PartitionSchema,
+    TableSchema,
+    build_view_create_statement,
+)
+from ..data_access.db import DBI
+from ..tools.log import Logger
+
+
+class SchemaIntrospector:
+    """
+    Loads whole database schema from `information_schema` by a few bulk queries on one DB connection
+    instead of `SHOW` statements per table.
+    """
+
+    TABLES_SQL = (
+        "SELECT `TABLE_NAME`, `TABLE_TYPE` FROM `information_schema`.`TABLES` "
+        "WHERE `TABLE_SCHEMA` = DATABASE() ORDER BY `TABLE_NAME`"
+    )
+    COLUMNS_SQL = (
+        "SELECT `TABLE_NAME`, `COLUMN_NAME`, `COLUMN_TYPE`, `IS_NULLABLE`, `COLUMN_KEY`, `COLUMN_DEFAULT`, `EXTRA`, "
+        "`COLUMN_COMMENT` FROM `information_schema`.`COLUMNS` "
+        "WHERE `TABLE_SCHEMA` = DATABASE() ORDER BY `TABLE_NAME`, `ORDINAL_POSITION`"
+    )
+    VIEWS_SQL = (
+        "SELECT `TABLE_NAME`, `VIEW_DEFINITION`, `DEFINER`, `SECURITY_TYPE` FROM `information_schema`.`VIEWS` "
+        "WHERE `TABLE_SCHEMA` = DATABASE()"
+    )
+    INDEXES_SQL = (
+        "SELECT `TABLE_NAME`, `INDEX_NAME`, `COLUMN_NAME`, `NON_UNIQUE`, `INDEX_TYPE` "
+        "FROM `information_schema`.`STATISTICS` "
+        "WHERE `TABLE_SCHEMA` = DATABASE() ORDER BY `TABLE_NAME`, `INDEX_NAME`, `SEQ_IN_INDEX`"
+    )
+    PARTITIONS_SQL = (
+        "SELECT `TABLE_NAME`, `PARTITION_NAME`, `PARTITION_METHOD`, `PARTITION_EXPRESSION`, `PARTITION_DESCRIPTION` "
+        "FROM `information_schema`.`PARTITIONS` "
+        "WHERE `TABLE_SCHEMA` = DATABASE() AND `PARTITION_NAME` IS NOT NULL "
+        "ORDER BY `TABLE_NAME`, `PARTITION_ORDINAL_POSITION`, `SUBPARTITION_ORDINAL_POSITION`"
+    )
+    FOREIGN_KEYS_SQL = (
+        "SELECT `TABLE_NAME`, `CONSTRAINT_NAME`, `COLUMN_NAME`, `REFERENCED_TABLE_NAME`, `REFERENCED_COLUMN_NAME` "
+        "FROM `information_schema`.`KEY_COLUMN_USAGE` "
+        "WHERE `TABLE_SCHEMA` = DATABASE() AND `REFERENCED_TABLE_SCHEMA` = DATABASE() "
+        "ORDER BY `TABLE_NAME`, `CONSTRAINT_NAME`, `ORDINAL_POSITION`"
+    )
+
+    def __init__(self, db: DBI = None):
+        self.db = db or DBI()
+
+    @DBI.use_self_dbi("db")
+    def load(self) -> DatabaseSchema:
+        Logger.log.debug("SchemaIntrospector.load.start")
+        columns = self._load_columns()
+        views = self._load_views()
+        indexes = self._load_indexes()
+        partitions = self._load_partitions()
+        tables = []
+        for item in self.db.fetch_all(self.TABLES_SQL):
+            table_name = item["TABLE_NAME"]
+            table_type = "VIEW" if item["TABLE_TYPE"] == "VIEW" else "BASE TABLE"
+            view_definition, view_create_statement = views.get(table_name, (None, None))
+            tables.append(
+                TableSchema(
+                    name=table_name,
+                    table_type=table_type,
+                    columns=tuple(columns.get(table_name, ())),
+                    view_definition=view_definition,
+                    view_create_statement=view_create_statement,
+                    indexes=tuple(indexes.get(table_name, ())),
+                    partitions=tuple(partitions.get(table_name, ())),
+                )
+            )
+        schema = DatabaseSchema(tables=tuple(tables), foreign_keys=self._load_foreign_keys())
+        Logger.log.debug("SchemaIntrospector.load.done", tables=len(schema.tables))
+        return schema
+
+    def _load_columns(self) -> typing.Dict[str, typing.List[ColumnSchema]]:
+        columns = {}
+        for item in self.db.fetch_all(self.COLUMNS_SQL):
+            columns.setdefault(item["TABLE_NAME"], []).append(
+                ColumnSchema(
+                    name=item["COLUMN_NAME"],
+                    column_type=item["COLUMN_TYPE"],
+                    nullable=item["IS_NULLABLE"],
+                    key=item["COLUMN_KEY"] or "",
+                    default=item["COLUMN_DEFAULT"],
+                    extra=item["EXTRA"] or "",
+                    comment=item["COLUMN_COMMENT"] or "",
+                )
+            )
+        return columns
+
+    def _load_views(self) -> typing.Dict[str, typing.Tuple[str, str]]:
+        views = {}
+        for item in self.db.fetch_all(self.VIEWS_SQL):
+            views[item["TABLE_NAME"]] = (
+                item["VIEW_DEFINITION"],
+                build_view_create_statement(
+                    item["TABLE_NAME"], item["VIEW_DEFINITION"], item["DEFINER"], item["SECURITY_TYPE"]
+                ),
+            )
+        return views
+
+    def _load_indexes(self) -> typing.Dict[str, typing.List[IndexSchema]]:
+        indexes = {}
+        for item in self.db.fetch_all(self.INDEXES_SQL):
+            index = indexes.setdefault(item["TABLE_NAME"], {}).setdefault(
+                item["INDEX_NAME"], (not int(item["NON_UNIQUE"]), item["INDEX_TYPE"], [])
+            )
+            # functional key parts have no column
+            if item["COLUMN_NAME"]:
+                index[2].append(item["COLUMN_NAME"])
+
+        return {
+            table_name: [
+                IndexSchema(name=index_name, columns=tuple(columns), is_unique=is_unique, index_type=index_type)
+                for index_name, (is_unique, index_type, columns) in table_indexes.items()
+                if columns
+            ]
+            for table_name, table_indexes in indexes.items()
+        }
+
+    def _load_partitions(self) -> typing.Dict[str, typing.List[PartitionSchema]]:
+        partitions = {}
+        for item in self.db.fetch_all(self.PARTITIONS_SQL):
+            table_partitions = partitions.setdefault(item["TABLE_NAME"], {})
+            # subpartitions repeat their partition
+            if item["PARTITION_NAME"] not in table_partitions:
+                table_partitions[item["PARTITION_NAME"]] = PartitionSchema(
+                    name=item["PARTITION_NAME"],
+                    method=item["PARTITION_METHOD"],
+                    expression=item["PARTITION_EXPRESSION"],
+                    description=item["PARTITION_DESCRIPTION"],
+                )
+        return {table_name: list(table_partitions.values()) for table_name, table_partitions in partitions.items()}
+
+    def _load_foreign_keys(self) -> typing.Tuple[ForeignKeySchema, ...]:
+        foreign_keys = {}
+        for item in self.db.fetch_all(self.FOREIGN_KEYS_SQL):
+            foreign_key = foreign_keys.setdefault(
+                (item["TABLE_NAME"], item["CONSTRAINT_NAME"]),
+                (item["REFERENCED_TABLE_NAME"], [], []),
+            )
+            foreign_key[1].append(item["COLUMN_NAME"])
+            foreign_key[2].append(item["REFERENCED_COLUMN_NAME"])
+
+        return tuple(
+            ForeignKeySchema(
+                name=constraint_name,
+                table_name=table_name,
+                columns=tuple(columns),
+                referenced_table_name=referenced_table_name,
+                referenced_columns=tuple(referenced_columns),
+            )
+            for (table_name, constraint_name), (referenced_table_name, columns, referenced_columns) in foreign_keys.items()
+        )
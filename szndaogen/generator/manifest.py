@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import typing
+
+from .schema import DatabaseSchema, TableSchema
+
+
+class GenerationManifest:
+    """
+    Schema fingerprints of generated tables stored next to generated output. Table is rendered again only if its
+    fingerprint or hash of templates changed since previous run.
+    """
+
+    FILE_NAME = ".szndaogen_manifest.json"
+
+    def __init__(self, output_path: str, template_hash: str):
+        self.file_path = os.path.join(output_path, self.FILE_NAME)
+        self.template_hash = template_hash
+        self.previous_template_hash: str = None
+        self.previous_fingerprints: typing.Dict[str, str] = {}
+        self.fingerprints: typing.Dict[str, str] = {}
+
+    def load(self) -> "GenerationManifest":
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.previous_template_hash = data.get("template_hash")
+            self.previous_fingerprints = data.get("tables", {})
+        except (OSError, ValueError):
+            self.previous_template_hash = None
+            self.previous_fingerprints = {}
+        return self
+
+    def save(self):
+        data = {"template_hash": self.template_hash, "tables": dict(sorted(self.fingerprints.items()))}
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    def is_changed(self, table_name: str, fingerprint: str) -> bool:
+        return (
+            self.previous_template_hash != self.template_hash
+            or self.previous_fingerprints.get(table_name) != fingerprint
+        )
+
+    def set_fingerprint(self, table_name: str, fingerprint: str):
+        self.fingerprints[table_name] = fingerprint
+
+    def get_dropped_tables(self, table_names: typing.Iterable[str]) -> typing.List[str]:
+        """
+        Tables generated by previous run which are not in current schema
+        :param table_names: Names of all tables in current schema
+        """
+        return sorted(set(self.previous_fingerprints) - set(table_names))
+
+    @staticmethod
+    def get_table_fingerprint(schema: DatabaseSchema, table: TableSchema, *options) -> str:
+        """
+        Hash of everything generated files of table depend on: table record, its foreign keys and generator options
+        """
+        source = repr((table, tuple(schema.get_foreign_keys(table.name)), options))
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_template_hash(*file_paths: str) -> str:
+        digest = hashlib.sha256()
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                digest.update(f.read())
+        return digest.hexdigest()
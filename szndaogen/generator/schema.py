@@ -0,0 +1,102 @@
+import typing
+
+
+class ColumnSchema(typing.NamedTuple):
+    name: str
+    column_type: str
+    """ Full column type e.g. "int(11) unsigned" """
+    nullable: str
+    """ "YES" or "NO" """
+    key: str
+    """ "PRI", "UNI", "MUL" or "" """
+    default: typing.Optional[str]
+    extra: str
+    comment: str
+
+    def to_description(self) -> typing.Dict:
+        """
+        Column description in the same format as `SHOW FULL COLUMNS` row used by templates
+        """
+        return {
+            "Field": self.name,
+            "Type": self.column_type,
+            "Null": self.nullable,
+            "Key": self.key,
+            "Default": self.default,
+            "Extra": self.extra,
+            "Comment": self.comment,
+        }
+
+
+class ForeignKeySchema(typing.NamedTuple):
+    name: str
+    table_name: str
+    columns: typing.Tuple[str, ...]
+    referenced_table_name: str
+    referenced_columns: typing.Tuple[str, ...]
+
+
+class IndexSchema(typing.NamedTuple):
+    name: str
+    columns: typing.Tuple[str, ...]
+    is_unique: bool
+    index_type: str = "BTREE"
+    """ "BTREE", "HASH", "FULLTEXT" or "SPATIAL" """
+
+
+class PartitionSchema(typing.NamedTuple):
+    name: str
+    method: str
+    """ "RANGE", "RANGE COLUMNS", "LIST", "LIST COLUMNS", "HASH", "LINEAR HASH", "KEY" or "LINEAR KEY" """
+    expression: typing.Optional[str]
+    """ Partitioning expression or columns e.g. "to_days(`created`)" """
+    description: typing.Optional[str] = None
+    """ Upper bound of RANGE partition or values of LIST partition e.g. "738886", "MAXVALUE" or "1,2,3" """
+
+
+class TableSchema(typing.NamedTuple):
+    name: str
+    table_type: str
+    """ "BASE TABLE" or "VIEW" """
+    columns: typing.Tuple[ColumnSchema, ...]
+    view_definition: typing.Optional[str] = None
+    """ Select statement of view """
+    view_create_statement: typing.Optional[str] = None
+    indexes: typing.Tuple[IndexSchema, ...] = ()
+    partitions: typing.Tuple[PartitionSchema, ...] = ()
+    """ Partitions in partition order """
+
+    @property
+    def primary_keys(self) -> typing.List[str]:
+        return [column.name for column in self.columns if column.key == "PRI"]
+
+
+class DatabaseSchema(typing.NamedTuple):
+    """
+    In-memory model of database schema consumed by generator
+    """
+
+    tables: typing.Tuple[TableSchema, ...]
+    foreign_keys: typing.Tuple[ForeignKeySchema, ...] = ()
+
+    def get_foreign_keys(self, table_name: str) -> typing.List[ForeignKeySchema]:
+        """
+        Foreign keys referencing or referenced by table
+        """
+        return [
+            foreign_key
+            for foreign_key in self.foreign_keys
+            if table_name in (foreign_key.table_name, foreign_key.referenced_table_name)
+        ]
+
+
+def build_view_create_statement(view_name: str, view_definition: str, definer: str, security_type: str) -> str:
+    """
+    Rebuild `SHOW CREATE VIEW` like statement
+    :param definer: Definer in `user@host` format
+    """
+    definer_clause = ""
+    if definer:
+        user, _, host = definer.rpartition("@")
+        definer_clause = f"DEFINER=`{user}`@`{host}` " if user else f"DEFINER=`{host}` "
+    return f"CREATE {definer_clause}SQL SECURITY {security_type or 'DEFINER'} VIEW `{view_name}` AS {view_definition}"
@@ -0,0 +1,72 @@
+import json
+import typing
+
+from .schema import ColumnSchema, DatabaseSchema, ForeignKeySchema, IndexSchema, PartitionSchema, TableSchema
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotSchemaLoader:
+    """
+    Loads database schema from JSON snapshot exported by `save_snapshot` (CLI option `--export-snapshot`)
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def load(self) -> DatabaseSchema:
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported schema snapshot version '{data.get('version')}' in '{self.file_path}'.")
+        return schema_from_dict(data)
+
+
+def save_snapshot(schema: DatabaseSchema, file_path: str):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(schema_to_dict(schema), f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def schema_to_dict(schema: DatabaseSchema) -> typing.Dict:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "tables": [
+            dict(
+                table._asdict(),
+                columns=[column._asdict() for column in table.columns],
+                indexes=[index._asdict() for index in table.indexes],
+                partitions=[partition._asdict() for partition in table.partitions],
+            )
+            for table in schema.tables
+        ],
+        "foreign_keys": [foreign_key._asdict() for foreign_key in schema.foreign_keys],
+    }
+
+
+def schema_from_dict(data: typing.Dict) -> DatabaseSchema:
+    return DatabaseSchema(
+        tables=tuple(
+            TableSchema(
+                **dict(
+                    table,
+                    columns=tuple(ColumnSchema(**column) for column in table["columns"]),
+                    indexes=tuple(
+                        IndexSchema(**dict(index, columns=tuple(index["columns"]))) for index in table.get("indexes", ())
+                    ),
+                    partitions=tuple(PartitionSchema(**partition) for partition in table.get("partitions", ())),
+                )
+            )
+            for table in data["tables"]
+        ),
+        foreign_keys=tuple(
+            ForeignKeySchema(
+                **dict(
+                    foreign_key,
+                    columns=tuple(foreign_key["columns"]),
+                    referenced_columns=tuple(foreign_key["referenced_columns"]),
+                )
+            )
+            for foreign_key in data.get("foreign_keys", ())
+        ),
+    )
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from .analyser import Analyser
+from .test_introspection import FakeDBI
+
+
+def _generate(output_path, jobs: int, capsys) -> tuple:
+    analyser = Analyser(str(output_path), jobs=jobs)
+    analyser.db = FakeDBI()
+    analyser.run()
+    files = {}
+    for directory, _, file_names in os.walk(str(output_path)):
+        for file_name in file_names:
+            file_path = os.path.join(directory, file_name)
+            with open(file_path, "r") as f:
+                files[os.path.relpath(file_path, str(output_path))] = f.read()
+    return files, capsys.readouterr().out.replace(str(output_path), "")
+
+
+@pytest.mark.parametrize("jobs", [2, 4])
+def test_parallel_generation_is_deterministic(tmp_path, capsys, jobs):
+    sequential_files, sequential_output = _generate(tmp_path / "sequential", 1, capsys)
+    parallel_files, parallel_output = _generate(tmp_path / "parallel", jobs, capsys)
+    assert parallel_files == sequential_files
+    assert parallel_output == sequential_output
+
+
+def test_view_statement_does_not_leak_into_next_table(tmp_path, capsys):
+    files, _ = _generate(tmp_path, 1, capsys)
+    assert 'SQL_STATEMENT_WHERE_BASE: str = "`users`.`name` IS NOT NULL"' in files["models/active_users_model.py"]
+    assert 'SQL_STATEMENT_WHERE_BASE: str = "1"' in files["models/companies_model.py"]
+    assert '"""SELECT {HINTS} ' in files["models/active_users_model.py"]
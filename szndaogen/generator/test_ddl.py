@@ -0,0 +1,228 @@
+import os
+
+import pytest
+
+from .analyser import Analyser
+from .ddl import VIEW_PLACEHOLDER_COLUMN_TYPE, DDLSchemaLoader
+from .introspection import SchemaIntrospector
+from .snapshot import SnapshotSchemaLoader, save_snapshot
+from .test_introspection import FakeDBI
+
+MYSQLDUMP_DDL = r"""
+-- MySQL dump 10.13  Distrib 8.0.29, for Linux (x86_64)
+--
+-- Host: localhost    Database: company
+-- ------------------------------------------------------
+
+/*!40101 SET @OLD_CHARACTER_SET_CLIENT=@@CHARACTER_SET_CLIENT */;
+/*!40101 SET NAMES utf8mb4 */;
+
+--
+-- Temporary view structure for view `active_users`
+--
+
+DROP TABLE IF EXISTS `active_users`;
+/*!50001 DROP VIEW IF EXISTS `active_users`*/;
+SET @saved_cs_client     = @@character_set_client;
+/*!50503 SET character_set_client = utf8mb4 */;
+/*!50001 CREATE VIEW `active_users` AS SELECT
+ 1 AS `id`*/;
+SET character_set_client = @saved_cs_client;
+
+--
+-- Table structure for table `companies`
+--
+
+DROP TABLE IF EXISTS `companies`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `companies` (
+  `id` int(11) NOT NULL,
+  PRIMARY KEY (`id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `users`
+--
+
+DROP TABLE IF EXISTS `users`;
+CREATE TABLE `users` (
+  `id` int(11) NOT NULL,
+  `company_id` int(11) NOT NULL,
+  `name` varchar(50) DEFAULT 'anonymous' COMMENT 'Full name',
+  PRIMARY KEY (`id`),
+  KEY `users_company_fk` (`company_id`),
+  KEY `users_name` (`name`,`id`),
+  CONSTRAINT `users_company_fk` FOREIGN KEY (`company_id`) REFERENCES `companies` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+DELIMITER ;;
+/*!50003 CREATE*/ /*!50017 DEFINER=`root`@`%`*/ /*!50003 TRIGGER `users_bi` BEFORE INSERT ON `users` FOR EACH ROW BEGIN
+  SET NEW.name = TRIM(NEW.name);
+END */;;
+DELIMITER ;
+
+--
+-- Final view structure for view `active_users`
+--
+
+/*!50001 DROP VIEW IF EXISTS `active_users`*/;
+/*!50001 SET @saved_cs_client          = @@character_set_client */;
+/*!50001 CREATE ALGORITHM=UNDEFINED */
+/*!50013 DEFINER=`root`@`%` SQL SECURITY INVOKER */
+/*!50001 VIEW `active_users` AS select `users`.`id` AS `id` from `users` where `users`.`name` is not null */;
+/*!50001 SET character_set_client      = @saved_cs_client */;
+"""
+
+
+def test_ddl_schema_equals_introspected_schema():
+    introspected_schema = SchemaIntrospector(FakeDBI()).load()
+    schema = DDLSchemaLoader(ddl=MYSQLDUMP_DDL).load()
+
+    assert schema.tables[1:] == introspected_schema.tables[1:]
+    assert schema.foreign_keys == introspected_schema.foreign_keys
+
+    view, introspected_view = schema.tables[0], introspected_schema.tables[0]
+    assert view._replace(columns=()) == introspected_view._replace(columns=())
+    assert [(column.name, column.column_type) for column in view.columns] == [("id", VIEW_PLACEHOLDER_COLUMN_TYPE)]
+
+
+@pytest.mark.parametrize(
+    "definition, expected",
+    [
+        ("`id` int(10) unsigned NOT NULL AUTO_INCREMENT", ("int(10) unsigned", "NO", None, "auto_increment", "")),
+        ("`state` enum('new','it''s done') DEFAULT 'new'", ("enum('new','it''s done')", "YES", "new", "", "")),
+        (
+            "`updated` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Last, (change)'",
+            ("timestamp", "YES", "CURRENT_TIMESTAMP", "on update CURRENT_TIMESTAMP", "Last, (change)"),
+        ),
+        ("`price` decimal(10,2) NOT NULL DEFAULT '0.00'", ("decimal(10,2)", "NO", "0.00", "", "")),
+        ("`note` text", ("text", "YES", None, "", "")),
+        (
+            "`full_name` varchar(101) GENERATED ALWAYS AS (concat(`a`,' ',`b`)) VIRTUAL",
+            ("varchar(101)", "YES", None, "VIRTUAL GENERATED", ""),
+        ),
+    ],
+)
+def test_ddl_column_definition(definition, expected):
+    column = DDLSchemaLoader()._parse_column(definition)
+    assert (column.column_type, column.nullable, column.default, column.extra, column.comment) == expected
+
+
+def test_ddl_column_keys():
+    schema = DDLSchemaLoader(
+        ddl="CREATE TABLE `t` (`a` int NOT NULL, `b` int, `c` int, `d` int, "
+        "PRIMARY KEY (`a`), UNIQUE KEY `u_b` (`b`), UNIQUE KEY `u_cd` (`c`,`d`), KEY `i_d` (`d`(10)));"
+    ).load()
+    assert [column.key for column in schema.tables[0].columns] == ["PRI", "UNI", "MUL", "MUL"]
+
+
+def test_snapshot_round_trip(tmp_path):
+    schema = SchemaIntrospector(FakeDBI()).load()
+    snapshot_path = str(tmp_path / "schema.json")
+    save_snapshot(schema, snapshot_path)
+    assert SnapshotSchemaLoader(snapshot_path).load() == schema
+
+
+def _read_generated(output_path) -> dict:
+    files = {}
+    for directory, _, file_names in os.walk(str(output_path)):
+        for file_name in file_names:
+            if file_name.endswith(".py"):
+                with open(os.path.join(directory, file_name), "r") as f:
+                    files[os.path.relpath(os.path.join(directory, file_name), str(output_path))] = f.read()
+    return files
+
+
+def test_offline_generation_equals_database_generation(tmp_path):
+    analyser = Analyser(str(tmp_path / "db"), export_snapshot_path=str(tmp_path / "schema.json"))
+    analyser.db = FakeDBI()
+    analyser.run()
+
+    snapshot_loader = SnapshotSchemaLoader(str(tmp_path / "schema.json"))
+    snapshot_analyser = Analyser(str(tmp_path / "snapshot"), schema_loader=snapshot_loader)
+    assert snapshot_analyser.db is None
+    snapshot_analyser.run()
+    assert _read_generated(tmp_path / "snapshot") == _read_generated(tmp_path / "db")
+
+    Analyser(str(tmp_path / "ddl"), schema_loader=DDLSchemaLoader(ddl=MYSQLDUMP_DDL)).run()
+    ddl_files, db_files = _read_generated(tmp_path / "ddl"), _read_generated(tmp_path / "db")
+    assert {path: content for path, content in ddl_files.items() if "active_users" not in path} == {
+        path: content for path, content in db_files.items() if "active_users" not in path
+    }
+
+
+PARTITIONED_DDL = r"""
+CREATE TABLE `events` (
+  `id` int NOT NULL AUTO_INCREMENT,
+  `created` date NOT NULL,
+  PRIMARY KEY (`id`,`created`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+/*!50100 PARTITION BY RANGE (to_days(`created`))
+(PARTITION p2022 VALUES LESS THAN (738886) ENGINE = InnoDB,
+ PARTITION pmax VALUES LESS THAN MAXVALUE ENGINE = InnoDB) */;
+"""
+
+
+@pytest.mark.parametrize(
+    "partition_by, expected",
+    [
+        ("", []),
+        (
+            PARTITIONED_DDL.split("*/;")[0].split("/*!50100")[1],
+            [("p2022", "RANGE", "to_days(`created`)", "738886"), ("pmax", "RANGE", "to_days(`created`)", "MAXVALUE")],
+        ),
+        (
+            "PARTITION BY LIST  COLUMNS(c) (PARTITION pa VALUES IN ('a','b') ENGINE = InnoDB, "
+            "PARTITION `pc` VALUES IN ('c') ENGINE = InnoDB)",
+            [("pa", "LIST COLUMNS", "`c`", "'a','b'"), ("pc", "LIST COLUMNS", "`c`", "'c'")],
+        ),
+        (
+            "PARTITION BY LINEAR HASH (`id`) PARTITIONS 2",
+            [("p0", "LINEAR HASH", "`id`", None), ("p1", "LINEAR HASH", "`id`", None)],
+        ),
+        ("PARTITION BY KEY () PARTITIONS 1", [("p0", "KEY", None, None)]),
+    ],
+)
+def test_ddl_partitions(partition_by, expected):
+    ddl = f"CREATE TABLE `t` (`id` int NOT NULL, `c` char(1)) ENGINE=InnoDB {partition_by};"
+    schema = DDLSchemaLoader(ddl=ddl).load()
+    assert [tuple(partition) for partition in schema.tables[0].partitions] == expected
+
+
+def test_partitioned_model_generation(tmp_path):
+    schema = DDLSchemaLoader(ddl=PARTITIONED_DDL).load()
+    snapshot_path = str(tmp_path / "schema.json")
+    save_snapshot(schema, snapshot_path)
+    assert SnapshotSchemaLoader(snapshot_path).load() == schema
+
+    Analyser(str(tmp_path / "dao"), schema_loader=DDLSchemaLoader(ddl=PARTITIONED_DDL)).run()
+    model_namespace = {}
+    exec((tmp_path / "dao" / "models" / "events_model.py").read_text(), model_namespace)
+    meta = model_namespace["EventsModel"].Meta
+    assert "{PARTITION}" in meta.SQL_STATEMENT
+    assert (meta.PARTITION_METHOD, meta.PARTITION_EXPRESSION) == ("RANGE", "to_days(`created`)")
+    assert meta.PARTITIONS == {"p2022": "738886", "pmax": "MAXVALUE"}
+
+
+def test_model_generation_with_db_profile(tmp_path):
+    Analyser(str(tmp_path / "dao"), schema_loader=DDLSchemaLoader(ddl=PARTITIONED_DDL), db_profile="archive").run()
+    model_namespace = {}
+    exec((tmp_path / "dao" / "models" / "events_model.py").read_text(), model_namespace)
+    assert model_namespace["EventsModel"].Meta.DB_PROFILE == "archive"
+
+    with pytest.raises(ValueError):
+        Analyser(str(tmp_path / "dao"), db_profile='archive"')
+
+
+def test_model_generation_with_query_timeout(tmp_path):
+    Analyser(str(tmp_path / "dao"), schema_loader=DDLSchemaLoader(ddl=PARTITIONED_DDL), query_timeout_ms=2500).run()
+    model_namespace = {}
+    exec((tmp_path / "dao" / "models" / "events_model.py").read_text(), model_namespace)
+    meta = model_namespace["EventsModel"].Meta
+    assert meta.QUERY_TIMEOUT_MS == 2500
+    assert meta.SQL_STATEMENT.startswith("SELECT {HINTS} {PROJECTION}")
+
+    with pytest.raises(ValueError):
+        Analyser(str(tmp_path / "dao"), query_timeout_ms=0)
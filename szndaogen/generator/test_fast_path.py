@@ -0,0 +1,75 @@
+import importlib
+
+import pytest
+
+from .analyser import Analyser
+from .schema import ColumnSchema, DatabaseSchema, TableSchema
+from ..data_access.fake_dbi import FakeDBI
+from ..data_access.profiling import ManagerProfiler
+
+_table = TableSchema(
+    name="events",
+    table_type="BASE TABLE",
+    columns=(ColumnSchema("id", "int(11)", "NO", "PRI", None, "", ""),)
+    + tuple(ColumnSchema(f"column_{index}", "varchar(50)", "YES", "", None, "", "") for index in range(1, 20)),
+)
+
+
+def _generate_manager_class(output_path, package_name: str, fast_path: bool):
+    analyser = Analyser(str(output_path / package_name), fast_path=fast_path)
+    record = analyser.analyse_table(DatabaseSchema(tables=(_table,)), _table)
+    analyser.write_table(analyser.render_table(record))
+    module = importlib.import_module(f"{package_name}.managers.base.events_manager_base")
+    return module.EventsManagerBase
+
+
+@pytest.fixture(scope="module")
+def manager_classes(tmp_path_factory):
+    output_path = tmp_path_factory.mktemp("fast_path")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.syspath_prepend(str(output_path))
+        yield (
+            _generate_manager_class(output_path, "generic_path_dao", fast_path=False),
+            _generate_manager_class(output_path, "fast_path_dao", fast_path=True),
+        )
+
+
+def _create_model(manager_class):
+    model_instance = manager_class.create_model_instance()
+    model_instance.id = 7
+    for index in range(1, 20):
+        model_instance.__setattr__(f"column_{index}", f"value {index}")
+    return model_instance
+
+
+def test_fast_path_is_generated_only_in_fast_mode(manager_classes):
+    generic_manager_class, fast_manager_class = manager_classes
+    assert "update_one" not in generic_manager_class.__dict__
+    assert "update_one" in fast_manager_class.__dict__
+    assert fast_manager_class.COLUMNS == tuple(fast_manager_class.MODEL_CLASS.Meta.ATTRIBUTE_LIST)
+
+
+@pytest.mark.parametrize("method_name", ["insert_one", "update_one", "delete_one"])
+def test_fast_path_equals_generic_path(manager_classes, method_name):
+    executed = []
+    for manager_class in manager_classes:
+        dbi = FakeDBI()
+        getattr(manager_class(dbi=dbi), method_name)(_create_model(manager_class))
+        executed.append(dbi.executed)
+    assert executed[0] == executed[1]
+
+
+def test_fast_path_is_profiled(manager_classes):
+    fast_manager_class = manager_classes[1]
+    manager = fast_manager_class(dbi=FakeDBI())
+    ManagerProfiler.reset()
+    with ManagerProfiler.profiling():
+        for method_name in ("insert_one", "update_one", "delete_one"):
+            getattr(manager, method_name)(_create_model(fast_manager_class))
+        # generic path called by super() is recorded as the same call
+        manager.update_one(_create_model(fast_manager_class), exclude_none_values=True)
+
+    stats = {item.method: item for item in ManagerProfiler.get_stats()}
+    ManagerProfiler.reset()
+    assert {method: item.calls for method, item in stats.items()} == {"insert_one": 1, "update_one": 2, "delete_one": 1}
+    assert all("db" in item.phases for item in stats.values())
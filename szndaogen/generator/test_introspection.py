@@ -0,0 +1,132 @@
+import typing
+
+import pytest
+
+from .analyser import Analyser
+from .introspection import SchemaIntrospector
+from ..data_access import fake_dbi
+
+_column_defaults = {"IS_NULLABLE": "NO", "COLUMN_KEY": "", "COLUMN_DEFAULT": None, "EXTRA": "", "COLUMN_COMMENT": ""}
+
+_rows = {
+    SchemaIntrospector.TABLES_SQL: [
+        {"TABLE_NAME": "active_users", "TABLE_TYPE": "VIEW"},
+        {"TABLE_NAME": "companies", "TABLE_TYPE": "BASE TABLE"},
+        {"TABLE_NAME": "users", "TABLE_TYPE": "BASE TABLE"},
+    ],
+    SchemaIntrospector.COLUMNS_SQL: [
+        dict(_column_defaults, TABLE_NAME="active_users", COLUMN_NAME="id", COLUMN_TYPE="int(11)"),
+        dict(_column_defaults, TABLE_NAME="companies", COLUMN_NAME="id", COLUMN_TYPE="int(11)", COLUMN_KEY="PRI"),
+        dict(_column_defaults, TABLE_NAME="users", COLUMN_NAME="id", COLUMN_TYPE="int(11)", COLUMN_KEY="PRI"),
+        dict(_column_defaults, TABLE_NAME="users", COLUMN_NAME="company_id", COLUMN_TYPE="int(11)", COLUMN_KEY="MUL"),
+        dict(
+            _column_defaults, TABLE_NAME="users", COLUMN_NAME="name", COLUMN_TYPE="varchar(50)", IS_NULLABLE="YES",
+            COLUMN_KEY="MUL", COLUMN_DEFAULT="anonymous", COLUMN_COMMENT="Full name",
+        ),
+    ],
+    SchemaIntrospector.VIEWS_SQL: [
+        {
+            "TABLE_NAME": "active_users",
+            "VIEW_DEFINITION": "select `users`.`id` AS `id` from `users` where `users`.`name` is not null",
+            "DEFINER": "root@%",
+            "SECURITY_TYPE": "INVOKER",
+        }
+    ],
+    SchemaIntrospector.INDEXES_SQL: [
+        {"TABLE_NAME": "companies", "INDEX_NAME": "PRIMARY", "COLUMN_NAME": "id", "NON_UNIQUE": 0, "INDEX_TYPE": "BTREE"},
+        {"TABLE_NAME": "users", "INDEX_NAME": "PRIMARY", "COLUMN_NAME": "id", "NON_UNIQUE": 0, "INDEX_TYPE": "BTREE"},
+        {
+            "TABLE_NAME": "users",
+            "INDEX_NAME": "users_company_fk",
+            "COLUMN_NAME": "company_id",
+            "NON_UNIQUE": 1,
+            "INDEX_TYPE": "BTREE",
+        },
+        {"TABLE_NAME": "users", "INDEX_NAME": "users_name", "COLUMN_NAME": "name", "NON_UNIQUE": 1, "INDEX_TYPE": "BTREE"},
+        {"TABLE_NAME": "users", "INDEX_NAME": "users_name", "COLUMN_NAME": "id", "NON_UNIQUE": 1, "INDEX_TYPE": "BTREE"},
+    ],
+    SchemaIntrospector.PARTITIONS_SQL: [],
+    SchemaIntrospector.FOREIGN_KEYS_SQL: [
+        {
+            "TABLE_NAME": "users",
+            "CONSTRAINT_NAME": "users_company_fk",
+            "COLUMN_NAME": "company_id",
+            "REFERENCED_TABLE_NAME": "companies",
+            "REFERENCED_COLUMN_NAME": "id",
+        }
+    ],
+}
+
+
+class FakeDBI(fake_dbi.FakeDBI):
+    """
+    Shared data access FakeDBI answering information_schema queries by `_rows`
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.is_pinned = []
+
+    def _select(self, sql: str, sql_args: typing.Sequence) -> typing.List[typing.Dict]:
+        self.queries.append(sql)
+        self.is_pinned.append(self._is_in_self_dbi)
+        return [dict(item) for item in _rows[sql]]
+
+    def _close_connection(self):
+        return True
+
+
+def test_schema_is_loaded_by_bulk_queries_on_one_connection():
+    dbi = FakeDBI()
+    schema = SchemaIntrospector(dbi).load()
+
+    assert len(dbi.queries) == 6 and all(dbi.is_pinned)
+    assert [(table.name, table.table_type) for table in schema.tables] == [
+        ("active_users", "VIEW"),
+        ("companies", "BASE TABLE"),
+        ("users", "BASE TABLE"),
+    ]
+    users = schema.tables[2]
+    assert users.primary_keys == ["id"]
+    assert [(index.name, index.columns, index.is_unique) for index in users.indexes] == [
+        ("PRIMARY", ("id",), True),
+        ("users_company_fk", ("company_id",), False),
+        ("users_name", ("name", "id"), False),
+    ]
+    assert users.columns[2].to_description() == {
+        "Field": "name",
+        "Type": "varchar(50)",
+        "Null": "YES",
+        "Key": "MUL",
+        "Default": "anonymous",
+        "Extra": "",
+        "Comment": "Full name",
+    }
+    assert schema.tables[0].view_create_statement == (
+        "CREATE DEFINER=`root`@`%` SQL SECURITY INVOKER VIEW `active_users` AS "
+        "select `users`.`id` AS `id` from `users` where `users`.`name` is not null"
+    )
+    assert [foreign_key.name for foreign_key in schema.get_foreign_keys("companies")] == ["users_company_fk"]
+    assert schema.get_foreign_keys("active_users") == []
+
+
+@pytest.fixture
+def generated_path(tmp_path):
+    analyser = Analyser(str(tmp_path / "dao"))
+    analyser.db = FakeDBI()
+    analyser.run()
+    assert len(analyser.db.queries) == 6
+    return tmp_path / "dao"
+
+
+def test_analyser_generates_all_tables_from_schema(generated_path):
+    assert sorted(path.name for path in (generated_path / "models").glob("*_model.py")) == [
+        "active_users_model.py",
+        "companies_model.py",
+        "users_model.py",
+    ]
+    users_model = (generated_path / "models" / "users_model.py").read_text()
+    assert 'model_class="CompaniesModel"' in users_model and 'columns=("company_id", )' in users_model
+    view_model = (generated_path / "models" / "active_users_model.py").read_text()
+    assert "SQL SECURITY INVOKER" in view_model
+    assert 'SQL_STATEMENT_WHERE_BASE: str = "`users`.`name` IS NOT NULL"' in view_model
@@ -0,0 +1,97 @@
+import copy
+import os
+import typing
+
+import pytest
+
+from .analyser import Analyser
+from .introspection import SchemaIntrospector
+from .manifest import GenerationManifest
+from .test_introspection import FakeDBI, _rows
+
+
+class ChangingFakeDBI(FakeDBI):
+    def __init__(self, rows: typing.Dict):
+        super().__init__()
+        self.rows = rows
+
+    def fetch_all(self, sql, sql_args: tuple = (), dictionary_output=True) -> typing.List[typing.Dict]:
+        self.queries.append(sql)
+        return [dict(item) for item in self.rows[sql]]
+
+
+@pytest.fixture
+def rows():
+    return copy.deepcopy(_rows)
+
+
+def _generate(output_path, rows: typing.Dict, force: bool = False) -> typing.List[str]:
+    """
+    Run generator over already generated output
+    :return: Generated files written by this run
+    """
+    generated_files = _get_generated_files(output_path)
+    for file_path in generated_files:
+        os.utime(os.path.join(str(output_path), file_path), (0, 0))
+
+    analyser = Analyser(str(output_path), force=force)
+    analyser.db = ChangingFakeDBI(rows)
+    analyser.run()
+    return sorted(
+        file_path
+        for file_path in _get_generated_files(output_path)
+        if os.stat(os.path.join(str(output_path), file_path)).st_mtime != 0
+    )
+
+
+def _get_generated_files(output_path) -> typing.List[str]:
+    return [
+        os.path.relpath(os.path.join(directory, file_name), str(output_path))
+        for directory, _, file_names in os.walk(str(output_path))
+        for file_name in file_names
+        if file_name.endswith(".py") and file_name != "__init__.py"
+    ]
+
+
+def test_unchanged_schema_is_not_rewritten(tmp_path, rows):
+    assert len(_generate(tmp_path, rows)) == 9
+    assert os.path.exists(tmp_path / GenerationManifest.FILE_NAME)
+    assert _generate(tmp_path, rows) == []
+
+
+def test_only_changed_table_is_rewritten(tmp_path, rows):
+    _generate(tmp_path, rows)
+    rows[SchemaIntrospector.COLUMNS_SQL][1]["COLUMN_COMMENT"] = "Company ID"
+    assert _generate(tmp_path, rows) == ["models/companies_model.py"]
+
+
+def test_changed_foreign_key_rewrites_both_tables(tmp_path, rows):
+    _generate(tmp_path, rows)
+    rows[SchemaIntrospector.FOREIGN_KEYS_SQL] = []
+    assert _generate(tmp_path, rows) == ["models/companies_model.py", "models/users_model.py"]
+
+
+@pytest.mark.parametrize("force", [False, True])
+def test_dropped_table_outputs_are_removed(tmp_path, rows, force):
+    _generate(tmp_path, rows)
+    rows[SchemaIntrospector.TABLES_SQL] = rows[SchemaIntrospector.TABLES_SQL][:2]
+    rows[SchemaIntrospector.FOREIGN_KEYS_SQL] = []
+    _generate(tmp_path, rows, force=force)
+    generated_files = _get_generated_files(tmp_path)
+    assert "models/users_model.py" not in generated_files
+    assert "managers/base/users_manager_base.py" not in generated_files
+    assert "managers/users_manager.py" in generated_files
+
+
+def test_force_and_template_change_rerender_all(tmp_path, rows):
+    _generate(tmp_path, rows)
+    model_path = tmp_path / "models" / "users_model.py"
+    model_path.write_text("modified")
+    assert _generate(tmp_path, rows) == []
+
+    assert _generate(tmp_path, rows, force=True) == ["models/users_model.py"]
+
+    model_path.write_text("modified")
+    manifest_path = tmp_path / GenerationManifest.FILE_NAME
+    manifest_path.write_text(manifest_path.read_text().replace('"template_hash": "', '"template_hash": "old'))
+    assert _generate(tmp_path, rows) == ["models/users_model.py"]
@@ -0,0 +1,53 @@
+import importlib
+import sys
+
+import pytest
+
+from .analyser import Analyser
+from .ddl import DDLSchemaLoader
+from .test_ddl import MYSQLDUMP_DDL
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    Analyser(str(tmp_path / "lazy_dao"), schema_loader=DDLSchemaLoader(ddl=MYSQLDUMP_DDL)).run()
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("lazy_dao")
+    for module_name in [module_name for module_name in sys.modules if module_name.startswith("lazy_dao")]:
+        del sys.modules[module_name]
+
+
+def _imported_modules():
+    return sorted(module_name for module_name in sys.modules if module_name.startswith("lazy_dao."))
+
+
+def test_registry_imports_modules_lazily(registry):
+    assert _imported_modules() == []
+
+    users_manager_class = registry.UsersManager
+    assert users_manager_class.__name__ == "UsersManager"
+    assert _imported_modules() == [
+        "lazy_dao.managers",
+        "lazy_dao.managers.base",
+        "lazy_dao.managers.base.users_manager_base",
+        "lazy_dao.managers.users_manager",
+        "lazy_dao.models",
+        "lazy_dao.models.users_model",
+    ]
+    assert registry.get_manager("users") is users_manager_class
+    assert registry.get_model("users") is users_manager_class.MODEL_CLASS
+    assert "lazy_dao.models.companies_model" not in sys.modules
+
+
+def test_registry_lookup(registry):
+    from lazy_dao import CompaniesModel  # noqa
+
+    assert CompaniesModel.Meta.TABLE_NAME == "companies"
+    assert registry.get_manager("active_users").__name__ == "ActiveUsersManager"
+    assert "UsersManagerBase" in dir(registry)
+    assert sorted(registry.TABLES) == ["active_users", "companies", "users"]
+
+    with pytest.raises(LookupError):
+        registry.get_manager("unknown")
+    with pytest.raises(AttributeError):
+        registry.UnknownManager
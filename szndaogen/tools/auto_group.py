@@ -1,9 +1,18 @@
+import functools
 import re
 import typing
 
+LIST_GROUP_KEY_REGEX = re.compile(r"^([a-zA-Z0-9]+)__([^_]+.*)$")
+""" Columns grouped into list of dicts by `auto_group_list*` functions e.g. "jobs__name" """
+DICT_GROUP_SEPARATOR = "___"
+""" Separator of columns grouped into nested dict by `auto_group_dict` e.g. "job___name" """
+
 
 def auto_group_list_by_pkeys(
-    primary_key_names: tuple, list_of_dicts: typing.List[dict], use_auto_group_dict: bool = True
+    primary_key_names: tuple,
+    list_of_dicts: typing.List[dict],
+    use_auto_group_dict: bool = True,
+    group_key_names: typing.Dict[str, tuple] = None,
 ) -> dict:
     """
     It can group items separated by "__" into listed groups and separate them by selected primary-key values.
@@ -22,39 +31,69 @@ def auto_group_list_by_pkeys(
     :param primary_key_names: Specify name of columns which you want to group by
     :param list_of_dicts: List of dicts. Usually SQL Select result.
     :param use_auto_group_dict: Should be used funtion auto_group_dict for each row of grouped keys into list?
+    :param group_key_names: Key column names of groups e.g. {"c": ("a",)}. Items of group with key columns are
+        deduplicated (JOIN fan-out) and items with all key columns NULL are skipped (LEFT JOIN without match).
+        Declared group path "c__d" creates group "d" nested in each item of group "c" from columns "c__d__*".
     :return: Dict with joined repeated rows and listed dicts with group prefix stored under joined primary key.
     """
+    group_key_names = _freeze_group_key_names(group_key_names)
     pk_results = {}
+    indexes = {}
     for item in list_of_dicts:
         primary_key = "-".join([str(item[pk_item]) for pk_item in primary_key_names])
-        result = pk_results.get(primary_key, {})
-        grouped_row = {}
-        for key, value in item.items():
-            parsed_key = re.findall(r"^([a-zA-Z0-9]+)__([^_]+.*)$", key)
-            if parsed_key:
-                group_key = parsed_key[0][0]
-                subgroup_key = parsed_key[0][1]
-                if group_key in grouped_row:
-                    grouped_row[group_key][subgroup_key] = value
-                else:
-                    grouped_row[group_key] = {subgroup_key: value}
-            else:
-                if use_auto_group_dict:
-                    result = auto_group_dict({key: value}, merge_with_dict=result)
-                else:
-                    result[key] = value
-        for key, group_line in grouped_row.items():
-            if use_auto_group_dict:
-                group_line = auto_group_dict(group_line)
-            if key in result:
-                result[key].append(group_line)
-            else:
-                result[key] = [group_line]
-        pk_results[primary_key] = result
+        result = pk_results.get(primary_key)
+        if result is None:
+            result = pk_results[primary_key] = {}
+        _compile_grouping_plan(tuple(item), use_auto_group_dict, group_key_names).apply(item, result, indexes)
     return pk_results
 
 
-def auto_group_list(list_of_dicts: typing.List[dict], use_auto_group_dict: bool = True) -> dict:
+def auto_group_iter_by_pkeys(
+    primary_key_names: tuple,
+    iterable_of_dicts: typing.Iterable[dict],
+    use_auto_group_dict: bool = True,
+    group_key_names: typing.Dict[str, tuple] = None,
+) -> typing.Iterator[dict]:
+    """
+    Streaming variant of `auto_group_list_by_pkeys`. Rows have to be ordered by selected primary-key columns
+    (e.g. `select_iter` with `ORDER BY`). Grouped item is yielded as soon as primary-key value changes,
+    so only one grouped item is kept in memory.
+    Example: Primary key is ("a",)
+    [
+     {"a": 1, "b": 2, "c__a": 33, "c__b": 44},
+     {"a": 1, "b": 2, "c__a": 55, "c__b": 66},
+     {"a": 2, "b": 2, "c__a": 7, "c__b": 88},
+    ]
+    ===>
+    {'a': 1, 'b': 2, 'c': [{'a': 33, 'b': 44}, {'a': 55, 'b': 66}]},
+    {'a': 2, 'b': 2, 'c': [{'a': 7, 'b': 88}]}
+    :param primary_key_names: Specify name of columns which you want to group by
+    :param iterable_of_dicts: Iterable of dicts ordered by primary key columns. Usually streamed SQL Select result.
+    :param use_auto_group_dict: Should be used funtion auto_group_dict for each row of grouped keys into list?
+    :param group_key_names: Key column names of groups (see `auto_group_list_by_pkeys`)
+    :return: Iterator of dicts with joined repeated rows and listed dicts with group prefix.
+    """
+    group_key_names = _freeze_group_key_names(group_key_names)
+    result = None
+    indexes = {}
+    last_primary_key = None
+    for item in iterable_of_dicts:
+        primary_key = tuple([item[pk_item] for pk_item in primary_key_names])
+        if result is not None and primary_key != last_primary_key:
+            yield result
+            result = None
+        if result is None:
+            result = {}
+            indexes = {}
+            last_primary_key = primary_key
+        _compile_grouping_plan(tuple(item), use_auto_group_dict, group_key_names).apply(item, result, indexes)
+    if result is not None:
+        yield result
+
+
+def auto_group_list(
+    list_of_dicts: typing.List[dict], use_auto_group_dict: bool = True, group_key_names: typing.Dict[str, tuple] = None
+) -> dict:
     """
     It can group items separated by "__" into listed groups.
     Example: [
@@ -71,32 +110,14 @@ def auto_group_list(list_of_dicts: typing.List[dict], use_auto_group_dict: bool
             }
     :param list_of_dicts: List of dicts. Usually SQL Select result.
     :param use_auto_group_dict: Should be used funtion auto_group_dict for each row of grouped keys into list?
+    :param group_key_names: Key column names of groups (see `auto_group_list_by_pkeys`)
     :return: Dict with joined repeated rows and listed dicts with group prefix.
     """
+    group_key_names = _freeze_group_key_names(group_key_names)
     result = {}
+    indexes = {}
     for item in list_of_dicts:
-        grouped_row = {}
-        for key, value in item.items():
-            parsed_key = re.findall(r"^([a-zA-Z0-9]+)__([^_]+.*)$", key)
-            if parsed_key:
-                group_key = parsed_key[0][0]
-                subgroup_key = parsed_key[0][1]
-                if group_key in grouped_row:
-                    grouped_row[group_key][subgroup_key] = value
-                else:
-                    grouped_row[group_key] = {subgroup_key: value}
-            else:
-                if use_auto_group_dict:
-                    result = auto_group_dict({key: value}, merge_with_dict=result)
-                else:
-                    result[key] = value
-        for key, group_line in grouped_row.items():
-            if use_auto_group_dict:
-                group_line = auto_group_dict(group_line)
-            if key in result:
-                result[key].append(group_line)
-            else:
-                result[key] = [group_line]
+        _compile_grouping_plan(tuple(item), use_auto_group_dict, group_key_names).apply(item, result, indexes)
     return result
 
 
@@ -119,22 +140,124 @@ def auto_group_dict(dict_structure: dict, merge_with_dict: dict = None) -> dict:
     :return: Dict with posible N level structure
     """
 
-    def set_value(_key_path, _value):
-        _result = result
-        key_path_len = len(_key_path)
-        for index, _key in enumerate(_key_path):
-            is_last = index == key_path_len - 1
-            if _key not in _result:
-                _result[_key] = {}
-            if is_last:
-                _result[_key] = _value
-            _result = _result[_key]
-
     result = merge_with_dict if merge_with_dict else {}
     for key, value in dict_structure.items():
-        key_path = key.split("___")
+        key_path = key.split(DICT_GROUP_SEPARATOR)
         if len(key_path) > 1:
-            set_value(key_path, value)
+            _set_path_value(result, key_path, value)
         else:
             result[key] = value
     return result
+
+
+def _set_path_value(result: dict, key_path: typing.Sequence[str], value):
+    for key in key_path[:-1]:
+        if key not in result:
+            result[key] = {}
+        result = result[key]
+    result[key_path[-1]] = value
+
+
+class _GroupingPlan:
+    """
+    Column name parsing of one row shape done once. Grouping functions only apply the plan on each row.
+    """
+
+    __slots__ = ("columns", "groups")
+
+    def __init__(
+        self,
+        columns: typing.List[typing.Tuple[str, str]],
+        use_auto_group_dict: bool,
+        group_key_names: typing.Dict[str, typing.Tuple],
+        group_path_prefix: str = "",
+    ):
+        """
+        :param columns: List of (row column name, column name on this level)
+        :param use_auto_group_dict: Group "___" separated columns into nested dicts
+        :param group_key_names: Key column names of groups (see `auto_group_list_by_pkeys`)
+        :param group_path_prefix: Group path of this level e.g. "jobs__" for groups nested in "jobs"
+        """
+        self.columns = []
+        """ List of (row column name, column name, key path or None) of not grouped columns """
+        self.groups = []
+        """ List of (group key, row column names of group key columns or None, group plan) """
+
+        groups = {}
+        for row_key, key in columns:
+            parsed_key = LIST_GROUP_KEY_REGEX.match(key)
+            # nested groups are created only if they are declared in group_key_names
+            if parsed_key and (not group_path_prefix or group_path_prefix + parsed_key.group(1) in group_key_names):
+                group_key, subgroup_key = parsed_key.groups()
+                groups.setdefault(group_key, []).append((row_key, subgroup_key))
+            else:
+                key_path = key.split(DICT_GROUP_SEPARATOR) if use_auto_group_dict else ()
+                self.columns.append((row_key, key, key_path if len(key_path) > 1 else None))
+
+        for group_key, group_columns in groups.items():
+            group_path = group_path_prefix + group_key
+            key_row_columns = None
+            if group_path in group_key_names:
+                group_row_keys = dict((key, row_key) for row_key, key in group_columns)
+                try:
+                    key_row_columns = tuple(group_row_keys[key] for key in group_key_names[group_path])
+                except KeyError as ex:
+                    raise KeyError(f"Key column {ex} of group '{group_path}' is not in grouped columns.")
+            group_plan = _GroupingPlan(group_columns, use_auto_group_dict, group_key_names, group_path + "__")
+            self.groups.append((group_key, key_row_columns, group_plan))
+
+    def apply(self, item: dict, result: dict, indexes: dict):
+        """
+        Apply plan on one row
+        :param item: Row
+        :param result: Grouped result of this level
+        :param indexes: Already grouped items of groups with key columns by (id of parent dict, group key)
+        """
+        for row_key, key, key_path in self.columns:
+            if key_path is None:
+                result[key] = item[row_key]
+            else:
+                _set_path_value(result, key_path, item[row_key])
+        self.apply_groups(item, result, indexes)
+
+    def apply_groups(self, item: dict, result: dict, indexes: dict):
+        for group_key, key_row_columns, group_plan in self.groups:
+            group_lines = result.get(group_key)
+            if group_lines is None:
+                group_lines = result[group_key] = []
+
+            if key_row_columns is None:
+                group_line = {}
+                group_plan.apply(item, group_line, indexes)
+                group_lines.append(group_line)
+                continue
+
+            group_line_key = tuple([item[row_key] for row_key in key_row_columns])
+            if group_line_key.count(None) == len(group_line_key):
+                continue  # no joined row (LEFT JOIN)
+
+            index_key = (id(result), group_key)
+            index = indexes.get(index_key)
+            if index is None:
+                index = indexes[index_key] = {}
+
+            group_line = index.get(group_line_key)
+            if group_line is None:
+                group_line = index[group_line_key] = {}
+                group_plan.apply(item, group_line, indexes)
+                group_lines.append(group_line)
+            else:
+                group_plan.apply_groups(item, group_line, indexes)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_grouping_plan(
+    keys: typing.Tuple[str, ...], use_auto_group_dict: bool, group_key_names: typing.Tuple = ()
+) -> _GroupingPlan:
+    return _GroupingPlan([(key, key) for key in keys], use_auto_group_dict, dict(group_key_names))
+
+
+def _freeze_group_key_names(group_key_names: typing.Optional[typing.Dict[str, typing.Tuple]]) -> typing.Tuple:
+    if not group_key_names:
+        return ()
+    return tuple(sorted((group_path, tuple(key_names)) for group_path, key_names in group_key_names.items()))
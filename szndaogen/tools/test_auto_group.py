@@ -1,6 +1,7 @@
 import pytest
 
 from .auto_group import auto_group_dict
+from .auto_group import auto_group_iter_by_pkeys
 from .auto_group import auto_group_list
 from .auto_group import auto_group_list_by_pkeys
 
@@ -50,3 +51,48 @@ auto_group_dict_input = [(_input3, _expected3)]
 @pytest.mark.parametrize("input, expected", auto_group_dict_input)
 def test_auto_group_dict(input, expected):
     assert auto_group_dict(input) == expected
+
+
+def test_auto_group_iter_by_pkeys():
+    expected = list(auto_group_list_by_pkeys(("a",), _input1).values())
+    grouped = auto_group_iter_by_pkeys(("a",), iter(_input1))
+    assert next(grouped) == expected[0]
+    assert list(grouped) == expected[1:]
+
+
+_input4 = [
+    {"id": 1, "jobs__id": 10, "jobs__skills__name": "sql", "tags__name": "x"},
+    {"id": 1, "jobs__id": 10, "jobs__skills__name": "sql", "tags__name": "y"},
+    {"id": 1, "jobs__id": 10, "jobs__skills__name": "python", "tags__name": "x"},
+    {"id": 1, "jobs__id": 10, "jobs__skills__name": "python", "tags__name": "y"},
+    {"id": 1, "jobs__id": 11, "jobs__skills__name": None, "tags__name": "x"},
+    {"id": 1, "jobs__id": 11, "jobs__skills__name": None, "tags__name": "y"},
+    {"id": 2, "jobs__id": None, "jobs__skills__name": None, "tags__name": None},
+]
+_group_key_names4 = {"jobs": ("id",), "jobs__skills": ("name",), "tags": ("name",)}
+_expected4 = {
+    "1": {
+        "id": 1,
+        "jobs": [{"id": 10, "skills": [{"name": "sql"}, {"name": "python"}]}, {"id": 11, "skills": []}],
+        "tags": [{"name": "x"}, {"name": "y"}],
+    },
+    "2": {"id": 2, "jobs": [], "tags": []},
+}
+
+
+def test_auto_group_list_by_pkeys_with_group_key_names():
+    assert auto_group_list_by_pkeys(("id",), _input4, group_key_names=_group_key_names4) == _expected4
+
+
+def test_auto_group_iter_by_pkeys_with_group_key_names():
+    grouped = auto_group_iter_by_pkeys(("id",), iter(_input4), group_key_names=_group_key_names4)
+    assert list(grouped) == list(_expected4.values())
+
+
+def test_auto_group_list_with_group_key_names():
+    assert auto_group_list(_input4[:6], group_key_names=_group_key_names4) == _expected4["1"]
+
+
+def test_auto_group_list_with_unknown_group_key_name():
+    with pytest.raises(KeyError):
+        auto_group_list(_input4, group_key_names={"jobs": ("name",)})
@@ -0,0 +1,112 @@
+import re
+import typing
+
+import pytest
+
+from .auto_group import auto_group_dict
+from .auto_group import auto_group_list
+from .auto_group import auto_group_list_by_pkeys
+
+
+def _reference_group_row(item: dict, result: dict, use_auto_group_dict: bool) -> dict:
+    # original per-row implementation parsing every column name of every row
+    grouped_row = {}
+    for key, value in item.items():
+        parsed_key = re.findall(r"^([a-zA-Z0-9]+)__([^_]+.*)$", key)
+        if parsed_key:
+            group_key = parsed_key[0][0]
+            subgroup_key = parsed_key[0][1]
+            if group_key in grouped_row:
+                grouped_row[group_key][subgroup_key] = value
+            else:
+                grouped_row[group_key] = {subgroup_key: value}
+        else:
+            if use_auto_group_dict:
+                result = auto_group_dict({key: value}, merge_with_dict=result)
+            else:
+                result[key] = value
+    for key, group_line in grouped_row.items():
+        if use_auto_group_dict:
+            group_line = auto_group_dict(group_line)
+        if key in result:
+            result[key].append(group_line)
+        else:
+            result[key] = [group_line]
+    return result
+
+
+def _reference_auto_group_list_by_pkeys(
+    primary_key_names: tuple, list_of_dicts: typing.List[dict], use_auto_group_dict: bool = True
+) -> dict:
+    pk_results = {}
+    for item in list_of_dicts:
+        primary_key = "-".join([str(item[pk_item]) for pk_item in primary_key_names])
+        pk_results[primary_key] = _reference_group_row(item, pk_results.get(primary_key, {}), use_auto_group_dict)
+    return pk_results
+
+
+def _reference_auto_group_list(list_of_dicts: typing.List[dict], use_auto_group_dict: bool = True) -> dict:
+    result = {}
+    for item in list_of_dicts:
+        result = _reference_group_row(item, result, use_auto_group_dict)
+    return result
+
+
+def _fan_out_rows(parents: int, children: int, width: int = 40) -> typing.List[dict]:
+    rows = []
+    for parent_id in range(parents):
+        for child_id in range(children):
+            row = {"id": parent_id, "name": f"parent {parent_id}", "office___city": "Prague", "office___code": 1}
+            for index in range(width - 8):
+                row[f"column_{index}"] = index
+            row["jobs__id"] = child_id
+            row["jobs__name"] = f"job {child_id}"
+            row["jobs__company___name"] = "Seznam.cz"
+            row["tags__name"] = f"tag {child_id}"
+            rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("use_auto_group_dict", [True, False])
+def test_auto_group_list_by_pkeys_equivalence(use_auto_group_dict):
+    rows = _fan_out_rows(20, 5)
+    assert auto_group_list_by_pkeys(("id",), rows, use_auto_group_dict) == _reference_auto_group_list_by_pkeys(
+        ("id",), rows, use_auto_group_dict
+    )
+
+
+@pytest.mark.parametrize("use_auto_group_dict", [True, False])
+def test_auto_group_list_equivalence(use_auto_group_dict):
+    rows = _fan_out_rows(1, 10)
+    assert auto_group_list(rows, use_auto_group_dict) == _reference_auto_group_list(rows, use_auto_group_dict)
+
+
+def test_auto_group_list_by_pkeys_wide_fan_out_equivalence():
+    # timing is measured by "python -m szndaogen.benchmarks" (auto_group_list_by_pkeys scenario)
+    rows = _fan_out_rows(100, 10)
+    assert auto_group_list_by_pkeys(("id",), rows) == _reference_auto_group_list_by_pkeys(("id",), rows)
+
+
+def test_auto_group_list_by_pkeys_deduplication_equivalence():
+    # timing is measured by "python -m szndaogen.benchmarks" (auto_group_list_by_pkeys_group_keys scenario)
+    rows = [
+        {"id": 1, "jobs__id": job_id, "jobs__name": f"job {job_id}", "tags__name": f"tag {tag_id}"}
+        for job_id in range(30)
+        for tag_id in range(30)
+    ]
+
+    def reference_deduplication():
+        result = auto_group_list_by_pkeys(("id",), rows)
+        for item in result.values():
+            for group_key in ("jobs", "tags"):
+                unique_lines = []
+                for line in item[group_key]:
+                    if line not in unique_lines:
+                        unique_lines.append(line)
+                item[group_key] = unique_lines
+        return result
+
+    group_key_names = {"jobs": ("id",), "tags": ("name",)}
+    expected = reference_deduplication()
+    assert auto_group_list_by_pkeys(("id",), rows, group_key_names=group_key_names) == expected
+    assert len(expected["1"]["jobs"]) == len(expected["1"]["tags"]) == 30